@@ -16,9 +16,12 @@ from app.models.company import Company
 from app.models.estimate import Estimate
 from app.models.estimate_room import EstimateRoom
 from app.models.estimate_item import EstimateItem
+from app.models.estimate_stat import EstimateDailyStat
+from app.models.room_template import RoomTemplate, RoomTemplateItem
 from app.models.price_item import PriceItem
 from app.models.category import Category
 from app.models.activity_log import ActivityLog
+from app.models.job import Job
 from app.config import settings
 
 target_metadata = Base.metadata
@@ -0,0 +1,25 @@
+"""Add parse cache hit counter to users
+
+Revision ID: 007_parse_cache_hits
+Revises: 006_activity_logs
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "007_parse_cache_hits"
+down_revision: Union[str, Sequence[str], None] = "006_activity_logs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("parse_cache_hits", sa.Integer(), server_default="0", nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "parse_cache_hits")
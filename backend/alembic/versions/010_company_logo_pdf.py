@@ -0,0 +1,25 @@
+"""Add PDF logo derivative to companies
+
+Revision ID: 010_company_logo_pdf
+Revises: 009_job_progress
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "010_company_logo_pdf"
+down_revision: Union[str, Sequence[str], None] = "009_job_progress"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("companies", sa.Column("logo_pdf_path", sa.String(500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("companies", "logo_pdf_path")
@@ -0,0 +1,38 @@
+"""Snapshot price category onto estimate items
+
+Revision ID: 011_estimate_item_category
+Revises: 010_company_logo_pdf
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "011_estimate_item_category"
+down_revision: Union[str, Sequence[str], None] = "010_company_logo_pdf"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("estimate_items", sa.Column("category_name", sa.String(100), server_default="", nullable=False))
+    op.add_column("estimate_items", sa.Column("is_equipment", sa.Boolean(), server_default=sa.false(), nullable=False))
+
+    # Existing items keep the split their PDFs were rendered with: until now the
+    # equipment block was chosen by the category name, not Category.is_equipment
+    op.execute("""
+        UPDATE estimate_items
+        SET category_name = c.name,
+            is_equipment = (c.name = 'Оборудование')
+        FROM price_items p
+        JOIN categories c ON c.id = p.category_id
+        WHERE p.id = estimate_items.price_item_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column("estimate_items", "is_equipment")
+    op.drop_column("estimate_items", "category_name")
@@ -0,0 +1,28 @@
+"""Indexes for the paginated estimate list and detail loads
+
+Revision ID: 012_estimate_list_indexes
+Revises: 011_estimate_item_category
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "012_estimate_list_indexes"
+down_revision: Union[str, Sequence[str], None] = "011_estimate_item_category"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_estimates_company_created", "estimates", ["company_id", "created_at", "id"], unique=False)
+    op.create_index("ix_estimate_rooms_estimate_id", "estimate_rooms", ["estimate_id"], unique=False)
+    op.create_index("ix_estimate_items_room_id", "estimate_items", ["room_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_estimate_items_room_id", table_name="estimate_items")
+    op.drop_index("ix_estimate_rooms_estimate_id", table_name="estimate_rooms")
+    op.drop_index("ix_estimates_company_created", table_name="estimates")
@@ -0,0 +1,46 @@
+"""Estimate search: normalized client phone and trigram indexes
+
+Revision ID: 013_estimate_search
+Revises: 012_estimate_list_indexes
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "013_estimate_search"
+down_revision: Union[str, Sequence[str], None] = "012_estimate_list_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("estimates", sa.Column("client_phone_digits", sa.String(50), server_default="", nullable=False))
+    # Same rules as estimate_service.normalize_phone
+    op.execute("UPDATE estimates SET client_phone_digits = regexp_replace(coalesce(client_phone, ''), '\\D', '', 'g')")
+    op.execute("""
+        UPDATE estimates SET client_phone_digits = '7' || substr(client_phone_digits, 2)
+        WHERE length(client_phone_digits) = 11 AND client_phone_digits LIKE '8%'
+    """)
+    op.execute("""
+        UPDATE estimates SET client_phone_digits = '7' || client_phone_digits
+        WHERE length(client_phone_digits) = 10 AND client_phone_digits LIKE '9%'
+    """)
+
+    # Trigram GIN indexes (ILIKE and word similarity) led by company_id (btree_gin),
+    # so a search only walks the company's own entries
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    op.execute("CREATE INDEX ix_estimates_search_name ON estimates USING gin (company_id, client_name gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_estimates_search_address ON estimates USING gin (company_id, client_address gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_estimates_search_phone ON estimates USING gin (company_id, client_phone_digits gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_estimates_search_phone", table_name="estimates")
+    op.drop_index("ix_estimates_search_address", table_name="estimates")
+    op.drop_index("ix_estimates_search_name", table_name="estimates")
+    op.drop_column("estimates", "client_phone_digits")
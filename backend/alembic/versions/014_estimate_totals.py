@@ -0,0 +1,55 @@
+"""Store block subtotals, discount amounts and the payable sum of estimates
+
+Revision ID: 014_estimate_totals
+Revises: 013_estimate_search
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "014_estimate_totals"
+down_revision: Union[str, Sequence[str], None] = "013_estimate_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ("subtotal_main", "subtotal_equipment", "discount_main_sum", "discount_equipment_sum", "final_sum")
+
+
+def upgrade() -> None:
+    for name in COLUMNS:
+        op.add_column("estimates", sa.Column(name, sa.Numeric(12, 2), server_default="0", nullable=False))
+
+    # Same arithmetic as app.services.pricing: rounded line sums per block,
+    # each discount rounded to kopecks, payable = blocks minus discounts
+    op.execute("""
+        UPDATE estimates
+        SET subtotal_main = t.main,
+            subtotal_equipment = t.equipment
+        FROM (
+            SELECT r.estimate_id,
+                   COALESCE(SUM(ROUND(i.sum, 2)) FILTER (WHERE NOT i.is_equipment), 0) AS main,
+                   COALESCE(SUM(ROUND(i.sum, 2)) FILTER (WHERE i.is_equipment), 0) AS equipment
+            FROM estimate_items i
+            JOIN estimate_rooms r ON r.id = i.room_id
+            GROUP BY r.estimate_id
+        ) t
+        WHERE t.estimate_id = estimates.id
+    """)
+    op.execute("""
+        UPDATE estimates
+        SET discount_main_sum = ROUND(subtotal_main * COALESCE(discount_pr_work, 0) / 100, 2),
+            discount_equipment_sum = ROUND(subtotal_equipment * COALESCE(discount_equipment, 0) / 100, 2)
+    """)
+    op.execute("""
+        UPDATE estimates
+        SET final_sum = subtotal_main - discount_main_sum + subtotal_equipment - discount_equipment_sum
+    """)
+
+
+def downgrade() -> None:
+    for name in reversed(COLUMNS):
+        op.drop_column("estimates", name)
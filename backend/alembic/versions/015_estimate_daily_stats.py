@@ -0,0 +1,50 @@
+"""Add daily estimate rollup per company and status
+
+Revision ID: 015_estimate_daily_stats
+Revises: 014_estimate_totals
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "015_estimate_daily_stats"
+down_revision: Union[str, Sequence[str], None] = "014_estimate_totals"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "estimate_daily_stats",
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        # The estimates' enum type, created with that table
+        sa.Column("status", postgresql.ENUM(name="estimatestatus", create_type=False), nullable=False),
+        sa.Column("estimate_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("total_sum", sa.Numeric(14, 2), server_default="0", nullable=False),
+        sa.Column("final_sum", sa.Numeric(14, 2), server_default="0", nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("company_id", "day", "status"),
+    )
+
+    # From here on the application keeps the rollup in step with every estimate write
+    op.execute("""
+        INSERT INTO estimate_daily_stats (company_id, day, status, estimate_count, total_sum, final_sum)
+        SELECT company_id,
+               CAST(COALESCE(created_at, now()) AT TIME ZONE 'UTC' AS date),
+               COALESCE(status, 'DRAFT'),
+               COUNT(*),
+               COALESCE(SUM(total_sum), 0),
+               COALESCE(SUM(final_sum), 0)
+        FROM estimates
+        GROUP BY 1, 2, 3
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("estimate_daily_stats")
@@ -0,0 +1,56 @@
+"""Add company room templates
+
+Revision ID: 016_room_templates
+Revises: 015_estimate_daily_stats
+Create Date: 2026-10-18
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "016_room_templates"
+down_revision: Union[str, Sequence[str], None] = "015_estimate_daily_stats"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "room_templates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("area", sa.Numeric(10, 2), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=True),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_room_templates_id", "room_templates", ["id"], unique=False)
+    op.create_index("ix_room_templates_company_id", "room_templates", ["company_id"], unique=False)
+    op.create_table(
+        "room_template_items",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("template_id", sa.Integer(), nullable=False),
+        sa.Column("price_item_id", sa.Integer(), nullable=True),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("unit", sa.String(length=20), nullable=False),
+        sa.Column("quantity", sa.Numeric(10, 2), nullable=False),
+        sa.Column("price", sa.Numeric(10, 2), nullable=False),
+        sa.ForeignKeyConstraint(["template_id"], ["room_templates.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["price_item_id"], ["price_items.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_room_template_items_id", "room_template_items", ["id"], unique=False)
+    op.create_index("ix_room_template_items_template_id", "room_template_items", ["template_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_room_template_items_template_id", table_name="room_template_items")
+    op.drop_index("ix_room_template_items_id", table_name="room_template_items")
+    op.drop_table("room_template_items")
+    op.drop_index("ix_room_templates_company_id", table_name="room_templates")
+    op.drop_index("ix_room_templates_id", table_name="room_templates")
+    op.drop_table("room_templates")
@@ -10,6 +10,7 @@ from app.models import ActivityLog, Estimate, User
 from app.schemas.activity_log import ActivityLogResponse
 from app.schemas.user import UserCreate, UserResponse, UserAdminResponse
 from app.services.auth_service import auth_service
+from app.services.pdf_renderer import pdf_renderer
 
 router = APIRouter()
 
@@ -49,6 +50,7 @@ def list_users(
             "created_at": user.created_at,
             "total_tokens_used": user.total_tokens_used or 0,
             "total_api_cost": user.total_api_cost or 0,
+            "parse_cache_hits": user.parse_cache_hits or 0,
             "company": user.company,
             "estimates_count": estimates_count
         }
@@ -116,15 +118,23 @@ def get_admin_stats(
     total_estimates = db.query(func.count(Estimate.id)).scalar() or 0
     total_tokens = db.query(func.sum(User.total_tokens_used)).scalar() or 0
     total_cost = db.query(func.sum(User.total_api_cost)).scalar() or 0
+    total_cache_hits = db.query(func.sum(User.parse_cache_hits)).scalar() or 0
     
     return {
         "total_users": total_users,
         "total_estimates": total_estimates,
         "total_tokens_used": total_tokens,
-        "total_api_cost": float(total_cost) if total_cost else 0
+        "total_api_cost": float(total_cost) if total_cost else 0,
+        "total_parse_cache_hits": total_cache_hits
     }
 
 
+@router.get("/pdf/metrics")
+def get_pdf_metrics(admin: User = Depends(require_admin)) -> Any:
+    """PDF renderer pool: queue depth, counters and render / queue time percentiles."""
+    return pdf_renderer.metrics()
+
+
 @router.get("/activity-logs", response_model=List[ActivityLogResponse])
 def list_activity_logs(
     db: Session = Depends(get_db),
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+import json
+from datetime import date
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Body, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Any, List
+from typing import Any, List, Literal, Optional
 
 from app.api.deps import get_current_active_user
 from app.database import get_db
 from app.services import estimate_service, ai_parser_service
+from app.services.estimate_stats import estimate_stats_service
+from app.services.pdf_prerender import pdf_prerender_service
+from app.services.room_template_service import room_template_service
 from app.schemas.estimate import (
-    EstimateCreate, EstimateUpdate, EstimateResponse, EstimateParseResponse
+    EstimateCreate, EstimateUpdate, EstimateResponse, EstimateParseResponse, EstimateSummaryPage,
+    EstimateSearchPage, EstimateStats, EstimateCloneRequest, EstimateRoomFromTemplate
 )
-from app.models import User
+from app.models import EstimateStatus, User
 
 router = APIRouter()
 
@@ -22,15 +30,67 @@ def list_estimates(
         raise HTTPException(status_code=400, detail="User has no company")
     return estimate_service.list_estimates(db, current_user.company.id)
 
+@router.get("/summary", response_model=EstimateSummaryPage)
+def list_estimate_summaries(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[EstimateStatus] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Any:
+    """Summary rows of the company's estimates, newest first, paginated by cursor (no rooms/items)."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    try:
+        items, next_cursor = estimate_service.list_summaries(
+            db, current_user.company.id, limit, cursor, status, date_from, date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/search", response_model=EstimateSearchPage)
+def search_estimates(
+    q: str = Query(..., min_length=2, max_length=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+) -> Any:
+    """Estimates by client name, address or phone (prefix, substring, fuzzy), best match first."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    items, next_offset = estimate_service.search_summaries(db, current_user.company.id, q, limit, offset)
+    return {"items": items, "next_offset": next_offset}
+
+@router.get("/stats", response_model=EstimateStats)
+def get_estimate_stats(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    period: Literal["day", "month"] = "month",
+) -> Any:
+    """Counts and sums of the company's estimates by status and period, from the daily rollup."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    return estimate_stats_service.get_stats(db, current_user.company.id, date_from, date_to, period)
+
 @router.post("/", response_model=EstimateResponse, status_code=201)
 def create_estimate(
     estimate_in: EstimateCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     if not current_user.company:
         raise HTTPException(status_code=400, detail="User has no company")
-    return estimate_service.create_estimate(db, current_user.company.id, estimate_in)
+    created = estimate_service.create_estimate(db, current_user.company.id, estimate_in)
+    if pdf_prerender_service.wants(created):
+        background_tasks.add_task(pdf_prerender_service.schedule, created.id)
+    return created
 
 @router.get("/{estimate_id}", response_model=EstimateResponse)
 def get_estimate(
@@ -46,7 +106,7 @@ def get_estimate(
     return estimate
 
 @router.post("/parse", response_model=EstimateParseResponse)
-def parse_transcript(
+async def parse_transcript(
     transcript: str = Body(..., embed=True),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -54,12 +114,39 @@ def parse_transcript(
     if not current_user.company:
          raise HTTPException(status_code=400, detail="User has no company")
          
-    return ai_parser_service.parse_transcript(db, current_user.company.id, transcript, user=current_user)
+    return await ai_parser_service.parse_transcript(db, current_user.company.id, transcript, user=current_user)
+
+@router.post("/parse/stream")
+async def parse_transcript_stream(
+    transcript: str = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Streaming variant of /parse (NDJSON, one event per line): "room", "item" and
+    "room_done" events arrive while the model answers, the final "result" event
+    carries the same payload as /parse.
+    """
+    if not current_user.company:
+         raise HTTPException(status_code=400, detail="User has no company")
+
+    events = await ai_parser_service.stream_parse(db, current_user.company.id, transcript, user_id=current_user.id)
+
+    async def ndjson():
+        async for event in events:
+            yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.put("/{estimate_id}", response_model=EstimateResponse)
 def update_estimate(
     estimate_id: int,
     estimate_in: EstimateUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
@@ -71,6 +158,51 @@ def update_estimate(
         raise HTTPException(status_code=403, detail="Not authorized")
     
     updated = estimate_service.update_estimate(db, estimate_id, estimate_in)
+    if pdf_prerender_service.wants(updated):
+        background_tasks.add_task(pdf_prerender_service.schedule, estimate_id)
+    return updated
+
+@router.post("/{estimate_id}/clone", response_model=EstimateResponse, status_code=201)
+def clone_estimate(
+    estimate_id: int,
+    background_tasks: BackgroundTasks,
+    clone_in: Optional[EstimateCloneRequest] = Body(default=None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Copy an estimate with its rooms and items (a draft unless another status is given)."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    cloned = estimate_service.clone_estimate(
+        db, estimate_id, current_user.company.id, clone_in or EstimateCloneRequest()
+    )
+    if not cloned:
+        raise HTTPException(status_code=404, detail="Estimate not found")
+    if pdf_prerender_service.wants(cloned):
+        background_tasks.add_task(pdf_prerender_service.schedule, cloned.id)
+    return cloned
+
+@router.post("/{estimate_id}/rooms/from-template", response_model=EstimateResponse)
+def add_room_from_template(
+    estimate_id: int,
+    room_in: EstimateRoomFromTemplate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Append a room made from one of the company's room templates."""
+    estimate = estimate_service.get_estimate(db, estimate_id)
+    if not estimate:
+        raise HTTPException(status_code=404, detail="Estimate not found")
+    if estimate.company_id != current_user.company.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    template = room_template_service.get_template(db, room_in.template_id)
+    if not template or template.company_id != current_user.company.id:
+        raise HTTPException(status_code=404, detail="Room template not found")
+
+    updated = estimate_service.add_room_from_template(db, estimate_id, template, room_in.name, room_in.area)
+    if pdf_prerender_service.wants(updated):
+        background_tasks.add_task(pdf_prerender_service.schedule, estimate_id)
     return updated
 
 @router.delete("/{estimate_id}", status_code=204)
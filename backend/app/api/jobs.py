@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, Query, UploadFile, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from typing import Any
+
+from app.api.deps import get_current_active_user
+from app.api.transcribe import read_audio_upload
+from app.config import settings
+from app.database import get_db
+from app.models import Job, JobStatus, User
+from app.schemas.job import JobResponse
+from app.services import job_service
+
+router = APIRouter()
+
+
+@router.post("/transcribe", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_transcription(
+    audio: UploadFile = File(..., description="Audio file to transcribe (webm, mp3, wav)"),
+    parse: bool = Form(False, description="Also parse the transcript into rooms and items"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Queue a transcription. Poll GET /api/jobs/{id} for the result ({"transcript", "parse"?})."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+
+    audio_data = await read_audio_upload(audio)
+    try:
+        return await job_service.submit_transcription(
+            db, current_user, audio_data, audio.content_type or "audio/webm", parse=parse
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+@router.post("/parse", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_parse(
+    transcript: str = Body(..., embed=True),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Queue a transcript parse. The job result has the same payload as /api/estimates/parse."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+
+    try:
+        return await job_service.submit_parse(db, current_user, transcript)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    wait: int = Query(0, ge=0, description="Long-poll: seconds to wait for the job to finish"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    # Blocking DB calls go to the threadpool; only the wait itself stays on the event loop
+    job = await run_in_threadpool(_get_own_job, db, job_id, current_user)
+
+    if wait and job.status not in (JobStatus.DONE, JobStatus.FAILED):
+        await job_service.wait(db, job_id, min(wait, settings.JOB_WAIT_MAX_SECONDS))
+        await run_in_threadpool(db.refresh, job)
+    return job
+
+
+def _get_own_job(db: Session, job_id: str, user: User) -> Job:
+    job = job_service.get(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not user.company or job.company_id != user.company.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return job
@@ -1,88 +1,133 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from datetime import datetime
 from typing import Any
+from urllib.parse import quote
 import logging
 
 from app.api.deps import get_current_active_user
 from app.database import get_db
-from app.services import pdf_service, estimate_service
-from app.schemas.pdf import PdfGenerateRequest
+from app.services import estimate_service
+from app.config import settings
+from app.services.pdf_batch_service import pdf_batch_service
+from app.services.pdf_cache import CachedPdf, pdf_cache_service
+from app.services.pdf_document import build_pdf_estimate
+from app.services.pdf_renderer import RendererBusy, pdf_renderer
+from app.schemas.pdf import PdfBatchRequest, PdfGenerateRequest
 from app.models import User
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+
+def _get_pdf(db: Session, estimate_id: int, current_user: User) -> CachedPdf:
+    """Cached render of the estimate (rendered now if it changed), after the access checks."""
+    cached = pdf_cache_service.lookup(estimate_id)
+    if cached is None:
+        estimate = estimate_service.get_estimate(db, estimate_id)
+        if not estimate:
+            raise HTTPException(status_code=404, detail="Estimate not found")
+        company_id = estimate.company_id
+    else:
+        estimate = None
+        company_id = cached.company_id
+
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+        
+    if company_id != current_user.company.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    if cached is not None:
+        return cached
+    logger.info(f"Generating PDF for estimate {estimate.id}")
+    document = build_pdf_estimate(estimate, current_user.company)
+    return pdf_cache_service.get_or_render(document, lambda: pdf_renderer.render(document))
+
+
+def _pdf_response(request: Request, cached: CachedPdf, disposition: str) -> Response:
+    headers = {
+        "Content-Disposition": disposition,
+        "Access-Control-Expose-Headers": "Content-Disposition, ETag",
+        "ETag": cached.etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if request.headers.get("if-none-match") == cached.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=pdf_cache_service.read(cached), media_type="application/pdf", headers=headers)
+
+
 @router.post("/generate")
 def generate_pdf(
-    request: PdfGenerateRequest,
+    request: Request,
+    pdf_request: PdfGenerateRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     try:
-        estimate = estimate_service.get_estimate(db, request.estimate_id)
-        if not estimate:
-            raise HTTPException(status_code=404, detail="Estimate not found")
-        
-        if not current_user.company:
-            raise HTTPException(status_code=400, detail="User has no company")
-            
-        if estimate.company_id != current_user.company.id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-        
-        logger.info(f"Generating PDF for estimate {estimate.id}")
-        pdf_content = pdf_service.generate(estimate, current_user.company)
-        
-        # Sanitize filename
-        from urllib.parse import quote
-        client_name = estimate.client_name.replace('"', '').replace("'", "").replace("/", "_")
-        filename = f"KP_{estimate.id}_{client_name}.pdf"
-        encoded_filename = quote(filename)
-        
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename*=UTF-8''{encoded_filename}",
-                "Access-Control-Expose-Headers": "Content-Disposition"
-            }
-        )
+        cached = _get_pdf(db, pdf_request.estimate_id, current_user)
+        encoded_filename = quote(cached.filename)
+        return _pdf_response(request, cached, f"attachment; filename*=UTF-8''{encoded_filename}")
     except HTTPException:
         raise
+    except RendererBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.exception(f"Error generating PDF: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating PDF: {str(e)}")
 
 @router.get("/preview/{estimate_id}")
 def preview_pdf(
+    request: Request,
     estimate_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ) -> Any:
     """Generate PDF for inline preview (no download)"""
     try:
-        estimate = estimate_service.get_estimate(db, estimate_id)
-        if not estimate:
-            raise HTTPException(status_code=404, detail="Estimate not found")
-        
-        if not current_user.company:
-            raise HTTPException(status_code=400, detail="User has no company")
-            
-        if estimate.company_id != current_user.company.id:
-            raise HTTPException(status_code=403, detail="Not authorized")
-        
-        pdf_content = pdf_service.generate(estimate, current_user.company)
-        
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": "inline",  # For preview, not download
-                "Access-Control-Expose-Headers": "Content-Disposition"
-            }
-        )
+        cached = _get_pdf(db, estimate_id, current_user)
+        return _pdf_response(request, cached, "inline")  # For preview, not download
     except HTTPException:
         raise
+    except RendererBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.exception(f"Error previewing PDF: {e}")
         raise HTTPException(status_code=500, detail=f"Error generating preview: {str(e)}")
+
+@router.post("/batch")
+def generate_pdf_batch(
+    batch_request: PdfBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """ZIP of the PDFs of the given estimates (or those matching the filter), streamed as they render"""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+
+    estimate_ids = pdf_batch_service.select(db, current_user.company.id, batch_request)
+    if batch_request.estimate_ids:
+        missing = set(batch_request.estimate_ids) - set(estimate_ids)
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Estimates not found: {', '.join(map(str, sorted(missing)))}")
+    if not estimate_ids:
+        raise HTTPException(status_code=404, detail="No estimates match the filter")
+    if len(estimate_ids) > settings.PDF_BATCH_MAX_ESTIMATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many estimates ({len(estimate_ids)}), max {settings.PDF_BATCH_MAX_ESTIMATES} per archive"
+        )
+
+    items = pdf_batch_service.prepare(db, current_user.company, estimate_ids)
+    logger.info(f"Generating PDF archive of {len(items)} estimates for company {current_user.company.id}")
+    filename = f"KP_{datetime.now().strftime('%Y-%m-%d')}.zip"
+    return StreamingResponse(
+        pdf_batch_service.stream_zip(items),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Access-Control-Expose-Headers": "Content-Disposition",
+        }
+    )
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import Response
+from sqlalchemy.orm import Session
+from typing import Any, List
+
+from app.api.deps import get_current_active_user
+from app.database import get_db
+from app.services.room_template_service import room_template_service
+from app.schemas.room_template import RoomTemplateCreate, RoomTemplateFromRoom, RoomTemplateResponse
+from app.models import EstimateRoom, User
+
+router = APIRouter()
+
+@router.get("/", response_model=List[RoomTemplateResponse])
+def list_room_templates(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Room templates of the current user's company, by name."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    return room_template_service.list_templates(db, current_user.company.id)
+
+@router.post("/", response_model=RoomTemplateResponse, status_code=201)
+def create_room_template(
+    template_in: RoomTemplateCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    return room_template_service.create_template(db, current_user.company.id, template_in)
+
+@router.post("/from-room", response_model=RoomTemplateResponse, status_code=201)
+def create_room_template_from_room(
+    template_in: RoomTemplateFromRoom,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """Save a room of one of the company's estimates as a template."""
+    if not current_user.company:
+        raise HTTPException(status_code=400, detail="User has no company")
+    room = db.query(EstimateRoom).filter(EstimateRoom.id == template_in.room_id).first()
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    if room.estimate.company_id != current_user.company.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return room_template_service.create_from_room(db, current_user.company.id, room, template_in.name)
+
+@router.delete("/{template_id}", status_code=204)
+def delete_room_template(
+    template_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    template = room_template_service.get_template(db, template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="Room template not found")
+    if not current_user.company or template.company_id != current_user.company.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    room_template_service.delete_template(db, template)
+    return Response(status_code=204)
@@ -3,12 +3,15 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import os
 import uuid
 from pathlib import Path
 
 from app.api.deps import get_current_active_user, get_db
-from app.models import User
+from app.models import Company, User
+from app.services.logo_service import logo_service
+from app.services.pdf_cache import pdf_cache_service
 
 router = APIRouter()
 
@@ -43,12 +46,6 @@ async def upload_logo(
     # Create upload directory if not exists
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Delete old logo if exists
-    if current_user.company.logo_path:
-        old_path = Path(current_user.company.logo_path)
-        if old_path.exists():
-            old_path.unlink()
-    
     # Save new file
     filename = f"{current_user.company.id}_{uuid.uuid4().hex[:8]}{ext}"
     filepath = UPLOAD_DIR / filename
@@ -56,9 +53,21 @@ async def upload_logo(
     with open(filepath, "wb") as f:
         f.write(contents)
     
+    # Downscaled copy for PDFs (also rejects files that aren't images)
+    try:
+        pdf_logo_path = await run_in_threadpool(logo_service.save_pdf_logo, filepath, contents)
+    except ValueError as e:
+        filepath.unlink()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Delete old logo if exists
+    _delete_logo_files(current_user.company)
+    
     # Update company
     current_user.company.logo_path = str(filepath)
+    current_user.company.logo_pdf_path = str(pdf_logo_path)
     db.commit()
+    pdf_cache_service.invalidate_company(current_user.company.id)
     
     return {"logo_path": str(filepath), "filename": filename}
 
@@ -73,16 +82,22 @@ def delete_logo(
         raise HTTPException(status_code=400, detail="Company not found")
     
     if current_user.company.logo_path:
-        filepath = Path(current_user.company.logo_path)
-        if filepath.exists():
-            filepath.unlink()
+        _delete_logo_files(current_user.company)
         
         current_user.company.logo_path = None
+        current_user.company.logo_pdf_path = None
         db.commit()
+        pdf_cache_service.invalidate_company(current_user.company.id)
     
     return {"status": "deleted"}
 
 
+def _delete_logo_files(company: Company) -> None:
+    for path in (company.logo_path, company.logo_pdf_path):
+        if path and Path(path).exists():
+            Path(path).unlink()
+
+
 @router.get("/logo/{filename}")
 def get_logo(filename: str):
     """Serve logo file."""
@@ -7,6 +7,7 @@ from app.database import get_db
 from app.schemas.user import UserResponse
 from app.schemas.company import CompanyUpdate, CompanyResponse
 from app.models import User, Company
+from app.services.pdf_cache import pdf_cache_service
 
 router = APIRouter()
 
@@ -36,10 +37,13 @@ def update_company(
         db.commit()
     
     update_data = company_in.model_dump(exclude_unset=True)
+    if "logo_path" in update_data and update_data["logo_path"] != company.logo_path:
+        company.logo_pdf_path = None
     for field, value in update_data.items():
         setattr(company, field, value)
     
     db.add(company)
     db.commit()
+    pdf_cache_service.invalidate_company(company.id)
     db.refresh(company)
     return company
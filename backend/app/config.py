@@ -26,6 +26,78 @@ class Settings(BaseSettings):
     # Model for audio transcription (Gemini 3 Flash - supports audio)
     OPENROUTER_TRANSCRIBE_MODEL: str = "google/gemini-3-flash-preview"
     
+    # Shared OpenRouter HTTP client
+    OPENROUTER_MAX_CONNECTIONS: int = 20
+    OPENROUTER_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENROUTER_CONNECT_TIMEOUT: float = 10.0
+    OPENROUTER_PARSE_TIMEOUT: float = 60.0
+    OPENROUTER_TRANSCRIBE_TIMEOUT: float = 120.0
+    
+    # Concurrent ffmpeg processes for audio conversion
+    FFMPEG_MAX_PROCESSES: int = 4
+    
+    # Transcription: uploads from TRANSCRIBE_SEGMENT_MIN_BYTES on are cut at pauses into
+    # ~TRANSCRIBE_SEGMENT_SECONDS segments transcribed concurrently (0 disables)
+    TRANSCRIBE_MAX_UPLOAD_MB: int = 50
+    TRANSCRIBE_SEGMENT_SECONDS: int = 60
+    TRANSCRIBE_SEGMENT_MIN_BYTES: int = 1024 * 1024
+    TRANSCRIBE_SEGMENT_CONCURRENCY: int = 4
+    TRANSCRIBE_SILENCE_DB: int = -35
+    TRANSCRIBE_SILENCE_SECONDS: float = 0.5
+    
+    # Send only a shortlist of likely price items to the parser model
+    # when the active price list has at least this many items (0 disables)
+    # and its compact form is over the token budget; below that the full list
+    # is sent, since its prompt prefix is the same on every call and cached
+    PARSER_SHORTLIST_MIN_ITEMS: int = 120
+    PARSER_FULL_CATALOG_MAX_TOKENS: int = 8000
+    PARSER_SHORTLIST_SIZE: int = 40
+    PARSER_SHORTLIST_MIN_SCORE: float = 0.6
+    PARSER_STAPLES_PER_CATEGORY: int = 2
+    PARSER_STAPLES_TTL_SECONDS: int = 3600  # staples follow usage, recompute this often
+    
+    # Price list cache (per company, in-process)
+    PRICE_CACHE_MAX_COMPANIES: int = 256
+    PRICE_CACHE_MAX_ITEMS: int = 200000
+    PRICE_CACHE_TTL_SECONDS: int = 300
+    
+    # Parse result cache (0 entries disables; set a directory to also keep results on disk)
+    PARSE_CACHE_MAX_ENTRIES: int = 2000
+    PARSE_CACHE_TTL_SECONDS: int = 86400
+    PARSE_CACHE_DIR: str = ""
+    
+    # Background jobs (transcription / parsing)
+    JOB_QUEUE_MAX_SIZE: int = 200
+    JOB_TRANSCRIBE_CONCURRENCY: int = 4  # OpenRouter calls in flight, counting each segment
+    JOB_PARSE_CONCURRENCY: int = 8
+    JOB_COMPANY_CONCURRENCY: int = 2
+    JOB_WAIT_MAX_SECONDS: int = 30
+    JOB_RETENTION_HOURS: int = 24
+    
+    # Rendered PDF cache (empty dir keeps renders in memory only)
+    PDF_CACHE_DIR: str = "/app/cache/pdf"
+    PDF_CACHE_MAX_ENTRIES: int = 500
+    PDF_CACHE_TTL_DAYS: int = 30
+    
+    # PDF rendering process pool (0 workers renders in the request thread);
+    # renders beyond workers + PDF_RENDER_MAX_QUEUE are rejected with 503
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_MAX_QUEUE: int = 8
+    PDF_RENDER_TIMEOUT_SECONDS: int = 60
+    PDF_RENDER_MAX_TASKS_PER_CHILD: int = 200
+    
+    # Render the PDF in the background once an estimate is completed / sent / at the PDF step,
+    # after this many seconds without further saves
+    PDF_PRERENDER_ENABLED: bool = True
+    PDF_PRERENDER_DEBOUNCE_SECONDS: float = 5
+    
+    # Bulk PDF export (ZIP): estimates per request, renders in flight per request
+    PDF_BATCH_MAX_ESTIMATES: int = 200
+    PDF_BATCH_CONCURRENCY: int = 2
+    
+    # Estimate search: pg_trgm word similarity a fuzzy client name / address match needs
+    ESTIMATE_SEARCH_MIN_SIMILARITY: float = 0.4
+    
     # CORS
     CORS_ORIGINS: List[str] = ["*"]
 
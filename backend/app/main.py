@@ -37,6 +37,7 @@ from app.models import (
     Estimate,
     EstimateItem,
     EstimateRoom,
+    Job,
     PriceItem,
     User,
 )
@@ -111,26 +112,47 @@ async def audit_requests(request: Request, call_next):
 
 
 # Import routers after app is created
-from app.api import auth, users, price, estimates, pdf, transcribe, admin, upload
+from app.api import auth, users, price, estimates, room_templates, pdf, transcribe, admin, upload, jobs
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(price.router, prefix="/api/price", tags=["Price"])
 app.include_router(estimates.router, prefix="/api/estimates", tags=["Estimates"])
+app.include_router(room_templates.router, prefix="/api/room-templates", tags=["Room templates"])
 app.include_router(pdf.router, prefix="/api/pdf", tags=["PDF"])
 app.include_router(transcribe.router, prefix="/api", tags=["Transcribe"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(upload.router, prefix="/api/upload", tags=["Upload"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 
 @app.on_event("startup")
 def on_startup():
     from app.initial_data import init_db
+    from app.services.job_service import job_service
+    from app.services.logo_service import logo_service
+    from app.services.pdf_cache import pdf_cache_service
+    from app.services.pdf_renderer import pdf_renderer
     db = SessionLocal()
     try:
         init_db(db)
+        job_service.recover(db)
+        logo_service.backfill(db)
     finally:
         db.close()
+    pdf_cache_service.prune()
+    pdf_renderer.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    from app.services.job_service import job_service
+    from app.services.openrouter_client import openrouter_client
+    from app.services.pdf_prerender import pdf_prerender_service
+    from app.services.pdf_renderer import pdf_renderer
+    await job_service.shutdown()
+    await pdf_prerender_service.shutdown()
+    pdf_renderer.shutdown()
+    await openrouter_client.aclose()
 
 @app.get("/")
 def read_root():
@@ -5,4 +5,7 @@ from .price_item import PriceItem
 from .estimate import Estimate, EstimateStatus
 from .estimate_room import EstimateRoom
 from .estimate_item import EstimateItem
+from .estimate_stat import EstimateDailyStat
+from .room_template import RoomTemplate, RoomTemplateItem
 from .activity_log import ActivityLog
+from .job import Job, JobStatus
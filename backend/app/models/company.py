@@ -17,6 +17,7 @@ class Company(Base):
     
     # Extended profile fields
     logo_path = Column(String(500), nullable=True)   # Path to uploaded logo
+    logo_pdf_path = Column(String(500), nullable=True)  # Downscaled copy embedded in PDFs
     address = Column(String(500), default="")        # Office address
     website = Column(String(255), default="")        # Website URL
     messenger_contact = Column(String(100), default="")  # @username or phone
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Numeric, DateTime, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -13,21 +13,32 @@ class EstimateStatus(str, enum.Enum):
 
 class Estimate(Base):
     __tablename__ = "estimates"
+    __table_args__ = (
+        # Estimate list: newest first per company, keyset-paginated on (created_at, id)
+        Index("ix_estimates_company_created", "company_id", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     client_name = Column(String(255), nullable=False)
     client_phone = Column(String(50), default="")
+    client_phone_digits = Column(String(50), nullable=False, default="")  # normalize_phone(client_phone), for search
     client_address = Column(String(500), default="")
     estimate_date = Column(DateTime(timezone=True), server_default=func.now())
     total_area = Column(Numeric(10, 2), default=0)
-    total_sum = Column(Numeric(12, 2), default=0)
+    total_sum = Column(Numeric(12, 2), default=0)  # До скидок
     discount_pr_work = Column(Numeric(5, 2), default=0)  # Скидка на потолок и работы (%)
     discount_equipment = Column(Numeric(5, 2), default=0)  # Скидка на оборудование (%)
+    # Итоги по блокам и к оплате, считаются при сохранении (app.services.pricing)
+    subtotal_main = Column(Numeric(12, 2), nullable=False, default=0)
+    subtotal_equipment = Column(Numeric(12, 2), nullable=False, default=0)
+    discount_main_sum = Column(Numeric(12, 2), nullable=False, default=0)
+    discount_equipment_sum = Column(Numeric(12, 2), nullable=False, default=0)
+    final_sum = Column(Numeric(12, 2), nullable=False, default=0)
     status = Column(Enum(EstimateStatus), default=EstimateStatus.DRAFT)
     last_step = Column(Integer, default=1)  # Wizard step (1-4) for resuming drafts
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     company = relationship("Company", back_populates="estimates")
-    rooms = relationship("EstimateRoom", back_populates="estimate", cascade="all, delete-orphan")
+    rooms = relationship("EstimateRoom", back_populates="estimate", cascade="all, delete-orphan", order_by="EstimateRoom.id")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Numeric
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, Numeric
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -6,13 +6,16 @@ class EstimateItem(Base):
     __tablename__ = "estimate_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("estimate_rooms.id"), nullable=False)
+    room_id = Column(Integer, ForeignKey("estimate_rooms.id"), nullable=False, index=True)
     price_item_id = Column(Integer, ForeignKey("price_items.id"), nullable=True)  # Null для кастомных
     name = Column(String(255), nullable=False)
     unit = Column(String(20), nullable=False)
     quantity = Column(Numeric(10, 2), nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
     sum = Column(Numeric(12, 2), nullable=False)
+    # Снимок категории прайса на момент сохранения (КП не меняется при правке категорий)
+    category_name = Column(String(100), nullable=False, default="")
+    is_equipment = Column(Boolean, nullable=False, default=False)
     
     # Relationships
     room = relationship("EstimateRoom", back_populates="items")
@@ -6,11 +6,11 @@ class EstimateRoom(Base):
     __tablename__ = "estimate_rooms"
     
     id = Column(Integer, primary_key=True, index=True)
-    estimate_id = Column(Integer, ForeignKey("estimates.id"), nullable=False)
+    estimate_id = Column(Integer, ForeignKey("estimates.id"), nullable=False, index=True)
     name = Column(String(100), nullable=False)
     area = Column(Numeric(10, 2), default=0)
     subtotal = Column(Numeric(12, 2), default=0)
     
     # Relationships
     estimate = relationship("Estimate", back_populates="rooms")
-    items = relationship("EstimateItem", back_populates="room", cascade="all, delete-orphan")
+    items = relationship("EstimateItem", back_populates="room", cascade="all, delete-orphan", order_by="EstimateItem.id")
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Date, Enum, ForeignKey, Integer, Numeric
+from app.database import Base
+from app.models.estimate import EstimateStatus
+
+class EstimateDailyStat(Base):
+    """Rollup of a company's estimates per creation day (UTC) and status.
+
+    Kept in step with the estimates by ``estimate_stats_service`` in the same
+    transaction as every create / update / delete, so analytics read this table
+    instead of the estimates.
+    """
+    __tablename__ = "estimate_daily_stats"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(EstimateStatus), primary_key=True)
+    estimate_count = Column(Integer, nullable=False, default=0)
+    total_sum = Column(Numeric(14, 2), nullable=False, default=0)  # До скидок
+    final_sum = Column(Numeric(14, 2), nullable=False, default=0)  # К оплате
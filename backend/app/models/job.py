@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(Base):
+    __tablename__ = "jobs"
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex, not guessable
+    kind = Column(String(20), nullable=False)  # "transcribe" | "parse"
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    result = Column(Text, nullable=True)  # JSON
+    progress = Column(Text, nullable=True)  # JSON, partial results while running
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, DateTime, Integer, String, ForeignKey, Numeric
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+class RoomTemplate(Base):
+    """A company's reusable room (typical bathroom, corridor...) that can be added to any estimate."""
+    __tablename__ = "room_templates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    area = Column(Numeric(10, 2), default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    items = relationship("RoomTemplateItem", back_populates="template", cascade="all, delete-orphan",
+                         order_by="RoomTemplateItem.id")
+
+class RoomTemplateItem(Base):
+    __tablename__ = "room_template_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    template_id = Column(Integer, ForeignKey("room_templates.id", ondelete="CASCADE"), nullable=False, index=True)
+    price_item_id = Column(Integer, ForeignKey("price_items.id", ondelete="SET NULL"), nullable=True)  # Null для кастомных
+    name = Column(String(255), nullable=False)
+    unit = Column(String(20), nullable=False)
+    quantity = Column(Numeric(10, 2), nullable=False)
+    price = Column(Numeric(10, 2), nullable=False)  # Цена кастомной строки; для позиций прайса берётся текущая
+
+    # Relationships
+    template = relationship("RoomTemplate", back_populates="items")
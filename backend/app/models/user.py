@@ -17,6 +17,7 @@ class User(Base):
     # Usage statistics
     total_tokens_used = Column(Integer, default=0)
     total_api_cost = Column(Numeric(10, 4), default=0)  # in USD
+    parse_cache_hits = Column(Integer, default=0)  # parses served from cache, no tokens spent
     
     # Relationships
     company = relationship("Company", back_populates="user", uselist=False)
@@ -6,9 +6,17 @@ from .price import (
 )
 from .estimate import (
     EstimateCreate, EstimateUpdate, EstimateResponse, EstimateStatus,
-    EstimateRoomCreate, EstimateRoomResponse,
-    EstimateItemCreate, EstimateItemResponse,
+    EstimateCloneRequest, EstimateRoomFromTemplate,
+    EstimateSummary, EstimateSummaryPage, EstimateSearchResult, EstimateSearchPage,
+    EstimateStatusStats, EstimateStatsPoint, EstimateStats,
+    EstimateRoomCreate, EstimateRoomUpdate, EstimateRoomResponse,
+    EstimateItemCreate, EstimateItemUpdate, EstimateItemResponse,
     EstimateParseResponse
 )
-from .pdf import PdfGenerateRequest, PdfPreviewResponse
+from .room_template import (
+    RoomTemplateCreate, RoomTemplateFromRoom, RoomTemplateResponse,
+    RoomTemplateItemCreate, RoomTemplateItemResponse
+)
+from .pdf import PdfGenerateRequest, PdfBatchRequest, PdfPreviewResponse
 from .activity_log import ActivityLogResponse
+from .job import JobResponse
@@ -1,7 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 from decimal import Decimal
-from datetime import datetime
+from datetime import date, datetime
 from app.models.estimate import EstimateStatus
 
 # Estimate Item
@@ -16,10 +16,15 @@ class EstimateItemBase(BaseModel):
 class EstimateItemCreate(EstimateItemBase):
     pass
 
+class EstimateItemUpdate(EstimateItemBase):
+    id: Optional[int] = None  # Existing item to update in place; new item if missing
+
 class EstimateItemResponse(EstimateItemBase):
     id: int
     room_id: int
     sum: Decimal
+    category_name: str = ""
+    is_equipment: bool = False
 
     class Config:
         from_attributes = True
@@ -33,6 +38,10 @@ class EstimateRoomBase(BaseModel):
 class EstimateRoomCreate(EstimateRoomBase):
     items: List[EstimateItemCreate] = []
 
+class EstimateRoomUpdate(EstimateRoomBase):
+    id: Optional[int] = None  # Existing room to update in place; new room if missing
+    items: List[EstimateItemUpdate] = []
+
 class EstimateRoomResponse(EstimateRoomBase):
     id: int
     estimate_id: int
@@ -61,22 +70,86 @@ class EstimateUpdate(BaseModel):
     client_address: Optional[str] = None
     status: Optional[EstimateStatus] = None
     last_step: Optional[int] = None
-    rooms: Optional[List[EstimateRoomCreate]] = None
+    rooms: Optional[List[EstimateRoomUpdate]] = None
     discount_pr_work: Optional[Decimal] = None
     discount_equipment: Optional[Decimal] = None
 
+class EstimateCloneRequest(BaseModel):
+    """Fields of the copy that differ from the source; everything else is copied."""
+    client_name: Optional[str] = None
+    client_phone: Optional[str] = None
+    client_address: Optional[str] = None
+    status: EstimateStatus = EstimateStatus.DRAFT
+
+class EstimateRoomFromTemplate(BaseModel):
+    template_id: int
+    name: Optional[str] = None  # Template's name if missing
+    area: Optional[Decimal] = None  # Template's area if missing
+
 class EstimateResponse(EstimateBase):
     id: int
     company_id: int
     estimate_date: Optional[datetime] = None
     total_area: Decimal
-    total_sum: Decimal
+    total_sum: Decimal  # Before discounts
+    subtotal_main: Decimal = 0
+    subtotal_equipment: Decimal = 0
+    discount_main_sum: Decimal = 0
+    discount_equipment_sum: Decimal = 0
+    final_sum: Decimal = 0  # Payable, after discounts
     created_at: Optional[datetime] = None
     rooms: List[EstimateRoomResponse] = []
 
     class Config:
         from_attributes = True
 
+class EstimateSummary(BaseModel):
+    id: int
+    client_name: str
+    client_phone: Optional[str] = ""
+    client_address: Optional[str] = ""
+    status: EstimateStatus
+    last_step: Optional[int] = 1
+    total_area: Decimal
+    total_sum: Decimal
+    final_sum: Decimal
+    room_count: int
+    estimate_date: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class EstimateSummaryPage(BaseModel):
+    items: List[EstimateSummary]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= for the next page; None on the last page
+
+class EstimateSearchResult(EstimateSummary):
+    rank: float
+
+class EstimateSearchPage(BaseModel):
+    items: List[EstimateSearchResult]
+    next_offset: Optional[int] = None  # Pass as ?offset= for the next page; None on the last page
+
+class EstimateStatusStats(BaseModel):
+    status: EstimateStatus
+    count: int
+    total_sum: Decimal
+    final_sum: Decimal
+
+class EstimateStatsPoint(EstimateStatusStats):
+    period_start: date  # First day of the day / month
+
+class EstimateStats(BaseModel):
+    period: Literal["day", "month"]
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    count: int
+    total_sum: Decimal  # Before discounts
+    final_sum: Decimal  # Payable
+    by_status: List[EstimateStatusStats]
+    series: List[EstimateStatsPoint]
+
 # AI Parsing Types
 class UnknownItem(BaseModel):
     original_text: Optional[str] = None  # May be missing in some AI responses
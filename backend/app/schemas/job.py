@@ -0,0 +1,30 @@
+import json
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, field_validator
+
+from app.models.job import JobStatus
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    result: Optional[Any] = None
+    progress: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_validator("result", "progress", mode="before")
+    @classmethod
+    def decode_result(cls, value: Any) -> Any:
+        # Stored as JSON text
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,19 @@
+from datetime import date
 from pydantic import BaseModel
+from typing import List, Optional
+from app.models.estimate import EstimateStatus
 
 class PdfGenerateRequest(BaseModel):
     estimate_id: int
 
+class PdfBatchRequest(BaseModel):
+    # Either explicit ids or a filter over the company's estimates (all of them if empty)
+    estimate_ids: Optional[List[int]] = None
+    status: Optional[EstimateStatus] = None
+    exclude_draft: bool = False  # everything that went out, without listing ids
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None  # inclusive
+
 class PdfPreviewResponse(BaseModel):
     pdf_base64: str
     filename: str
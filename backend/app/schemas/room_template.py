@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from decimal import Decimal
+from datetime import datetime
+
+# Room Template Item
+class RoomTemplateItemBase(BaseModel):
+    name: str
+    unit: str
+    quantity: Decimal
+    price: Decimal = 0  # Used for custom lines; price list items take the current price
+    price_item_id: Optional[int] = None
+
+class RoomTemplateItemCreate(RoomTemplateItemBase):
+    pass
+
+class RoomTemplateItemResponse(RoomTemplateItemBase):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+# Room Template
+class RoomTemplateBase(BaseModel):
+    name: str
+    area: Decimal = 0
+
+class RoomTemplateCreate(RoomTemplateBase):
+    items: List[RoomTemplateItemCreate] = []
+
+class RoomTemplateFromRoom(BaseModel):
+    room_id: int  # Estimate room to save as a template
+    name: Optional[str] = None  # Room's name if missing
+
+class RoomTemplateResponse(RoomTemplateBase):
+    id: int
+    created_at: Optional[datetime] = None
+    items: List[RoomTemplateItemResponse] = []
+
+    class Config:
+        from_attributes = True
@@ -22,6 +22,7 @@ class UserResponse(UserBase):
     created_at: datetime
     total_tokens_used: int = 0
     total_api_cost: Decimal = Decimal(0)
+    parse_cache_hits: int = 0
     company: Optional[CompanyResponse] = None
 
     class Config:
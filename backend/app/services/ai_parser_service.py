@@ -1,11 +1,21 @@
 import json
 import re
 import logging
-import httpx
 from decimal import Decimal
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from app.config import settings
-from app.models import PriceItem
+from app.database import SessionLocal
+from app.models import Estimate, EstimateItem, EstimateRoom, PriceItem, User
+from app.services.openrouter_client import openrouter_client
+from app.services.parse_cache import parse_cache_service
+from app.services.price_catalog import PriceCatalog, price_catalog_service
+from app.services.candidate_index import CandidateIndex
+from app.services.price_matcher import IntervalSet, PriceMatcher
+from app.services.pricing import line_sum
+from app.services.parser_prompt import PromptCatalog, build_messages, build_prompt_catalog
+from app.services.stream_json import RoomsStreamParser
+from sqlalchemy import func
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
@@ -13,17 +23,13 @@ logger = logging.getLogger(__name__)
 class AIParserService:
     def __init__(self):
         self.api_key = settings.OPENROUTER_API_KEY
-        self.base_url = settings.OPENROUTER_BASE_URL
         self.model = settings.OPENROUTER_PARSER_MODEL
     
-    def parse_transcript(self, db: Session, company_id: int, transcript: str, user=None) -> Dict[str, Any]:
-        # Get price items for matching
-        price_items = db.query(PriceItem).filter(
-            PriceItem.company_id == company_id,
-            PriceItem.is_active == True
-        ).all()
+    async def parse_transcript(self, db: Session, company_id: int, transcript: str, user=None) -> Dict[str, Any]:
+        # Get price items for matching (served from the in-process catalog cache)
+        catalog = await run_in_threadpool(price_catalog_service.get, db, company_id)
         
-        logger.info(f"[PARSER] company_id={company_id}, found {len(price_items)} price items")
+        logger.info(f"[PARSER] company_id={company_id}, found {len(catalog.active_items)} price items")
         logger.info(f"[PARSER] API key present: {bool(self.api_key)}, model: {self.model}")
         logger.info(f"[PARSER] Transcript: {transcript[:200]}...")
         
@@ -34,74 +40,233 @@ class AIParserService:
         # If API key not configured, use fallback regex parser
         if not self.api_key:
             logger.warning("[PARSER] No API key — using FALLBACK regex parser")
-            return self._fallback_parse(transcript, price_items)
+            return self._fallback_parse(catalog, transcript)
         
-        # Use OpenRouter AI parser
+        cache_key = parse_cache_service.make_key(transcript, catalog.fingerprint, self.model)
+        cached = parse_cache_service.get(cache_key)
+        if cached is not None:
+            logger.info(f"[PARSER] Cache hit {cache_key[:12]} — skipping OpenRouter call")
+            if user:
+                await run_in_threadpool(self._record_cache_hit, db, user)
+            return cached
+
+        staple_ids: List[int] = []
+        if self._shortlist_enabled(catalog):
+            staple_ids = await run_in_threadpool(
+                catalog.derive, "staple_ids", lambda c: self._load_staple_ids(db, c),
+                settings.PARSER_STAPLES_TTL_SECONDS
+            )
+
+        try:
+            result, usage = await self.parse_with_ai(catalog, transcript, staple_ids)
+        except Exception as e:
+            logger.error(f"[PARSER] OpenRouter API ERROR: {e}", exc_info=True)
+            logger.warning("[PARSER] Falling back to regex parser")
+            return self._fallback_parse(catalog, transcript)
+
+        if "error" not in result:
+            parse_cache_service.put(cache_key, result)
+
+        # Update user statistics if user provided (never crash the result)
+        if user and usage:
+            await run_in_threadpool(self._record_usage, db, user, usage)
+        return result
+
+    async def parse_with_ai(self, catalog: PriceCatalog, transcript: str, staple_ids: List[int] = ()) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Parse via OpenRouter without touching the database. Returns (result, usage)."""
         logger.info("[PARSER] Using AI parser (OpenRouter)")
-        items_text = self._format_items_for_prompt(price_items)
-        prompt = self._build_prompt(items_text, transcript)
+        prompt_catalog = catalog.derive("prompt_catalog", lambda c: build_prompt_catalog(c.active_items))
+        shortlist = self._shortlist(catalog, transcript, staple_ids)
+        messages = build_messages(shortlist or prompt_catalog, transcript)
         
+        response_text, usage = await self._call_openrouter(messages)
+        if shortlist is not None and self._uses_codes_outside(response_text, shortlist):
+            logger.warning("[PARSER] Model referenced items outside the shortlist — retrying with the full price list")
+            response_text, retry_usage = await self._call_openrouter(build_messages(prompt_catalog, transcript))
+            usage = self._merge_usage(usage, retry_usage)
+        logger.info(f"[PARSER] AI response length: {len(response_text)} chars")
+        # Always log the raw response for debugging recognition issues
+        logger.info(f"[PARSER] AI raw response: ---{response_text}---")
+        self._log_usage(usage, prompt_catalog, shortlist)
+        result = self._parse_response(response_text, list(catalog.active_items), prompt_catalog)
+        
+        rooms = result.get('rooms', [])
+        total_items = sum(len(r.get('items', [])) for r in rooms)
+        unknown = len(result.get('unknown_items', []))
+        logger.info(f"[PARSER] Result: {len(rooms)} rooms, {total_items} items matched, {unknown} unknown")
+        return result, usage
+
+    async def stream_parse(self, db: Session, company_id: int, transcript: str, user_id: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Load everything the parse needs from the database, then return an event stream
+        that does not use ``db`` (the request session may be closed while streaming).
+        """
+        catalog = await run_in_threadpool(price_catalog_service.get, db, company_id)
+        staple_ids: List[int] = []
+        if self.api_key and self._shortlist_enabled(catalog):
+            staple_ids = await run_in_threadpool(
+                catalog.derive, "staple_ids", lambda c: self._load_staple_ids(db, c),
+                settings.PARSER_STAPLES_TTL_SECONDS
+            )
+        return self._stream_events(catalog, transcript, staple_ids, user_id)
+
+    async def _stream_events(self, catalog: PriceCatalog, transcript: str, staple_ids: List[int], user_id: Optional[int]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields "room", "item" (with running room subtotal and total) and "room_done" events
+        while the model answers, then one authoritative "result" event with the full parse.
+        """
+        if not transcript or not transcript.strip():
+            yield {"type": "result", "rooms": [], "unknown_items": [], "total_area": 0, "total_sum": 0}
+            return
+        if not self.api_key:
+            logger.warning("[PARSER] No API key — using FALLBACK regex parser")
+            yield {"type": "result", **self._fallback_parse(catalog, transcript)}
+            return
+
+        cache_key = parse_cache_service.make_key(transcript, catalog.fingerprint, self.model)
+        cached = parse_cache_service.get(cache_key)
+        if cached is not None:
+            logger.info(f"[PARSER] Cache hit {cache_key[:12]} — skipping OpenRouter call")
+            for event in self._replay_events(cached):
+                yield event
+            if user_id:
+                await run_in_threadpool(self._record_for_user, user_id, self._record_cache_hit)
+            yield {"type": "result", **cached}
+            return
+
+        logger.info("[PARSER] Using streaming AI parser (OpenRouter)")
+        prompt_catalog = catalog.derive("prompt_catalog", lambda c: build_prompt_catalog(c.active_items))
+        shortlist = self._shortlist(catalog, transcript, staple_ids)
+        payload = {
+            "model": self.model,
+            "messages": build_messages(shortlist or prompt_catalog, transcript),
+            "max_tokens": 4096,
+            "temperature": 0.1,
+            "usage": {"include": True}
+        }
+        items_map = {item.id: item for item in catalog.active_items}
+        parser = RoomsStreamParser()
+        usage: Dict[str, Any] = {}
+        subtotals: Dict[int, float] = {}
+        total_sum = 0.0
+
         try:
-            response_text, usage = self._call_openrouter(prompt)
-            logger.info(f"[PARSER] AI response length: {len(response_text)} chars")
-            # Always log the raw response for debugging recognition issues
+            async for chunk in openrouter_client.stream_chat_completion(payload, timeout=settings.OPENROUTER_PARSE_TIMEOUT):
+                if chunk.get("error"):
+                    raise ValueError(f"API Error: {chunk['error'].get('message', 'Unknown error')}")
+                if chunk.get("usage"):
+                    usage = chunk["usage"]
+                choices = chunk.get("choices") or []
+                delta = (choices[0].get("delta") or {}).get("content") if choices else None
+                if not delta:
+                    continue
+
+                for kind, event in parser.feed(delta):
+                    if kind == "room":
+                        yield {"type": "room", **event}
+                    elif kind == "item":
+                        room_index = event["room_index"]
+                        item = self._resolve_item(event["item"], items_map, prompt_catalog)
+                        subtotals[room_index] = subtotals.get(room_index, 0) + item["sum"]
+                        total_sum += item["sum"]
+                        yield {
+                            "type": "item",
+                            "room_index": room_index,
+                            "item": item,
+                            "room_subtotal": round(subtotals[room_index], 2),
+                            "total_sum": round(total_sum, 2),
+                        }
+                    else:
+                        yield {"type": "room_done", "index": event["index"], "subtotal": round(subtotals.get(event["index"], 0), 2)}
+
+            response_text = parser.buffer
+            if shortlist is not None and self._uses_codes_outside(response_text, shortlist):
+                logger.warning("[PARSER] Model referenced items outside the shortlist — retrying with the full price list")
+                response_text, retry_usage = await self._call_openrouter(build_messages(prompt_catalog, transcript))
+                usage = self._merge_usage(usage, retry_usage)
             logger.info(f"[PARSER] AI raw response: ---{response_text}---")
-            logger.info(f"[PARSER] Usage: {usage}")
-            result = self._parse_response(response_text, price_items)
-            
-            rooms = result.get('rooms', [])
-            total_items = sum(len(r.get('items', [])) for r in rooms)
-            unknown = len(result.get('unknown_items', []))
-            logger.info(f"[PARSER] Result: {len(rooms)} rooms, {total_items} items matched, {unknown} unknown")
-            
-            # Update user statistics if user provided (never crash the result)
-            if user and usage:
-                try:
-                    tokens_used = usage.get("total_tokens") or 0
-                    cost = tokens_used * 0.000002
-                    
-                    user.total_tokens_used = (user.total_tokens_used or 0) + tokens_used
-                    user.total_api_cost = float(user.total_api_cost or 0) + cost
-                    db.commit()
-                except Exception as stats_err:
-                    logger.warning(f"[PARSER] Stats update failed (non-critical): {stats_err}")
-                    db.rollback()
-            
-            return result
+            self._log_usage(usage, prompt_catalog, shortlist)
+            result = self._parse_response(response_text, list(catalog.active_items), prompt_catalog)
+            if "error" not in result:
+                parse_cache_service.put(cache_key, result)
         except Exception as e:
-            logger.error(f"[PARSER] OpenRouter API ERROR: {e}", exc_info=True)
+            logger.error(f"[PARSER] OpenRouter streaming ERROR: {e}", exc_info=True)
             logger.warning("[PARSER] Falling back to regex parser")
-            return self._fallback_parse(transcript, price_items)
+            result = self._fallback_parse(catalog, transcript)
+
+        if user_id and usage:
+            await run_in_threadpool(self._record_for_user, user_id, self._record_usage, usage)
+        yield {"type": "result", **result}
+
+    @staticmethod
+    def _replay_events(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """The "room" / "item" / "room_done" events a live stream would have produced for ``result``."""
+        events = []
+        total_sum = 0.0
+        for index, room in enumerate(result.get("rooms", [])):
+            events.append({"type": "room", "index": index, "name": room.get("name"), "area": room.get("area")})
+            subtotal = 0.0
+            for item in room.get("items", []):
+                subtotal += item.get("sum") or 0
+                total_sum += item.get("sum") or 0
+                events.append({
+                    "type": "item",
+                    "room_index": index,
+                    "item": item,
+                    "room_subtotal": round(subtotal, 2),
+                    "total_sum": round(total_sum, 2),
+                })
+            events.append({"type": "room_done", "index": index, "subtotal": round(subtotal, 2)})
+        return events
+
+    def _record_for_user(self, user_id: int, record, *args) -> None:
+        """Run a stats recorder (``_record_usage`` / ``_record_cache_hit``) in a session of its own."""
+        db = SessionLocal()
+        try:
+            user = db.query(User).filter(User.id == user_id).first()
+            if user:
+                record(db, user, *args)
+        finally:
+            db.close()
+
+    def _record_cache_hit(self, db: Session, user) -> None:
+        try:
+            user.parse_cache_hits = (user.parse_cache_hits or 0) + 1
+            db.commit()
+        except Exception as stats_err:
+            logger.warning(f"[PARSER] Stats update failed (non-critical): {stats_err}")
+            db.rollback()
 
-    def _call_openrouter(self, prompt: str) -> tuple:
+    def _record_usage(self, db: Session, user, usage: Dict[str, Any]) -> None:
+        try:
+            tokens_used = usage.get("total_tokens") or 0
+            cost = tokens_used * 0.000002
+            
+            user.total_tokens_used = (user.total_tokens_used or 0) + tokens_used
+            user.total_api_cost = float(user.total_api_cost or 0) + cost
+            db.commit()
+        except Exception as stats_err:
+            logger.warning(f"[PARSER] Stats update failed (non-critical): {stats_err}")
+            db.rollback()
+
+    async def _call_openrouter(self, messages: List[Dict[str, Any]]) -> tuple:
         """Call OpenRouter API (OpenAI-compatible). Returns (response_text, usage_dict)."""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:8000",  # Required by OpenRouter
-            "X-Title": "Ceiling KP Generator"
-        }
-        
         payload = {
             "model": self.model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "max_tokens": 4096,
-            "temperature": 0.1
+            "temperature": 0.1,
+            "usage": {"include": True}  # Report cached prompt tokens
         }
         
-        with httpx.Client(timeout=60.0) as client:
-            response = client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            response.raise_for_status()
-            data = response.json()
-            text = data["choices"][0]["message"]["content"]
-            usage = data.get("usage", {})
-            return text, usage
+        response = await openrouter_client.chat_completion(payload, timeout=settings.OPENROUTER_PARSE_TIMEOUT)
+        response.raise_for_status()
+        data = response.json()
+        text = data["choices"][0]["message"]["content"]
+        usage = data.get("usage", {})
+        return text, usage
 
-    def _fallback_parse(self, transcript: str, price_items: List[PriceItem]) -> Dict[str, Any]:
+    def _fallback_parse(self, catalog: PriceCatalog, transcript: str) -> Dict[str, Any]:
         """Simple regex-based parser when AI is not available."""
         rooms = []
         unknown_items = []
@@ -116,19 +281,13 @@ class AIParserService:
         found_rooms = {}
         
         # Track used text ranges to avoid double matching
-        matched_ranges = []
-
-        def is_overlapping(start, end):
-            for s, e in matched_ranges:
-                if max(start, s) < min(end, e):
-                    return True
-            return False
+        matched_ranges = IntervalSet()
 
         # 1. Parse Rooms
         for pattern in room_patterns:
             for match in re.finditer(pattern, text_lower):
                 start, end = match.span()
-                if is_overlapping(start, end): continue
+                if matched_ranges.overlaps(start, end): continue
                 
                 room_name = match.group(1).capitalize()
                 area_group = match.group(2)
@@ -138,85 +297,21 @@ class AIParserService:
                     area = float(area_group.replace(',', '.'))
                     if room_name not in found_rooms:
                         found_rooms[room_name] = {'name': room_name, 'area': area, 'items': [], 'subtotal': 0}
-                        matched_ranges.append((start, end))
+                        matched_ranges.add(start, end)
         
         # If no rooms found, create default room
         if not found_rooms:
             found_rooms['Основная'] = {'name': 'Основная', 'area': 0, 'items': [], 'subtotal': 0}
         
-        # 2. Build items map for price lookup
-        # Sort keys by length desc to match longest phrases first
-        items_map = {}
-        keys_to_check = []
-        
-        for item in price_items:
-            # Main name
-            name_key = item.name.lower()
-            items_map[name_key] = item
-            keys_to_check.append(name_key)
-            
-            # Synonyms
-            if item.synonyms:
-                for syn in item.synonyms.split(','):
-                    s = syn.strip().lower()
-                    if s and len(s) > 2: # Ignore very short synonyms
-                        items_map[s] = item
-                        keys_to_check.append(s)
-        
-        # Sort keys: longest first
-        keys_to_check = sorted(list(set(keys_to_check)), key=len, reverse=True)
-        
-        parsed_items = []
-
-        # 3. Generic Item Parsing
-        # Pattern A: Quantity + Key (e.g. "5 lamps")
-        # Pattern B: Key + Quantity (e.g. "lamps 5")
-        
-        for key in keys_to_check:
-            clean_key = re.escape(key)
-            patterns = [
-                # Qty ... Key
-                r'(\d+(?:[.,]\d+)?)\s*(?:шт|пог\.?|м\.?|м2)?\s*[\-xх\*]?\s*' + clean_key + r'\b',
-                # Key ... Qty
-                r'\b' + clean_key + r'\b\s*[:\-]?\s*(\d+(?:[.,]\d+)?)'
-            ]
-            
-            found_for_key = False
-            for pat in patterns:
-                for match in re.finditer(pat, text_lower):
-                    start, end = match.span()
-                    if is_overlapping(start, end): continue
-                    
-                    qty_str = match.group(1).replace(',', '.')
-                    try:
-                        quantity = float(qty_str)
-                        price_item = items_map[key]
-                        
-                        # Check if we already have this item to aggregate?
-                        # For now, append new
-                        parsed_items.append(self._create_item(price_item.name, quantity, price_item))
-                        matched_ranges.append((start, end))
-                        found_for_key = True
-                    except ValueError:
-                        pass
-            
-            # Special case: Key mentioned without quantity? (Assume 1 or ignore?)
-            # Usually strict parsing is safer, but "Люстра" usually means 1.
-            # Let's skip valid overlap check for pure keyword if strict matching desired.
-            # But let's support "Single mention = 1" if not matched yet
-            pattern_single = r'\b' + clean_key + r'\b'
-            if not found_for_key: 
-                 for match in re.finditer(pattern_single, text_lower):
-                    start, end = match.span()
-                    if is_overlapping(start, end): continue
-                    
-                    # Assume 1
-                    price_item = items_map[key]
-                    parsed_items.append(self._create_item(price_item.name, 1.0, price_item))
-                    matched_ranges.append((start, end))
+        # 2. Generic Item Parsing: one pass of the company's compiled matcher.
+        # Quantity may precede ("5 lamps") or follow ("lamps 5") the key; a bare mention counts as 1.
+        matcher = catalog.derive("matcher", lambda c: PriceMatcher(c.active_items))
+        parsed_items = [
+            self._create_item(price_item.name, quantity, price_item)
+            for price_item, quantity in matcher.find_items(text_lower, matched_ranges)
+        ]
 
-        
-        # 4. Add items to first room (Simple logic: all items go to first/only room)
+        # 3. Add items to first room (Simple logic: all items go to first/only room)
         # Ideally we should split by context (items after room declaration), but this is a simple fallback.
         first_room_name = list(found_rooms.keys())[0]
         room_area = found_rooms[first_room_name].get('area', 0)
@@ -225,7 +320,7 @@ class AIParserService:
             # If item is measured in m² and room has area, use room area as quantity
             if item.get('unit') == 'м²' and room_area > 0:
                 item['quantity'] = room_area
-                item['sum'] = round(room_area * item.get('price', 0), 2)
+                item['sum'] = float(line_sum(room_area, item.get('price', 0)))
             
             found_rooms[first_room_name]['items'].append(item)
             found_rooms[first_room_name]['subtotal'] += item.get('sum', 0)
@@ -249,60 +344,92 @@ class AIParserService:
             'unit': price_item.unit if price_item else 'шт',
             'quantity': quantity,
             'price': float(price_item.price) if price_item else 0,
-            'sum': quantity * float(price_item.price) if price_item else 0
+            'sum': float(line_sum(quantity, price_item.price)) if price_item else 0
         }
 
-    def _format_items_for_prompt(self, items: List[PriceItem]) -> str:
-        lines = []
-        for item in items:
-            synonyms = f" (синонимы: {item.synonyms})" if item.synonyms else ""
-            lines.append(f"- ID:{item.id} | {item.name} | {item.unit} | {item.price} руб{synonyms}")
-        return "\n".join(lines)
-    
-    def _build_prompt(self, items_text: str, transcript: str) -> str:
-        return f"""Ты — интеллектуальный помощник замерщика натяжных потолков. Твоя задача — преобразовать текст транскрибации в структурированный JSON.
-
-ПРАЙС-ЛИСТ (Доступные позиции):
-{items_text}
-
-ТРАНСКРИПЦИЯ ЗАМЕРА:
-"{transcript}"
-
-ИНСТРУКЦИИ:
-1. ИЗВЛЕЧЕНИЕ: Найди ВСЕ упомянутые комнаты, их площади и ВСЕ позиции (материалы, услуги, оборудование). Не пропускай общие слова типа "установка", "монтаж", "светильники".
-2. СОПОСТАВЛЕНИЕ: Для каждой позиции найди наиболее подходящую в ПРАЙС-ЛИСТЕ.
-   - Используй название и синонимы.
-   - Если позиция явно соответствует товару из прайса по смыслу (например, "вставка" -> "Вставка-плинтус"), выбирай её.
-3. НЕИЗВЕСТНОЕ: Если позиция упомянута, но в прайс-листе НЕТ даже близко похожего варианта, ОБЯЗАТЕЛЬНО добавь её в массив `unknown_items` с текстом из транскрипции.
-4. КОЛИЧЕСТВО: Точно извлекай числа. "4 штуки" -> 4, "15 метров" -> 15.
-
-ФОРМАТ ОТВЕТА (Строго JSON):
-{{
-  "rooms": [
-    {{
-      "name": "Название комнаты",
-      "area": число_или_null,
-      "items": [
-        {{
-          "price_item_id": ID_из_прайса_или_null,
-          "name": "Название из прайса (или транскрипции если не в прайсе)",
-          "unit": "ед.изм",
-          "quantity": число,
-          "price": число_цены
-        }}
-      ]
-    }}
-  ],
-  "unknown_items": [
-    {{ "original_text": "Нераспознанная позиция" }}
-  ]
-}}
-
-ПРИМЕР: "Кухня 10м, светильник 5шт, монтаж люстры."
-Должно вернуть: Комнату с площадью 10, позицию светильника и позицию монтажа люстры (если они есть в прайсе).
-"""
-
-    def _parse_response(self, response_text: str, price_items: List[PriceItem]) -> Dict[str, Any]:
+    def _shortlist_enabled(self, catalog: PriceCatalog) -> bool:
+        """Shortlist only price lists too big to send whole: a shortlist differs per transcript,
+        so unlike the full list it never hits the provider's prompt cache."""
+        min_items = settings.PARSER_SHORTLIST_MIN_ITEMS
+        if min_items <= 0 or len(catalog.active_items) < min_items:
+            return False
+        prompt_catalog = catalog.derive("prompt_catalog", lambda c: build_prompt_catalog(c.active_items))
+        return prompt_catalog.compact_tokens > settings.PARSER_FULL_CATALOG_MAX_TOKENS
+
+    def _shortlist(self, catalog: PriceCatalog, transcript: str, staple_ids: List[int]) -> Optional[PromptCatalog]:
+        """Likely price items for this transcript plus per-category staples, or None to send the full list."""
+        if not self._shortlist_enabled(catalog):
+            return None
+
+        index = catalog.derive("candidate_index", lambda c: CandidateIndex(c.active_items))
+        candidates = index.search(transcript, settings.PARSER_SHORTLIST_SIZE, settings.PARSER_SHORTLIST_MIN_SCORE)
+        selected = {item.id: item for item, _ in candidates}
+        for item_id in staple_ids:
+            selected.setdefault(item_id, catalog.by_id[item_id])
+
+        logger.info(
+            f"[PARSER] Shortlist: {len(candidates)} candidates + staples = {len(selected)} "
+            f"of {len(catalog.active_items)} items"
+        )
+        return build_prompt_catalog(selected.values())
+
+    def _load_staple_ids(self, db: Session, catalog: PriceCatalog) -> List[int]:
+        """The company's most used price items in each category, taken from saved estimates."""
+        per_category = settings.PARSER_STAPLES_PER_CATEGORY
+        if per_category <= 0:
+            return []
+
+        usage_rows = db.query(EstimateItem.price_item_id, func.count(EstimateItem.id)).join(
+            EstimateRoom, EstimateItem.room_id == EstimateRoom.id
+        ).join(
+            Estimate, EstimateRoom.estimate_id == Estimate.id
+        ).filter(
+            Estimate.company_id == catalog.company_id,
+            EstimateItem.price_item_id.isnot(None)
+        ).group_by(EstimateItem.price_item_id).order_by(func.count(EstimateItem.id).desc()).all()
+
+        taken_per_category: Dict[int, int] = {}
+        staple_ids = []
+        for price_item_id, _ in usage_rows:
+            item = catalog.by_id.get(price_item_id)
+            if not item or not item.is_active:
+                continue
+            if taken_per_category.get(item.category_id, 0) < per_category:
+                taken_per_category[item.category_id] = taken_per_category.get(item.category_id, 0) + 1
+                staple_ids.append(item.id)
+        return staple_ids
+
+    def _uses_codes_outside(self, response_text: str, shortlist: PromptCatalog) -> bool:
+        data = self._extract_json(response_text)
+        if not isinstance(data, dict):
+            return False
+        for room in data.get("rooms") or []:
+            for item in room.get("items") or []:
+                code = item.get("price_item_id")
+                if code not in (None, "", "null") and shortlist.resolve(code) is None:
+                    return True
+        return False
+
+    @staticmethod
+    def _merge_usage(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+        merged = dict(second or {})
+        for key in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            merged[key] = ((first or {}).get(key) or 0) + ((second or {}).get(key) or 0)
+        return merged
+
+    def _log_usage(self, usage: Dict[str, Any], prompt_catalog: PromptCatalog, shortlist: Optional[PromptCatalog] = None) -> None:
+        usage = usage or {}
+        details = usage.get("prompt_tokens_details") or {}
+        sent = shortlist or prompt_catalog
+        logger.info(
+            f"[PARSER] Usage: prompt={usage.get('prompt_tokens')}, cached={details.get('cached_tokens', 0)}, "
+            f"completion={usage.get('completion_tokens')}, total={usage.get('total_tokens')}; "
+            f"price list ~{prompt_catalog.legacy_tokens} tokens before compaction, ~{prompt_catalog.compact_tokens} after, "
+            f"~{sent.compact_tokens} sent"
+        )
+
+    @staticmethod
+    def _extract_json(response_text: str) -> Optional[Any]:
         clean_text = response_text.strip()
         if "```json" in clean_text:
              clean_text = clean_text.split("```json")[1].split("```")[0].strip()
@@ -310,8 +437,13 @@ class AIParserService:
              clean_text = clean_text.split("```")[1].split("```")[0].strip()
 
         try:
-            data = json.loads(clean_text)
+            return json.loads(clean_text)
         except json.JSONDecodeError:
+            return None
+
+    def _parse_response(self, response_text: str, price_items: List[PriceItem], prompt_catalog: Optional[PromptCatalog] = None) -> Dict[str, Any]:
+        data = self._extract_json(response_text)
+        if data is None:
             return {"rooms": [], "unknown_items": [], "error": "Failed to parse AI response"}
             
         # Sanitize unknown_items (convert strings to objects if needed)
@@ -334,15 +466,7 @@ class AIParserService:
             area_val = room.get("area")
             total_area += float(area_val) if area_val is not None else 0
             for item in room.get("items", []):
-                if item.get("price_item_id") and item["price_item_id"] in items_map:
-                    price_item = items_map[item["price_item_id"]]
-                    item["price"] = float(price_item.price)
-                    item["name"] = price_item.name
-                    item["unit"] = price_item.unit
-                
-                qty = item.get("quantity")
-                price = item.get("price")
-                item["sum"] = round((float(qty) if qty is not None else 0) * (float(price) if price is not None else 0), 2)
+                self._resolve_item(item, items_map, prompt_catalog)
                 room_subtotal += item["sum"]
             
             room["subtotal"] = room_subtotal
@@ -352,4 +476,21 @@ class AIParserService:
         data["total_sum"] = total_sum
         return data
 
+    @staticmethod
+    def _resolve_item(item: Dict[str, Any], items_map: Dict[int, Any], prompt_catalog: Optional[PromptCatalog]) -> Dict[str, Any]:
+        """Map the model's item onto the price list (in place) and compute its sum."""
+        if prompt_catalog is not None:
+            # The model answers with short catalog codes; map them back to real ids
+            item["price_item_id"] = prompt_catalog.resolve(item.get("price_item_id"))
+        if item.get("price_item_id") and item["price_item_id"] in items_map:
+            price_item = items_map[item["price_item_id"]]
+            item["price"] = float(price_item.price)
+            item["name"] = price_item.name
+            item["unit"] = price_item.unit
+        
+        qty = item.get("quantity")
+        price = item.get("price")
+        item["sum"] = float(line_sum(qty, price))
+        return item
+
 ai_parser_service = AIParserService()
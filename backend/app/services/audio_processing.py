@@ -0,0 +1,201 @@
+"""ffmpeg-based audio preparation for the transcription provider.
+
+Audio is piped through ffmpeg (stdin -> stdout), with no temp files on the
+common path, and the number of concurrent ffmpeg processes is bounded by
+``FFMPEG_MAX_PROCESSES``. Input that is already mono 16 kHz WAV or MP3 is
+sent as is. Long recordings can be decoded to PCM together with the silence
+intervals ffmpeg detects in them, to be cut into segments at pauses.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import struct
+import tempfile
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+TARGET_SAMPLE_RATE = 16000
+PCM_BYTES_PER_SECOND = TARGET_SAMPLE_RATE * 2  # s16le mono
+
+# MP4/QuickTime keep the index (moov atom) at the end of the file as often as not,
+# so ffmpeg has to seek and can't read them from a pipe
+SEEKABLE_INPUT_TYPES = ("audio/mp4", "audio/m4a", "audio/x-m4a", "audio/aac", "video/mp4", "video/quicktime")
+
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?\d+(?:\.\d+)?)")
+
+
+def passthrough_format(data: bytes) -> Optional[str]:
+    """"wav" / "mp3" if the audio is already mono 16 kHz in a format the provider accepts, else None."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav" if _wav_is_target(data) else None
+    if _mp3_is_target(data):
+        return "mp3"
+    return None
+
+
+def _wav_is_target(data: bytes) -> bool:
+    offset = 12
+    while offset + 8 <= len(data):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", data, offset)
+        if chunk_id == b"fmt " and offset + 16 <= len(data):
+            audio_format, channels, sample_rate = struct.unpack_from("<HHI", data, offset + 8)
+            return audio_format == 1 and channels == 1 and sample_rate == TARGET_SAMPLE_RATE
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return False
+
+
+def _mp3_is_target(data: bytes) -> bool:
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Skip the ID3v2 tag: syncsafe size, plus a 10-byte footer if flagged
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        offset = 10 + size + (10 if data[5] & 0x10 else 0)
+    if offset + 4 > len(data):
+        return False
+
+    b0, b1, b2, b3 = data[offset:offset + 4]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return False
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    rate_index = (b2 >> 2) & 0x03
+    channel_mode = (b3 >> 6) & 0x03
+    if version not in _MP3_SAMPLE_RATES or layer != 1 or rate_index == 3:
+        return False
+    return channel_mode == 3 and _MP3_SAMPLE_RATES[version][rate_index] == TARGET_SAMPLE_RATE
+
+
+def plan_segments(duration: float, silences: List[Tuple[float, float]], target: float) -> List[Tuple[float, float]]:
+    """
+    Split [0, duration] into segments of about ``target`` seconds (at most 1.5x),
+    cutting in the middle of the silence closest to the target length.
+    """
+    max_length = target * 1.5
+    pauses = sorted((start + end) / 2 for start, end in silences if end > start)
+    cuts = [0.0]
+    while duration - cuts[-1] > max_length:
+        position = cuts[-1]
+        window = [p for p in pauses if position + target / 2 <= p <= position + max_length]
+        cuts.append(min(window, key=lambda p: abs(p - position - target)) if window else position + target)
+    cuts.append(duration)
+    return list(zip(cuts, cuts[1:]))
+
+
+def parse_silences(ffmpeg_log: str, duration: float) -> List[Tuple[float, float]]:
+    silences = []
+    start = None
+    for kind, value in _SILENCE_RE.findall(ffmpeg_log):
+        if kind == "start":
+            start = max(float(value), 0.0)
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    if start is not None:
+        # Silence running to the end of the recording
+        silences.append((start, duration))
+    return silences
+
+
+class AudioProcessor:
+    def __init__(self):
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(settings.FFMPEG_MAX_PROCESSES)
+        return self._semaphore
+
+    async def prepare(self, audio_data: bytes, mime_type: str = "audio/webm") -> Tuple[bytes, str]:
+        """Audio ready for the provider and its format: passed through when possible, else mono 16 kHz MP3."""
+        fmt = passthrough_format(audio_data)
+        if fmt:
+            logger.info(f"[AUDIO] {len(audio_data)} bytes already mono {TARGET_SAMPLE_RATE} Hz {fmt}, skipping conversion")
+            return audio_data, fmt
+
+        logger.info(f"Converting audio size {len(audio_data)} bytes to MP3...")
+        mp3_data = await self.to_mp3(audio_data, mime_type)
+        logger.info(f"Conversion successful. New size: {len(mp3_data)} bytes")
+        return mp3_data, "mp3"
+
+    async def to_mp3(self, audio_data: bytes, mime_type: str = "audio/webm") -> bytes:
+        output_args = ["-vn", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-f", "mp3", "pipe:1"]
+        stdout, _ = await self._convert(audio_data, mime_type, output_args)
+        return stdout
+
+    async def decode_with_silences(self, audio_data: bytes, mime_type: str = "audio/webm") -> Tuple[bytes, List[Tuple[float, float]]]:
+        """Mono 16 kHz s16le PCM and the (start, end) seconds of the silences in it, in a single ffmpeg pass."""
+        silence_filter = f"silencedetect=noise={settings.TRANSCRIBE_SILENCE_DB}dB:d={settings.TRANSCRIBE_SILENCE_SECONDS}"
+        output_args = ["-vn", "-ac", "1", "-ar", str(TARGET_SAMPLE_RATE), "-af", silence_filter, "-f", "s16le", "pipe:1"]
+        pcm, log = await self._convert(audio_data, mime_type, output_args, loglevel="info")
+        return pcm, parse_silences(log, len(pcm) / PCM_BYTES_PER_SECOND)
+
+    async def pcm_to_mp3(self, pcm: bytes) -> bytes:
+        args = ["-f", "s16le", "-ar", str(TARGET_SAMPLE_RATE), "-ac", "1", "-i", "pipe:0", "-f", "mp3", "pipe:1"]
+        stdout, _ = await self._exec(args, pcm)
+        return stdout
+
+    @staticmethod
+    def slice_pcm(pcm: bytes, start: float, end: float) -> bytes:
+        return pcm[int(start * TARGET_SAMPLE_RATE) * 2:int(end * TARGET_SAMPLE_RATE) * 2]
+
+    async def _convert(self, audio_data: bytes, mime_type: str, output_args: List[str], loglevel: str = "error") -> Tuple[bytes, str]:
+        if (mime_type or "").split(";")[0].strip() not in SEEKABLE_INPUT_TYPES:
+            return await self._exec(["-i", "pipe:0", *output_args], audio_data, loglevel)
+
+        tmp_path = await run_in_threadpool(self._write_temp, audio_data)
+        try:
+            return await self._exec(["-i", tmp_path, *output_args], loglevel=loglevel)
+        finally:
+            await run_in_threadpool(os.unlink, tmp_path)
+
+    async def _exec(self, args: List[str], input_data: Optional[bytes] = None, loglevel: str = "error") -> Tuple[bytes, str]:
+        """Run ffmpeg with ``args`` (stdin fed from ``input_data``); returns (stdout, log). Raises RuntimeError on failure."""
+        if not shutil.which("ffmpeg"):
+            logger.error("ffmpeg not found in system PATH")
+            raise RuntimeError("ffmpeg is not installed on the server. Please rebuild the Docker image.")
+
+        async with self.semaphore:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-hide_banner", "-nostats", "-loglevel", loglevel, *args,
+                stdin=asyncio.subprocess.PIPE if input_data is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await process.communicate(input_data)
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+
+        if process.returncode != 0:
+            error_msg = stderr.decode(errors="replace")[-2000:] or "Unknown ffmpeg error"
+            logger.error(f"ffmpeg conversion failed: {error_msg}")
+            raise RuntimeError(f"FFmpeg conversion failed: {error_msg}")
+        if not stdout:
+            raise RuntimeError("ffmpeg produced empty output")
+        return stdout, stderr.decode(errors="replace")
+
+    @staticmethod
+    def _write_temp(audio_data: bytes) -> str:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".input") as tmp_in:
+            tmp_in.write(audio_data)
+            return tmp_in.name
+
+
+audio_processor = AudioProcessor()
@@ -0,0 +1,62 @@
+"""Character trigram index over price item names and synonyms.
+
+Used to shortlist the price items a transcript is likely to mention before
+the price list is sent to the LLM. Trigrams are taken per word (padded like
+pg_trgm), so inflected forms still score high: "светильников" shares 10 of
+the 11 trigrams of "светильник".
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+_NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD_RE.sub(' ', text.lower().replace('ё', 'е')).strip()
+
+
+def trigrams(text: str) -> Set[str]:
+    result = set()
+    for word in normalize(text).split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i:i + 3])
+    return result
+
+
+class CandidateIndex:
+    def __init__(self, price_items: Iterable[Any]):
+        self.items: List[Any] = list(price_items)
+        # One entry per searchable key (name or synonym): (item index, trigram count)
+        self._keys: List[Tuple[int, int]] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+
+        for item_idx, item in enumerate(self.items):
+            keys = [item.name] + [s for s in (item.synonyms or "").split(',') if s.strip()]
+            for key in keys:
+                grams = trigrams(key)
+                if not grams:
+                    continue
+                key_idx = len(self._keys)
+                self._keys.append((item_idx, len(grams)))
+                for gram in grams:
+                    self._postings[gram].append(key_idx)
+
+    def search(self, text: str, limit: int, min_score: float) -> List[Tuple[Any, float]]:
+        """Items ranked by the best fraction of a key's trigrams found in the text."""
+        hits: Dict[int, int] = defaultdict(int)
+        for gram in trigrams(text):
+            for key_idx in self._postings.get(gram, ()):
+                hits[key_idx] += 1
+
+        best: Dict[int, float] = {}
+        for key_idx, count in hits.items():
+            item_idx, total = self._keys[key_idx]
+            score = count / total
+            if score >= min_score and score > best.get(item_idx, 0):
+                best[item_idx] = score
+
+        ranked = sorted(best.items(), key=lambda pair: (-pair[1], self.items[pair[0]].id))
+        return [(self.items[item_idx], score) for item_idx, score in ranked[:limit]]
@@ -1,103 +1,320 @@
+import base64
+import json
+import re
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from sqlalchemy import case, cast, func, insert, literal, or_, select, tuple_
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.orm import Session, joinedload
-from app.models import Estimate, EstimateRoom, EstimateItem, EstimateStatus, PriceItem, Category
-from app.schemas.estimate import EstimateCreate, EstimateUpdate
-from typing import List, Optional
+from app.config import settings
+from app.models import Estimate, EstimateRoom, EstimateItem, EstimateStatus, RoomTemplate
+from app.services.estimate_stats import estimate_stats_service
+from app.services.pdf_cache import pdf_cache_service
+from app.services.price_catalog import price_catalog_service
+from app.services.pricing import EstimateTotals, compute_totals, line_sum
+from app.schemas.estimate import (
+    EstimateCloneRequest, EstimateCreate, EstimateItemCreate, EstimateRoomUpdate, EstimateUpdate
+)
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+SEARCH_MIN_PHONE_DIGITS = 3
+
+# Estimate columns a clone copies as they are (overridable client fields aside)
+CLONE_COLUMNS = (
+    Estimate.company_id,
+    Estimate.last_step,
+    Estimate.total_area,
+    Estimate.total_sum,
+    Estimate.discount_pr_work,
+    Estimate.discount_equipment,
+    Estimate.subtotal_main,
+    Estimate.subtotal_equipment,
+    Estimate.discount_main_sum,
+    Estimate.discount_equipment_sum,
+    Estimate.final_sum,
+)
+CLONE_ITEM_COLUMNS = (
+    EstimateItem.price_item_id,
+    EstimateItem.name,
+    EstimateItem.unit,
+    EstimateItem.quantity,
+    EstimateItem.price,
+    EstimateItem.sum,
+    EstimateItem.category_name,
+    EstimateItem.is_equipment,
+)
+
+_NON_DIGIT_RE = re.compile(r"\D")
+
+# Columns of the estimate list; rooms and items are only loaded by get_estimate
+SUMMARY_COLUMNS = (
+    Estimate.id,
+    Estimate.client_name,
+    Estimate.client_phone,
+    Estimate.client_address,
+    Estimate.status,
+    Estimate.last_step,
+    Estimate.total_area,
+    Estimate.total_sum,
+    Estimate.final_sum,
+    Estimate.estimate_date,
+    Estimate.created_at,
+)
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """Digits of a phone number, Russian numbers in the 7 form: "8 (916) 123-45-67" -> "79161234567"."""
+    digits = _NON_DIGIT_RE.sub("", phone or "")
+    if len(digits) == 11 and digits.startswith("8"):
+        return "7" + digits[1:]
+    if len(digits) == 10 and digits.startswith("9"):
+        return "7" + digits
+    return digits
+
+
+def _like_pattern(text: str, prefix_only: bool = False) -> str:
+    escaped = text.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    return f"{escaped}%" if prefix_only else f"%{escaped}%"
+
 
 class EstimateService:
+    @staticmethod
+    def _category_snapshot(item_in: EstimateItemCreate, catalog_items: Dict) -> Dict:
+        """Category name and equipment flag of the item's price entry, stored on the item."""
+        price_item = catalog_items.get(item_in.price_item_id)
+        if price_item is None:  # custom line or deleted price entry
+            return {"category_name": "", "is_equipment": False}
+        return {"category_name": price_item.category_name or "", "is_equipment": price_item.is_equipment}
+
     def create_estimate(self, db: Session, company_id: int, estimate_in: EstimateCreate) -> Estimate:
-        # Create Estimate
+        """Create an estimate with its rooms and items in one transaction.
+
+        Totals are computed in memory up front (``pricing``); rooms and items are written with
+        multi-row INSERTs (rooms with RETURNING for their ids), so the number of
+        round trips doesn't grow with the number of rooms.
+        """
+        catalog_items = price_catalog_service.get(db, company_id).by_id
+
+        rooms = []  # (room row, item rows)
+        total_area = Decimal(0)
+        for room_in in estimate_in.rooms:
+            items = []
+            for item_in in room_in.items:
+                items.append(dict(
+                    price_item_id=item_in.price_item_id,
+                    name=item_in.name,
+                    unit=item_in.unit,
+                    quantity=item_in.quantity,
+                    price=item_in.price,
+                    sum=line_sum(item_in.quantity, item_in.price),
+                    **self._category_snapshot(item_in, catalog_items)
+                ))
+            room_subtotal = sum((item["sum"] for item in items), Decimal(0))
+            rooms.append((dict(name=room_in.name, area=room_in.area or 0, subtotal=room_subtotal), items))
+            total_area += Decimal(room_in.area or 0)
+
+        totals = compute_totals(
+            ((item["sum"], item["is_equipment"]) for _, items in rooms for item in items),
+            estimate_in.discount_pr_work, estimate_in.discount_equipment
+        )
+
         estimate = Estimate(
             company_id=company_id,
             client_name=estimate_in.client_name,
             client_phone=estimate_in.client_phone,
+            client_phone_digits=normalize_phone(estimate_in.client_phone),
             client_address=estimate_in.client_address,
             status=estimate_in.status,
             discount_pr_work=estimate_in.discount_pr_work,
-            discount_equipment=estimate_in.discount_equipment
+            discount_equipment=estimate_in.discount_equipment,
+            total_area=total_area,
+            **self._totals_columns(totals)
         )
         db.add(estimate)
+        db.flush()
+
+        if rooms:
+            room_ids = db.scalars(
+                insert(EstimateRoom).returning(EstimateRoom.id, sort_by_parameter_order=True),
+                [dict(room, estimate_id=estimate.id) for room, _ in rooms]
+            ).all()
+            item_rows = [
+                dict(item, room_id=room_id)
+                for room_id, (_, items) in zip(room_ids, rooms)
+                for item in items
+            ]
+            if item_rows:
+                db.execute(insert(EstimateItem), item_rows)
+
+        estimate_stats_service.apply(db, None, estimate_stats_service.snapshot(estimate))
         db.commit()
-        db.refresh(estimate)
-        
-        # Create Rooms and Items
-        total_area = 0
-        total_sum = 0
-        
-        for room_in in estimate_in.rooms:
-            room = EstimateRoom(
-                estimate_id=estimate.id,
-                name=room_in.name,
-                area=room_in.area or 0
-            )
-            db.add(room)
-            db.commit()
-            db.refresh(room)
-            
-            room_subtotal = 0
-            for item_in in room_in.items:
-                item_sum = float(item_in.quantity) * float(item_in.price)
-                item = EstimateItem(
-                    room_id=room.id,
-                    price_item_id=item_in.price_item_id,
-                    name=item_in.name,
-                    unit=item_in.unit,
-                    quantity=item_in.quantity,
-                    price=item_in.price,
-                    sum=item_sum
-                )
-                db.add(item)
-                room_subtotal += item_sum
-            
-            room.subtotal = room_subtotal
-            total_area += float(room.area or 0)
-            total_sum += room_subtotal
-            db.add(room)
-            
-        estimate.total_area = total_area
-        estimate.total_sum = total_sum
-        db.add(estimate)
-        db.commit()
-        db.refresh(estimate)
-        return estimate
+        return self.get_estimate(db, estimate.id)
 
     def get_estimate(self, db: Session, estimate_id: int):
-        # Eager load rooms, items, and price_item -> category
+        # Eager load rooms and items (items carry their category snapshot)
         return db.query(Estimate).options(
-            joinedload(Estimate.rooms)
-            .joinedload(EstimateRoom.items)
-            .joinedload(EstimateItem.price_item)
-            .joinedload(PriceItem.category)
+            joinedload(Estimate.rooms).joinedload(EstimateRoom.items)
         ).filter(Estimate.id == estimate_id).first()
 
+    def _lock_estimate(self, db: Session, estimate_id: int) -> Optional[Estimate]:
+        """``get_estimate`` that locks the estimate row until commit and re-reads it even if the
+        session already holds it. Writes that move the estimate's rollup contribution take
+        their "before" snapshot from here, so concurrent writes of one estimate queue up
+        instead of both subtracting the same old contribution."""
+        return db.query(Estimate).options(
+            joinedload(Estimate.rooms).joinedload(EstimateRoom.items)
+        ).filter(Estimate.id == estimate_id).with_for_update(of=Estimate).populate_existing().first()
+
     def list_estimates(self, db: Session, company_id: int):
         """List all estimates for a company, ordered by creation date descending."""
         return db.query(Estimate).options(
-            joinedload(Estimate.rooms)
-            .joinedload(EstimateRoom.items)
-            .joinedload(EstimateItem.price_item)
-            .joinedload(PriceItem.category)
+            joinedload(Estimate.rooms).joinedload(EstimateRoom.items)
         ).filter(Estimate.company_id == company_id).order_by(Estimate.created_at.desc()).all()
 
+    def list_summaries(
+        self,
+        db: Session,
+        company_id: int,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[EstimateStatus] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Tuple[List, Optional[str]]:
+        """One page of estimate summary rows, newest first, and the cursor of the next page.
+
+        Pages are keyset-paginated on (created_at, id), so a page costs the same
+        however deep it is and estimates created meanwhile don't shift it.
+        Raises ValueError for a malformed cursor.
+        """
+        query = self._summary_query(db, company_id)
+        query = self.filter_estimates(query, status, date_from, date_to)
+        if cursor:
+            query = query.filter(tuple_(Estimate.created_at, Estimate.id) < self._decode_cursor(cursor))
+        rows = query.order_by(Estimate.created_at.desc(), Estimate.id.desc()).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1].created_at, rows[-1].id)
+        return rows, next_cursor
+
+    def search_summaries(self, db: Session, company_id: int, query: str, limit: int, offset: int = 0) -> Tuple[List, Optional[int]]:
+        """Summary rows of estimates whose client name, address or phone match the query, best first.
+
+        Substring and prefix matches work on any database; on PostgreSQL client
+        names and addresses also match fuzzily by pg_trgm word similarity (typos,
+        other word forms), served by the trigram indexes. Phones are compared as
+        normalized digits, so "8 916 123" finds "+7 (916) 123-45-67". Returns the
+        rows and the offset of the next page.
+        """
+        text = query.strip()
+        name_prefix = Estimate.client_name.ilike(_like_pattern(text, prefix_only=True), escape="/")
+        name_match = Estimate.client_name.ilike(_like_pattern(text), escape="/")
+        address_match = Estimate.client_address.ilike(_like_pattern(text), escape="/")
+        matches = [name_match, address_match]
+        rank = (
+            case((name_prefix, 1.0), else_=0.0)
+            + case((name_match, 1.0), else_=0.0)
+            + case((address_match, 0.5), else_=0.0)
+        )
+
+        digits = normalize_phone(text)
+        if len(digits) < 11 and digits.startswith("8"):
+            digits = digits[1:]  # partial number typed with the trunk prefix
+        if len(digits) >= SEARCH_MIN_PHONE_DIGITS:
+            phone_match = Estimate.client_phone_digits.like(f"%{digits}%")
+            matches.append(phone_match)
+            rank = rank + case((phone_match, 2.0), else_=0.0)
+
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(select(func.set_config(
+                "pg_trgm.word_similarity_threshold", str(settings.ESTIMATE_SEARCH_MIN_SIMILARITY), True
+            )))
+            # col %> text: text has a word similar to one in col (commutator of <%, indexable)
+            matches += [Estimate.client_name.op("%>")(text), Estimate.client_address.op("%>")(text)]
+            rank = (
+                rank
+                + func.word_similarity(text, Estimate.client_name)
+                + 0.5 * func.word_similarity(text, Estimate.client_address)
+            )
+
+        rank = rank.label("rank")
+        rows = (
+            self._summary_query(db, company_id, rank)
+            .filter(or_(*matches))
+            .order_by(rank.desc(), Estimate.created_at.desc(), Estimate.id.desc())
+            .offset(offset)
+            .limit(limit + 1)
+            .all()
+        )
+        next_offset = offset + limit if len(rows) > limit else None
+        return rows[:limit], next_offset
+
+    @staticmethod
+    def _summary_query(db: Session, company_id: int, *extra_columns):
+        room_count = (
+            select(func.count(EstimateRoom.id))
+            .where(EstimateRoom.estimate_id == Estimate.id)
+            .correlate(Estimate)
+            .scalar_subquery()
+        )
+        return db.query(*SUMMARY_COLUMNS, room_count.label("room_count"), *extra_columns).filter(
+            Estimate.company_id == company_id
+        )
+
+    @staticmethod
+    def filter_estimates(query, status: Optional[EstimateStatus] = None,
+                         date_from: Optional[date] = None, date_to: Optional[date] = None,
+                         exclude_draft: bool = False):
+        """Status and creation date filters (``date_to`` inclusive, dates in UTC)."""
+        if status:
+            query = query.filter(Estimate.status == status)
+        if exclude_draft:
+            query = query.filter(Estimate.status != EstimateStatus.DRAFT)
+        if date_from:
+            query = query.filter(Estimate.created_at >= datetime.combine(date_from, dt_time.min, timezone.utc))
+        if date_to:
+            end = datetime.combine(date_to + timedelta(days=1), dt_time.min, timezone.utc)
+            query = query.filter(Estimate.created_at < end)
+        return query
+
+    @staticmethod
+    def _encode_cursor(created_at: datetime, estimate_id: int) -> str:
+        raw = json.dumps([created_at.isoformat(), estimate_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        try:
+            created_at, estimate_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            return datetime.fromisoformat(created_at), int(estimate_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError("Invalid cursor") from e
+
     def delete_estimate(self, db: Session, estimate_id: int) -> bool:
         """Delete an estimate and all related rooms/items (cascade)."""
-        estimate = db.query(Estimate).filter(Estimate.id == estimate_id).first()
+        estimate = self._lock_estimate(db, estimate_id)
         if not estimate:
             return False
+        estimate_stats_service.apply(db, estimate_stats_service.snapshot(estimate), None)
         db.delete(estimate)
         db.commit()
+        pdf_cache_service.invalidate(estimate_id)
         return True
+
     def update_estimate(self, db: Session, estimate_id: int, estimate_in: EstimateUpdate) -> Optional[Estimate]:
-        """Update an existing estimate. Replaces rooms/items if provided."""
-        estimate = self.get_estimate(db, estimate_id)
+        """Update an existing estimate. Reconciles rooms/items with the submitted ones if provided."""
+        estimate = self._lock_estimate(db, estimate_id)
         if not estimate:
             return None
+        stats_before = estimate_stats_service.snapshot(estimate)
 
         # Update scalar fields
         if estimate_in.client_name is not None:
             estimate.client_name = estimate_in.client_name
         if estimate_in.client_phone is not None:
             estimate.client_phone = estimate_in.client_phone
+            estimate.client_phone_digits = normalize_phone(estimate_in.client_phone)
         if estimate_in.client_address is not None:
             estimate.client_address = estimate_in.client_address
         if estimate_in.status is not None:
@@ -109,61 +326,207 @@ class EstimateService:
         if estimate_in.discount_equipment is not None:
             estimate.discount_equipment = estimate_in.discount_equipment
 
-        # Replace rooms and items if provided
+        # Reconcile rooms and items by id if provided
         if estimate_in.rooms is not None:
-            # Delete existing rooms (cascade deletes items)
-            # ... (rest of the logic remains the same, assuming it was correct)
-            for room in list(estimate.rooms):
-                db.delete(room)
-            db.flush()
-
-            total_area = 0
-            total_sum = 0
-            
-            # Note: We need to recalculate total_sum based on discounts if we want it stored "net" or "gross"?
-            # Typically total_sum in DB is "Gross" or "Final"? 
-            # PDF calculates final. Let's store Gross here as sum of items, 
-            # or we should store the final discounted sum?
-            # The current logic sums up room_subtotal.
-            # Let's keep total_sum as sum of items (Gross) for now, 
-            # and allow specific fields for discounts. 
-            # Real "To Pay" will be calculated on fly or we add a `final_sum` column?
-            # For now, let's keep total_sum as is (sum of items).
-
-            for room_in in estimate_in.rooms:
-                room = EstimateRoom(
-                    estimate_id=estimate.id,
-                    name=room_in.name,
-                    area=room_in.area or 0
+            self._reconcile_rooms(db, estimate, estimate_in.rooms)
+
+        # Items or discounts may have changed; the lines are loaded already
+        self._refresh_totals(estimate)
+
+        estimate_stats_service.apply(db, stats_before, estimate_stats_service.snapshot(estimate))
+        db.commit()
+        pdf_cache_service.invalidate(estimate_id)
+        db.refresh(estimate)
+        return estimate
+
+    def _reconcile_rooms(self, db: Session, estimate: Estimate, rooms_in: List[EstimateRoomUpdate]) -> None:
+        """Apply the submitted rooms and items to the loaded estimate, matching rows by id.
+
+        Unchanged rows are not written, changed ones are updated in place, rows
+        without a known id are inserted and rows missing from the submission are
+        deleted. Unknown or repeated ids (e.g. a copied item) count as new rows.
+        Items keep their category snapshot unless their price entry changed.
+        """
+        rooms_by_id = {room.id: room for room in estimate.rooms}
+        items_by_id = {item.id: item for room in estimate.rooms for item in room.items}
+        catalog_items = None
+
+        rooms = []
+        for room_in in rooms_in:
+            room = rooms_by_id.pop(room_in.id, None) if room_in.id is not None else None
+            if room is None:
+                room = EstimateRoom(name=room_in.name)
+
+            items = []
+            for item_in in room_in.items:
+                item = items_by_id.pop(item_in.id, None) if item_in.id is not None else None
+                values = dict(
+                    price_item_id=item_in.price_item_id,
+                    name=item_in.name,
+                    unit=item_in.unit,
+                    quantity=item_in.quantity,
+                    price=item_in.price,
+                    sum=line_sum(item_in.quantity, item_in.price)
                 )
-                db.add(room)
-                db.flush()
-
-                room_subtotal = 0
-                for item_in in room_in.items:
-                    item_sum = float(item_in.quantity) * float(item_in.price)
-                    item = EstimateItem(
-                        room_id=room.id,
-                        price_item_id=item_in.price_item_id,
-                        name=item_in.name,
-                        unit=item_in.unit,
-                        quantity=item_in.quantity,
-                        price=item_in.price,
-                        sum=item_sum
-                    )
-                    db.add(item)
-                    room_subtotal += item_sum
-
-                room.subtotal = room_subtotal
-                total_area += float(room.area or 0)
-                total_sum += room_subtotal
-                db.add(room)
-
-            estimate.total_area = total_area
-            estimate.total_sum = total_sum
+                if item is None or item.price_item_id != item_in.price_item_id:
+                    if catalog_items is None:
+                        catalog_items = price_catalog_service.get(db, estimate.company_id).by_id
+                    values.update(self._category_snapshot(item_in, catalog_items))
+                if item is None:
+                    item = EstimateItem(**values)
+                else:
+                    self._assign(item, values)
+                items.append(item)
+
+            room_subtotal = sum((item.sum for item in items), Decimal(0))
+            self._assign(room, dict(name=room_in.name, area=room_in.area or 0, subtotal=room_subtotal))
+            # Collection assignment only emits the difference: moved-in items get their room_id,
+            # items left out are deleted (delete-orphan)
+            room.items = items
+            rooms.append(room)
+
+        # Rooms left out are deleted together with their remaining items
+        estimate.rooms = rooms
+
+    def clone_estimate(self, db: Session, estimate_id: int, company_id: int,
+                       clone_in: EstimateCloneRequest) -> Optional[Estimate]:
+        """Copy an estimate of the company with its rooms and items, server-side.
 
+        One INSERT ... SELECT per table in a single transaction, so the rows
+        never travel through the application. Lines, their category snapshots
+        and the stored totals are copied as they are; the copy gets the
+        overrides, the requested status and its own creation date. Returns None
+        if the company has no such estimate.
+        """
+        phone = clone_in.client_phone
+        columns = {column.key: column for column in CLONE_COLUMNS}
+        columns.update(
+            client_name=self._override(Estimate.client_name, clone_in.client_name),
+            client_phone=self._override(Estimate.client_phone, phone),
+            client_phone_digits=self._override(
+                Estimate.client_phone_digits, normalize_phone(phone) if phone is not None else None
+            ),
+            client_address=self._override(Estimate.client_address, clone_in.client_address),
+            # Cast: PostgreSQL types a bare literal in a SELECT list as text, not as the enum
+            status=cast(literal(clone_in.status, Estimate.status.type), Estimate.status.type),
+        )
+        copy = db.execute(
+            insert(Estimate)
+            .from_select(
+                list(columns),
+                select(*columns.values()).where(Estimate.id == estimate_id, Estimate.company_id == company_id)
+            )
+            .returning(Estimate.id, Estimate.company_id, Estimate.created_at, Estimate.status,
+                       Estimate.total_sum, Estimate.final_sum)
+        ).first()
+        if copy is None:
+            return None
+
+        # Rooms are inserted in the source's id order, so the n-th room of the copy
+        # is the copy of the n-th source room; the items are matched on that
+        db.execute(
+            insert(EstimateRoom).from_select(
+                ["estimate_id", "name", "area", "subtotal"],
+                select(literal(copy.id), EstimateRoom.name, EstimateRoom.area, EstimateRoom.subtotal)
+                .where(EstimateRoom.estimate_id == estimate_id)
+                .order_by(EstimateRoom.id)
+            )
+        )
+        source_rooms = self._numbered_rooms(estimate_id)
+        copied_rooms = self._numbered_rooms(copy.id)
+        db.execute(
+            insert(EstimateItem).from_select(
+                ["room_id", *(column.key for column in CLONE_ITEM_COLUMNS)],
+                select(copied_rooms.c.id, *CLONE_ITEM_COLUMNS)
+                .select_from(EstimateItem)
+                .join(source_rooms, source_rooms.c.id == EstimateItem.room_id)
+                .join(copied_rooms, copied_rooms.c.n == source_rooms.c.n)
+                .order_by(EstimateItem.id)
+            )
+        )
+
+        estimate_stats_service.apply(db, None, estimate_stats_service.snapshot(copy))
         db.commit()
+        return self.get_estimate(db, copy.id)
+
+    @staticmethod
+    def _override(column, value):
+        return column if value is None else literal(value, column.type)
+
+    @staticmethod
+    def _numbered_rooms(estimate_id: int):
+        return (
+            select(EstimateRoom.id, func.row_number().over(order_by=EstimateRoom.id).label("n"))
+            .where(EstimateRoom.estimate_id == estimate_id)
+            .subquery()
+        )
+
+    def add_room_from_template(self, db: Session, estimate_id: int, template: RoomTemplate,
+                               name: Optional[str] = None, area: Optional[Decimal] = None) -> Optional[Estimate]:
+        """Append a room built from the template to the estimate.
+
+        Lines linked to the price list take its current price and category;
+        custom lines keep the template's price.
+        """
+        estimate = self._lock_estimate(db, estimate_id)
+        if not estimate:
+            return None
+        stats_before = estimate_stats_service.snapshot(estimate)
+
+        catalog_items = price_catalog_service.get(db, estimate.company_id).by_id
+        items = []
+        for template_item in template.items:
+            catalog_item = catalog_items.get(template_item.price_item_id)
+            price = catalog_item.price if catalog_item is not None else template_item.price
+            items.append(EstimateItem(
+                price_item_id=template_item.price_item_id if catalog_item is not None else None,
+                name=template_item.name,
+                unit=template_item.unit,
+                quantity=template_item.quantity,
+                price=price,
+                sum=line_sum(template_item.quantity, price),
+                **self._category_snapshot(template_item, catalog_items)
+            ))
+        estimate.rooms.append(EstimateRoom(
+            name=name or template.name,
+            area=area if area is not None else template.area or 0,
+            subtotal=sum((item.sum for item in items), Decimal(0)),
+            items=items,
+        ))
+        self._refresh_totals(estimate)
+
+        estimate_stats_service.apply(db, stats_before, estimate_stats_service.snapshot(estimate))
+        db.commit()
+        pdf_cache_service.invalidate(estimate_id)
         db.refresh(estimate)
         return estimate
 
+    def _refresh_totals(self, estimate: Estimate) -> None:
+        """Recompute the stored area and totals from the loaded rooms and items."""
+        totals = compute_totals(
+            ((item.sum, item.is_equipment) for room in estimate.rooms for item in room.items),
+            estimate.discount_pr_work, estimate.discount_equipment
+        )
+        total_area = sum((Decimal(room.area or 0) for room in estimate.rooms), Decimal(0))
+        self._assign(estimate, dict(total_area=total_area, **self._totals_columns(totals)))
+
+    @staticmethod
+    def _totals_columns(totals: EstimateTotals) -> Dict:
+        return dict(
+            total_sum=totals.total_sum,
+            subtotal_main=totals.subtotal_main,
+            subtotal_equipment=totals.subtotal_equipment,
+            discount_main_sum=totals.discount_main_sum,
+            discount_equipment_sum=totals.discount_equipment_sum,
+            final_sum=totals.final_sum,
+        )
+
+    @staticmethod
+    def _assign(row, values: Dict) -> None:
+        """Set only the attributes whose value differs, so unchanged rows produce no UPDATE."""
+        for key, value in values.items():
+            if getattr(row, key) != value:
+                setattr(row, key, value)
+
+
 estimate_service = EstimateService()
@@ -0,0 +1,129 @@
+"""Daily rollup of estimate counts and sums per company and status.
+
+Every write of an estimate moves its contribution (one estimate, its
+``total_sum`` and ``final_sum``) between rollup rows: take a ``snapshot`` of
+the estimate before and after the change and pass both to ``apply``. Rows are
+upserted as increments in the caller's transaction, so the rollup commits or
+rolls back together with the estimate and concurrent saves of different
+estimates don't overwrite each other's counts. Writes of the same estimate
+take the "before" snapshot from the row locked ``FOR UPDATE``, which queues
+them. Analytics then cost O(days), not O(estimates).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Estimate, EstimateDailyStat, EstimateStatus
+
+PERIODS = ("day", "month")
+
+_SUMS = ("estimate_count", "total_sum", "final_sum")
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """What one estimate adds to the rollup."""
+    company_id: int
+    day: date
+    status: EstimateStatus
+    total_sum: Decimal
+    final_sum: Decimal
+
+
+def _utc_day(value: Optional[datetime]) -> date:
+    if value is None:
+        return datetime.now(timezone.utc).date()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()  # naive values (SQLite) are UTC already
+
+
+class EstimateStatsService:
+    @staticmethod
+    def snapshot(estimate: Estimate) -> StatsSnapshot:
+        return StatsSnapshot(
+            company_id=estimate.company_id,
+            day=_utc_day(estimate.created_at),
+            status=EstimateStatus(estimate.status or EstimateStatus.DRAFT),
+            total_sum=Decimal(estimate.total_sum or 0),
+            final_sum=Decimal(estimate.final_sum or 0),
+        )
+
+    def apply(self, db: Session, before: Optional[StatsSnapshot], after: Optional[StatsSnapshot]) -> None:
+        """Move an estimate's contribution from ``before`` (None: created) to ``after`` (None: deleted)."""
+        if before == after:
+            return
+        deltas = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None:
+                continue
+            delta = deltas[(snapshot.company_id, snapshot.day, snapshot.status)]
+            delta[0] += sign
+            delta[1] += sign * snapshot.total_sum
+            delta[2] += sign * snapshot.final_sum
+        for key, values in deltas.items():
+            if any(values):
+                self._increment(db, key, values)
+
+    @staticmethod
+    def _increment(db: Session, key: tuple, values: list) -> None:
+        company_id, day, status = key
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(EstimateDailyStat).values(
+            company_id=company_id, day=day, status=status, **dict(zip(_SUMS, values))
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[EstimateDailyStat.company_id, EstimateDailyStat.day, EstimateDailyStat.status],
+            set_={name: getattr(EstimateDailyStat, name) + getattr(stmt.excluded, name) for name in _SUMS},
+        )
+        db.execute(stmt)
+
+    def get_stats(self, db: Session, company_id: int, date_from: Optional[date] = None,
+                  date_to: Optional[date] = None, period: str = "month") -> Dict:
+        """Counts and sums of the company's estimates created in the range (UTC days, inclusive).
+
+        Totals overall and per status, plus a series per ``period`` ("day" or
+        "month", labelled by its first day) and status, oldest first.
+        """
+        query = db.query(
+            EstimateDailyStat.day, EstimateDailyStat.status,
+            EstimateDailyStat.estimate_count, EstimateDailyStat.total_sum, EstimateDailyStat.final_sum
+        ).filter(EstimateDailyStat.company_id == company_id, EstimateDailyStat.estimate_count != 0)
+        if date_from:
+            query = query.filter(EstimateDailyStat.day >= date_from)
+        if date_to:
+            query = query.filter(EstimateDailyStat.day <= date_to)
+
+        by_status = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+        series = defaultdict(lambda: [0, Decimal(0), Decimal(0)])
+        for day, status, count, total_sum, final_sum in query:
+            start = day.replace(day=1) if period == "month" else day
+            for bucket in (by_status[status], series[(start, status)]):
+                bucket[0] += count
+                bucket[1] += Decimal(total_sum or 0)
+                bucket[2] += Decimal(final_sum or 0)
+
+        def row(values: List, **extra) -> Dict:
+            return dict(extra, count=values[0], total_sum=values[1], final_sum=values[2])
+
+        statuses = list(EstimateStatus)
+        return row(
+            [sum(values[i] for values in by_status.values()) for i in range(3)],
+            period=period,
+            date_from=date_from,
+            date_to=date_to,
+            by_status=[row(by_status[status], status=status) for status in statuses if status in by_status],
+            series=[
+                row(series[key], period_start=key[0], status=key[1])
+                for key in sorted(series, key=lambda key: (key[0], statuses.index(key[1])))
+            ],
+        )
+
+
+estimate_stats_service = EstimateStatsService()
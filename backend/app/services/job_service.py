@@ -0,0 +1,213 @@
+"""In-process background jobs for transcription and parsing.
+
+A submitted job gets a row in the ``jobs`` table and an asyncio task. The task
+waits for a per-company slot (so one company's burst of uploads can't starve
+the others) and, around each provider call, for a per-provider slot (so
+bursts queue here instead of timing out against OpenRouter). Clients poll
+``GET /api/jobs/{id}``, optionally long-polling with ``?wait=``; a long poll
+also returns early when the job reports progress (e.g. a transcribed segment).
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Job, JobStatus, User
+from app.services.ai_parser_service import ai_parser_service
+from app.services.transcribe_service import transcribe_service
+
+logger = logging.getLogger(__name__)
+
+FINISHED = (JobStatus.DONE, JobStatus.FAILED)
+
+
+class JobService:
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+        self._events: Dict[str, asyncio.Event] = {}
+        self._provider_limits: Dict[str, asyncio.Semaphore] = {}
+        self._company_limits: Dict[int, asyncio.Semaphore] = {}
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def submit_transcription(self, db: Session, user: User, audio_data: bytes, content_type: str, parse: bool = False) -> Job:
+        """Queue a transcription; with ``parse`` the transcript is also parsed into rooms and items."""
+        company_id = user.company.id
+
+        job_id = None
+        segments: Dict[int, Dict[str, Any]] = {}
+
+        async def on_segment(segment: Dict[str, Any], total: int) -> None:
+            segments[segment["index"]] = segment
+            # Text is only final up to the first segment still in flight
+            prefix = []
+            while len(prefix) in segments:
+                prefix.append(segments[len(prefix)]["text"])
+            progress = {
+                "segments_total": total,
+                "segments_done": len(segments),
+                "segments": [segments[i] for i in sorted(segments)],
+                "partial_transcript": " ".join(text for text in prefix if text),
+            }
+            await run_in_threadpool(self._update, job_id, progress=json.dumps(progress, ensure_ascii=False))
+            self._notify(job_id)
+
+        async def work() -> Dict[str, Any]:
+            # The provider slot is taken per call, so a segmented recording holds one per segment in flight
+            transcript = await transcribe_service.transcribe_audio(
+                audio_data, content_type, on_segment=on_segment, provider_limit=self._provider_limit("transcribe")
+            )
+            result: Dict[str, Any] = {"transcript": transcript}
+            if parse:
+                result["parse"] = await self._parse(company_id, user.id, transcript)
+            return result
+
+        job = await self._enqueue(db, user, "transcribe", work)
+        job_id = job.id
+        return job
+
+    async def submit_parse(self, db: Session, user: User, transcript: str) -> Job:
+        company_id = user.company.id
+
+        async def work() -> Dict[str, Any]:
+            return await self._parse(company_id, user.id, transcript)
+
+        return await self._enqueue(db, user, "parse", work)
+
+    def get(self, db: Session, job_id: str) -> Optional[Job]:
+        return db.query(Job).filter(Job.id == job_id).first()
+
+    async def wait(self, db: Session, job_id: str, timeout: float) -> None:
+        """Return once the job has finished or reported progress, or ``timeout`` seconds have passed."""
+        event = self._events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        # Not ours (or already finished): fall back to polling the table
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            status = await run_in_threadpool(self._status, db, job_id)
+            if status is None or status in FINISHED:
+                return
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(1.0, remaining))
+
+    def recover(self, db: Session) -> None:
+        """On startup: fail jobs whose task died with the previous process and drop expired ones."""
+        interrupted = db.query(Job).filter(Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])).update(
+            {Job.status: JobStatus.FAILED, Job.error: "Interrupted by server restart", Job.finished_at: datetime.now(timezone.utc)},
+            synchronize_session=False
+        )
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=settings.JOB_RETENTION_HOURS)
+        expired = db.query(Job).filter(Job.created_at < cutoff).delete(synchronize_session=False)
+        db.commit()
+        if interrupted or expired:
+            logger.info(f"[JOBS] Startup: {interrupted} interrupted jobs failed, {expired} expired jobs removed")
+
+    async def shutdown(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _enqueue(self, db: Session, user: User, kind: str, work: Callable[[], Awaitable[Dict[str, Any]]]) -> Job:
+        if self.pending >= settings.JOB_QUEUE_MAX_SIZE:
+            raise ValueError("Too many jobs in progress, try again later")
+
+        job = Job(id=uuid.uuid4().hex, kind=kind, status=JobStatus.QUEUED, company_id=user.company.id, user_id=user.id)
+        await run_in_threadpool(self._insert, db, job)
+
+        self._events[job.id] = asyncio.Event()
+        task = asyncio.create_task(self._run(job.id, job.company_id, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        logger.info(f"[JOBS] Queued {kind} job {job.id} for company {job.company_id} ({self.pending} pending)")
+        return job
+
+    async def _run(self, job_id: str, company_id: int, work: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        try:
+            async with self._company_limit(company_id):
+                await run_in_threadpool(self._update, job_id, status=JobStatus.RUNNING, started_at=datetime.now(timezone.utc))
+                try:
+                    result = await work()
+                except Exception as e:
+                    logger.error(f"[JOBS] Job {job_id} failed: {e}", exc_info=True)
+                    await run_in_threadpool(
+                        self._update, job_id,
+                        status=JobStatus.FAILED, error=str(e), finished_at=datetime.now(timezone.utc)
+                    )
+                else:
+                    await run_in_threadpool(
+                        self._update, job_id,
+                        status=JobStatus.DONE, result=json.dumps(result, ensure_ascii=False, default=str),
+                        finished_at=datetime.now(timezone.utc)
+                    )
+        finally:
+            event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def _notify(self, job_id: str) -> None:
+        """Wake up long polls waiting on a running job."""
+        event = self._events.get(job_id)
+        if event is not None:
+            self._events[job_id] = asyncio.Event()
+            event.set()
+
+    async def _parse(self, company_id: int, user_id: int, transcript: str) -> Dict[str, Any]:
+        async with self._provider_limit("parse"):
+            db = SessionLocal()
+            try:
+                user = await run_in_threadpool(lambda: db.query(User).filter(User.id == user_id).first())
+                return await ai_parser_service.parse_transcript(db, company_id, transcript, user=user)
+            finally:
+                db.close()
+
+    def _provider_limit(self, kind: str) -> asyncio.Semaphore:
+        if kind not in self._provider_limits:
+            limit = settings.JOB_TRANSCRIBE_CONCURRENCY if kind == "transcribe" else settings.JOB_PARSE_CONCURRENCY
+            self._provider_limits[kind] = asyncio.Semaphore(limit)
+        return self._provider_limits[kind]
+
+    def _company_limit(self, company_id: int) -> asyncio.Semaphore:
+        if company_id not in self._company_limits:
+            self._company_limits[company_id] = asyncio.Semaphore(settings.JOB_COMPANY_CONCURRENCY)
+        return self._company_limits[company_id]
+
+    @staticmethod
+    def _insert(db: Session, job: Job) -> None:
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+    @staticmethod
+    def _update(job_id: str, **fields: Any) -> None:
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.id == job_id).update(fields, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _status(db: Session, job_id: str) -> Optional[JobStatus]:
+        row = db.query(Job.status).filter(Job.id == job_id).first()
+        return row[0] if row else None
+
+
+job_service = JobService()
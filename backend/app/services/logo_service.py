@@ -0,0 +1,72 @@
+"""PDF-ready derivatives of uploaded company logos.
+
+The PDF header shows the logo in a 5x2 cm box, so the uploaded file (often a
+multi-megabyte phone photo) is downscaled to fit that box at print resolution
+and recompressed: JPEG, or PNG when the logo has transparency. The original is
+kept for the profile page; PDFs embed the derivative (``logo_pdf_path``).
+"""
+
+import io
+import logging
+from pathlib import Path
+from typing import Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from app.models import Company
+
+logger = logging.getLogger(__name__)
+
+PRINT_DPI = 300
+BOX_CM = (5.0, 2.0)
+BOX_PX = tuple(round(size / 2.54 * PRINT_DPI) for size in BOX_CM)  # (591, 236)
+JPEG_QUALITY = 85
+
+
+class LogoService:
+    def make_pdf_logo(self, contents: bytes) -> Tuple[bytes, str]:
+        """Downscaled, recompressed logo and its extension. Raises ValueError if it isn't a readable image."""
+        try:
+            image = Image.open(io.BytesIO(contents))
+            image = ImageOps.exif_transpose(image)  # phone photos are often stored rotated
+        except (UnidentifiedImageError, OSError) as e:
+            raise ValueError("File is not a valid image") from e
+
+        if image.mode == "P":
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        has_alpha = image.mode in ("RGBA", "LA") and image.getextrema()[-1][0] < 255
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.thumbnail(BOX_PX, Image.LANCZOS)
+
+        output = io.BytesIO()
+        if has_alpha:
+            image.save(output, "PNG", optimize=True, dpi=(PRINT_DPI, PRINT_DPI))
+            ext = ".png"
+        else:
+            image.save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True, dpi=(PRINT_DPI, PRINT_DPI))
+            ext = ".jpg"
+        return output.getvalue(), ext
+
+    def save_pdf_logo(self, logo_path: Path, contents: bytes) -> Path:
+        """Write the derivative of the logo at ``logo_path`` next to it."""
+        data, ext = self.make_pdf_logo(contents)
+        pdf_path = logo_path.with_name(f"{logo_path.stem}_pdf{ext}")
+        pdf_path.write_bytes(data)
+        logger.info(f"[LOGO] {logo_path.name}: {len(contents)} -> {len(data)} bytes for PDF")
+        return pdf_path
+
+    def backfill(self, db: Session) -> None:
+        """Create derivatives for logos uploaded before they existed (run at startup)."""
+        companies = db.query(Company).filter(Company.logo_path.isnot(None), Company.logo_pdf_path.is_(None)).all()
+        for company in companies:
+            logo_path = Path(company.logo_path)
+            try:
+                company.logo_pdf_path = str(self.save_pdf_logo(logo_path, logo_path.read_bytes()))
+            except (OSError, ValueError) as e:
+                logger.warning(f"[LOGO] No PDF logo for company {company.id}: {e}")
+        if companies:
+            db.commit()
+
+
+logo_service = LogoService()
@@ -0,0 +1,86 @@
+"""Shared async HTTP client for OpenRouter.
+
+One long-lived ``httpx.AsyncClient`` is reused by the parser and the
+transcriber, so TLS connections are kept alive between calls instead of being
+re-established per request. HTTP/2 is used when the ``h2`` package is
+installed (``httpx[http2]``).
+"""
+
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class OpenRouterClient:
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            if not HTTP2_AVAILABLE:
+                logger.warning("[OPENROUTER] h2 is not installed, falling back to HTTP/1.1")
+            self._client = httpx.AsyncClient(
+                base_url=settings.OPENROUTER_BASE_URL,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=settings.OPENROUTER_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENROUTER_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=30.0,
+                ),
+                timeout=httpx.Timeout(60.0, connect=settings.OPENROUTER_CONNECT_TIMEOUT),
+                headers={
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "https://ceiling-kp.app",  # Required by OpenRouter
+                    "X-Title": "Ceiling KP Generator",
+                },
+            )
+        return self._client
+
+    async def chat_completion(self, payload: Dict[str, Any], timeout: float) -> httpx.Response:
+        """POST /chat/completions with a per-call read timeout. The caller checks the status."""
+        return await self.client.post(
+            "/chat/completions",
+            json=payload,
+            headers={"Authorization": f"Bearer {settings.OPENROUTER_API_KEY}"},
+            timeout=httpx.Timeout(timeout, connect=settings.OPENROUTER_CONNECT_TIMEOUT),
+        )
+
+    async def stream_chat_completion(self, payload: Dict[str, Any], timeout: float) -> AsyncIterator[Dict[str, Any]]:
+        """POST /chat/completions with ``stream: true``; yields the decoded server-sent event chunks."""
+        async with self.client.stream(
+            "POST",
+            "/chat/completions",
+            json={**payload, "stream": True},
+            headers={"Authorization": f"Bearer {settings.OPENROUTER_API_KEY}"},
+            timeout=httpx.Timeout(timeout, connect=settings.OPENROUTER_CONNECT_TIMEOUT),
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                # Skip blank lines and SSE comments such as ": OPENROUTER PROCESSING"
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                yield json.loads(data)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+openrouter_client = OpenRouterClient()
@@ -0,0 +1,109 @@
+"""Content-addressed cache of transcript parse results.
+
+Results are keyed by a hash of the normalized transcript, the fingerprint of
+the company's price list snapshot, the parser model and the prompt version, so
+a re-parse of the same text against the same price list skips the LLM call.
+The in-memory tier is LRU with a TTL; an optional on-disk tier
+(``PARSE_CACHE_DIR``) survives restarts and is shared between workers.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.parser_prompt import PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+class ParseCacheService:
+    def __init__(
+        self,
+        max_entries: int = settings.PARSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.PARSE_CACHE_TTL_SECONDS,
+        cache_dir: str = settings.PARSE_CACHE_DIR,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # key -> (expires_at, serialized result); stored as JSON so callers can't mutate cached data
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(transcript: str, catalog_fingerprint: str, model: str) -> str:
+        normalized = _WHITESPACE_RE.sub(' ', transcript.lower().replace('ё', 'е')).strip()
+        raw = "\x1f".join([PROMPT_VERSION, model, catalog_fingerprint, normalized])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.max_entries <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return json.loads(entry[1])
+                del self._entries[key]
+
+        payload = self._read_disk(key, now)
+        if payload is None:
+            return None
+        self._remember(key, payload, now + self.ttl_seconds)
+        return json.loads(payload)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        self._remember(key, payload, time.time() + self.ttl_seconds)
+        self._write_disk(key, payload)
+
+    def _remember(self, key: str, payload: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key: str, now: float) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            if now - path.stat().st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, payload: str) -> None:
+        if self.cache_dir is None:
+            return
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(payload, encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[PARSE_CACHE] Failed to write {path}: {e}")
+
+
+parse_cache_service = ParseCacheService()
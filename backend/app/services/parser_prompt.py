@@ -0,0 +1,169 @@
+"""Prompt construction for the OpenRouter transcript parser.
+
+The prompt is split into a static prefix (instructions + compact price list)
+and a per-call suffix (the transcript). The prefix is byte-identical for every
+call against the same catalog snapshot, so provider-side prompt caching can
+reuse it: Anthropic models need the explicit ``cache_control`` marker, other
+providers cache matching prefixes automatically.
+
+Price items are referenced by short codes (the item id in base 36) instead of
+raw ids, and synonyms that repeat each other or the item name (ignoring case,
+``ё`` and spacing) are dropped.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+PROMPT_VERSION = "3"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+INSTRUCTIONS = """Ты — интеллектуальный помощник замерщика натяжных потолков. Твоя задача — преобразовать текст транскрибации в структурированный JSON.
+
+ИНСТРУКЦИИ:
+1. ИЗВЛЕЧЕНИЕ: Найди ВСЕ упомянутые комнаты, их площади и ВСЕ позиции (материалы, услуги, оборудование). Не пропускай общие слова типа "установка", "монтаж", "светильники".
+2. СОПОСТАВЛЕНИЕ: Для каждой позиции найди наиболее подходящую в ПРАЙС-ЛИСТЕ.
+   - Используй название и синонимы.
+   - Если позиция явно соответствует товару из прайса по смыслу (например, "вставка" -> "Вставка-плинтус"), выбирай её.
+3. НЕИЗВЕСТНОЕ: Если позиция упомянута, но в прайс-листе НЕТ даже близко похожего варианта, ОБЯЗАТЕЛЬНО добавь её в массив `unknown_items` с текстом из транскрипции.
+4. КОЛИЧЕСТВО: Точно извлекай числа. "4 штуки" -> 4, "15 метров" -> 15.
+
+ФОРМАТ ПРАЙС-ЛИСТА: строки "код|название|ед.изм|цена руб|синонимы через ;", сгруппированы по [категориям].
+
+ФОРМАТ ОТВЕТА (Строго JSON):
+{
+  "rooms": [
+    {
+      "name": "Название комнаты",
+      "area": число_или_null,
+      "items": [
+        {
+          "price_item_id": "код_из_прайса_или_null",
+          "name": "Название из прайса (или транскрипции если не в прайсе)",
+          "unit": "ед.изм",
+          "quantity": число,
+          "price": число_цены
+        }
+      ]
+    }
+  ],
+  "unknown_items": [
+    { "original_text": "Нераспознанная позиция" }
+  ]
+}
+
+ПРИМЕР: "Кухня 10м, светильник 5шт, монтаж люстры."
+Должно вернуть: Комнату с площадью 10, позицию светильника и позицию монтажа люстры (если они есть в прайсе).
+
+ПРАЙС-ЛИСТ (Доступные позиции):
+"""
+
+
+@dataclass(frozen=True)
+class PromptCatalog:
+    """Compact, deterministic price list encoding for one catalog snapshot."""
+    text: str
+    code_to_id: Dict[str, int]
+    legacy_tokens: int
+    compact_tokens: int
+
+    def resolve(self, code: Any) -> Optional[int]:
+        if code is None:
+            return None
+        return self.code_to_id.get(str(code).strip().lower())
+
+
+def item_code(item_id: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    code = ""
+    while True:
+        item_id, rem = divmod(item_id, 36)
+        code = digits[rem] + code
+        if item_id == 0:
+            return code
+
+
+def build_prompt_catalog(items: Iterable[Any]) -> PromptCatalog:
+    items = list(items)
+    ordered = sorted(items, key=lambda i: (i.category_name or "", i.name.casefold(), i.id))
+
+    lines: List[str] = []
+    code_to_id: Dict[str, int] = {}
+    current_category = None
+    for item in ordered:
+        category = item.category_name or "Прочее"
+        if category != current_category:
+            lines.append(f"[{category}]")
+            current_category = category
+        code = item_code(item.id)
+        code_to_id[code] = item.id
+        line = f"{code}|{item.name}|{item.unit}|{_format_price(item.price)}"
+        synonyms = _dedupe_synonyms(item.name, item.synonyms)
+        if synonyms:
+            line += "|" + ";".join(synonyms)
+        lines.append(line)
+
+    text = "\n".join(lines)
+    return PromptCatalog(
+        text=text,
+        code_to_id=code_to_id,
+        legacy_tokens=estimate_tokens(format_items_legacy(items)),
+        compact_tokens=estimate_tokens(text),
+    )
+
+
+def build_messages(catalog: PromptCatalog, transcript: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "role": "system",
+            "content": [{
+                "type": "text",
+                "text": INSTRUCTIONS + catalog.text,
+                "cache_control": {"type": "ephemeral"},
+            }],
+        },
+        {"role": "user", "content": f'ТРАНСКРИПЦИЯ ЗАМЕРА:\n"{transcript}"'},
+    ]
+
+
+def format_items_legacy(items: Iterable[Any]) -> str:
+    """Pre-compaction price list format, kept to report the token savings."""
+    lines = []
+    for item in items:
+        synonyms = f" (синонимы: {item.synonyms})" if item.synonyms else ""
+        lines.append(f"- ID:{item.id} | {item.name} | {item.unit} | {item.price} руб{synonyms}")
+    return "\n".join(lines)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~3 characters per token for mixed Cyrillic/Latin text)."""
+    return math.ceil(len(text) / 3)
+
+
+def _format_price(price: Any) -> str:
+    value = Decimal(str(price or 0))
+    if value == value.to_integral_value():
+        return str(int(value))
+    return format(value.normalize(), "f")
+
+
+def _synonym_key(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text.casefold().replace("ё", "е")).strip()
+
+
+def _dedupe_synonyms(name: str, synonyms: Optional[str]) -> List[str]:
+    seen = {_synonym_key(name)}
+    result = []
+    for raw in (synonyms or "").split(","):
+        syn = raw.strip()
+        key = _synonym_key(syn)
+        # Skip empties and exact repeats; a synonym that is part of the name (an
+        # abbreviation, a stem) can still be what the model matches on
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        result.append(syn)
+    return result
@@ -0,0 +1,144 @@
+"""Bulk PDF export as a streamed ZIP archive.
+
+Estimates are rendered through the PDF cache and renderer pool, at most
+``PDF_BATCH_CONCURRENCY`` per request, and each PDF is written to the archive
+and sent as soon as it is ready, in completion order. The archive is written
+to an unseekable sink (entries use data descriptors), so only the PDFs in
+flight are held in memory, never the whole ZIP. Estimates that fail to render
+are listed in ``errors.txt`` at the end of the archive instead of breaking the
+download half-way.
+"""
+
+import asyncio
+import logging
+import time
+import zipfile
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models import Company, Estimate, EstimateRoom
+from app.schemas.pdf import PdfBatchRequest
+from app.services.estimate_service import estimate_service
+from app.services.pdf_cache import CachedPdf, pdf_cache_service
+from app.services.pdf_document import PdfEstimate, build_pdf_estimate
+from app.services.pdf_renderer import RendererBusy, pdf_renderer
+
+logger = logging.getLogger(__name__)
+
+BUSY_RETRY_SECONDS = 0.5
+
+BatchItem = Union[CachedPdf, PdfEstimate]
+
+
+class _ZipSink:
+    """Write-only stream the archive is written into; ``drain`` hands over what was written since."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class PdfBatchService:
+    def select(self, db: Session, company_id: int, request: PdfBatchRequest) -> List[int]:
+        """Ids of the company's estimates matching the request, newest first."""
+        query = db.query(Estimate.id).filter(Estimate.company_id == company_id)
+        if request.estimate_ids:
+            query = query.filter(Estimate.id.in_(request.estimate_ids))
+        query = estimate_service.filter_estimates(
+            query, request.status, request.date_from, request.date_to, request.exclude_draft
+        )
+        return [row[0] for row in query.order_by(Estimate.created_at.desc(), Estimate.id.desc()).all()]
+
+    def prepare(self, db: Session, company: Company, estimate_ids: List[int]) -> List[BatchItem]:
+        """Cached renders where still valid, snapshots to render for the rest (loaded in one query)."""
+        cached = {estimate_id: pdf_cache_service.lookup(estimate_id) for estimate_id in estimate_ids}
+        missing = [estimate_id for estimate_id, entry in cached.items() if entry is None]
+        documents = {}
+        if missing:
+            estimates = db.query(Estimate).options(
+                joinedload(Estimate.rooms).joinedload(EstimateRoom.items)
+            ).filter(Estimate.id.in_(missing)).all()
+            documents = {estimate.id: build_pdf_estimate(estimate, company) for estimate in estimates}
+        items = []
+        for estimate_id in estimate_ids:
+            item = cached[estimate_id] or documents.get(estimate_id)
+            if item is not None:  # deleted in the meantime
+                items.append(item)
+        return items
+
+    async def stream_zip(self, items: List[BatchItem]) -> AsyncIterator[bytes]:
+        sink = _ZipSink()
+        archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+        # Acquired per render and released once its PDF is in the archive, which bounds
+        # both concurrent renders and finished PDFs waiting for a slow client
+        slots = asyncio.Semaphore(settings.PDF_BATCH_CONCURRENCY)
+        start = time.perf_counter()
+
+        async def fetch(item: BatchItem) -> Tuple[int, Optional[CachedPdf], Optional[bytes], Optional[Exception]]:
+            estimate_id = item.estimate_id if isinstance(item, CachedPdf) else item.id
+            await slots.acquire()
+            deadline = time.monotonic() + settings.PDF_RENDER_TIMEOUT_SECONDS
+            while True:
+                try:
+                    entry, content = await run_in_threadpool(self._fetch, item)
+                    return estimate_id, entry, content, None
+                except RendererBusy as e:
+                    # The pool is shared with interactive requests; wait for a slot instead of failing
+                    # the batch, without holding a threadpool worker while waiting
+                    if time.monotonic() > deadline:
+                        return estimate_id, None, None, e
+                    await asyncio.sleep(BUSY_RETRY_SECONDS)
+                except Exception as e:
+                    return estimate_id, None, None, e
+
+        tasks = [asyncio.create_task(fetch(item)) for item in items]
+        failures = []
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                estimate_id, entry, content, error = await next_done
+                try:
+                    if error is not None:
+                        logger.error(f"[PDF_BATCH] Estimate {estimate_id} failed: {error}")
+                        failures.append(f"{estimate_id}: {error}")
+                        continue
+                    await run_in_threadpool(archive.writestr, entry.filename, content)
+                finally:
+                    slots.release()
+                yield sink.drain()
+
+            if failures:
+                archive.writestr("errors.txt", "\n".join(failures) + "\n")
+            archive.close()
+            yield sink.drain()
+            logger.info(
+                f"[PDF_BATCH] Sent {len(items) - len(failures)}/{len(items)} PDFs in {time.perf_counter() - start:.1f}s"
+            )
+        finally:
+            # Client went away (or we're done): stop renders that haven't started
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _fetch(item: BatchItem) -> Tuple[CachedPdf, bytes]:
+        """Read or render one PDF; raises RendererBusy when the pool is full."""
+        if isinstance(item, CachedPdf):
+            return item, pdf_cache_service.read(item)
+        entry = pdf_cache_service.get_or_render(item, lambda: pdf_renderer.render(item))
+        return entry, pdf_cache_service.read(entry)
+
+
+pdf_batch_service = PdfBatchService()
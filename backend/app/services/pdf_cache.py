@@ -0,0 +1,177 @@
+"""Content-addressed cache of rendered estimate PDFs.
+
+A PDF is stored on disk (``PDF_CACHE_DIR``) under the fingerprint of
+everything the renderer reads: the estimate rows, discounts, company profile
+fields and logo bytes, plus the layout version. An in-memory index maps
+estimate id -> last rendered entry so repeat requests are served without
+loading the estimate graph at all; estimate, company, price list and logo
+updates drop the affected index entries (``invalidate`` /
+``invalidate_company``). The index is per process; the files are shared.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+from app.config import settings
+from app.services.pdf_document import PdfEstimate
+from app.services.pdf_service import LAYOUT_VERSION, LOGO_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedPdf:
+    estimate_id: int
+    company_id: int
+    fingerprint: str
+    filename: str
+    path: Optional[Path] = None
+    content: Optional[bytes] = None  # only when the disk tier is unavailable
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.fingerprint[:32]}"'
+
+
+class PdfCacheService:
+    def __init__(self, cache_dir: str = settings.PDF_CACHE_DIR, max_entries: int = settings.PDF_CACHE_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_entries = max_entries
+        self._index: "OrderedDict[int, CachedPdf]" = OrderedDict()
+        self._logo_digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, estimate_id: int) -> Optional[CachedPdf]:
+        """The cached render of an estimate that hasn't changed since, if any."""
+        with self._lock:
+            entry = self._index.get(estimate_id)
+            if entry is not None:
+                self._index.move_to_end(estimate_id)
+        if entry is not None and entry.path is not None and not entry.path.exists():
+            self.invalidate(estimate_id)
+            return None
+        return entry
+
+    def get_or_render(self, document: PdfEstimate, render: Callable[[], bytes]) -> CachedPdf:
+        fingerprint = self.fingerprint(document)
+        entry = self.lookup(document.id)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry
+
+        path = self._path(fingerprint)
+        if path is not None and path.exists():
+            logger.info(f"[PDF_CACHE] Disk hit for estimate {document.id}")
+            os.utime(path)  # keep recently used files out of the age-based prune
+            entry = CachedPdf(document.id, document.company.id, fingerprint, self._filename(document), path=path)
+        else:
+            start = time.perf_counter()
+            content = render()
+            logger.info(f"[PDF_CACHE] Rendered estimate {document.id} in {(time.perf_counter() - start) * 1000:.0f}ms")
+            stored = self._write(path, content) if path is not None else False
+            entry = CachedPdf(
+                document.id, document.company.id, fingerprint, self._filename(document),
+                path=path if stored else None, content=None if stored else content
+            )
+        self._remember(entry)
+        return entry
+
+    def read(self, entry: CachedPdf) -> bytes:
+        if entry.content is not None:
+            return entry.content
+        return entry.path.read_bytes()
+
+    def invalidate(self, estimate_id: int) -> None:
+        with self._lock:
+            self._index.pop(estimate_id, None)
+
+    def invalidate_company(self, company_id: int) -> None:
+        with self._lock:
+            for estimate_id in [k for k, v in self._index.items() if v.company_id == company_id]:
+                del self._index[estimate_id]
+
+    def prune(self) -> None:
+        """Delete cached files not used for PDF_CACHE_TTL_DAYS (run at startup)."""
+        if self.cache_dir is None or not self.cache_dir.exists():
+            return
+        cutoff = time.time() - settings.PDF_CACHE_TTL_DAYS * 86400
+        removed = 0
+        for path in self.cache_dir.glob("*/*.pdf"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        if removed:
+            logger.info(f"[PDF_CACHE] Pruned {removed} stale files")
+
+    def fingerprint(self, document: PdfEstimate) -> str:
+        digest = hashlib.sha256()
+        digest.update(LAYOUT_VERSION.encode("utf-8"))
+        digest.update(json.dumps(document.to_dict(), ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(self._logo_digest(document.company.logo_path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _logo_digest(self, logo_path: Optional[str]) -> str:
+        if not logo_path:
+            return ""
+        try:
+            stat = os.stat(logo_path)
+        except OSError:
+            return ""
+        key = (logo_path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._logo_digests.get(key)
+            if digest is not None:
+                self._logo_digests.move_to_end(key)
+                return digest
+
+        with open(logo_path, "rb") as f:  # outside the lock, like the logo decode in pdf_service
+            digest = hashlib.sha256(f.read()).hexdigest()
+        with self._lock:
+            self._logo_digests[key] = digest
+            self._logo_digests.move_to_end(key)
+            while len(self._logo_digests) > LOGO_CACHE_SIZE:
+                self._logo_digests.popitem(last=False)
+        return digest
+
+    def _remember(self, entry: CachedPdf) -> None:
+        with self._lock:
+            self._index[entry.estimate_id] = entry
+            self._index.move_to_end(entry.estimate_id)
+            while len(self._index) > self.max_entries:
+                self._index.popitem(last=False)
+
+    def _path(self, fingerprint: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / fingerprint[:2] / f"{fingerprint}.pdf"
+
+    @staticmethod
+    def _write(path: Path, content: bytes) -> bool:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"[PDF_CACHE] Failed to write {path}: {e}")
+            return False
+
+    @staticmethod
+    def _filename(document: PdfEstimate) -> str:
+        # Sanitize filename
+        client_name = document.client_name.replace('"', '').replace("'", "").replace("/", "_")
+        return f"KP_{document.id}_{client_name}.pdf"
+
+
+pdf_cache_service = PdfCacheService()
@@ -0,0 +1,141 @@
+"""Plain, picklable snapshot of everything an estimate PDF shows.
+
+``PDFService`` renders from these instead of ORM objects, so a render can
+run in another process and its input can be fingerprinted for the cache.
+"""
+
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.models import Company, Estimate
+
+
+# eq=False: instances hash by identity, so rooms with equal contents stay distinct dict keys
+@dataclass(frozen=True, eq=False)
+class PdfItem:
+    name: str
+    quantity: float
+    unit: str
+    price: float
+    sum: float
+    category_name: str = ""
+    is_equipment: bool = False
+
+
+@dataclass(frozen=True, eq=False)
+class PdfRoom:
+    name: str
+    area: float
+    items: Tuple[PdfItem, ...] = ()
+
+
+@dataclass(frozen=True, eq=False)
+class PdfCompany:
+    id: Optional[int]
+    name: str = ""
+    address: str = ""
+    city: str = ""
+    phone: str = ""
+    email: str = ""
+    website: str = ""
+    messenger_contact: str = ""
+    messenger_type: str = ""
+    warranty_material: Optional[int] = None
+    warranty_work: Optional[int] = None
+    validity_days: Optional[int] = None
+    discount: Optional[float] = None
+    inn: str = ""
+    kpp: str = ""
+    bank_name: str = ""
+    bank_account: str = ""
+    bank_bik: str = ""
+    bank_corr: str = ""
+    logo_path: Optional[str] = None
+
+
+@dataclass(frozen=True, eq=False)
+class PdfEstimate:
+    id: Optional[int]
+    company: PdfCompany
+    client_name: str = ""
+    client_phone: str = ""
+    client_address: str = ""
+    created_at: Optional[datetime] = None
+    discount_pr_work: float = 0
+    discount_equipment: float = 0
+    # Stored totals of the estimate (app.services.pricing), shown as they are
+    subtotal_main: float = 0
+    subtotal_equipment: float = 0
+    discount_main_sum: float = 0
+    discount_equipment_sum: float = 0
+    final_sum: float = 0
+    rooms: Tuple[PdfRoom, ...] = field(default_factory=tuple)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _float(value) -> float:
+    return float(value) if value else 0.0
+
+
+def build_pdf_company(company: Company) -> PdfCompany:
+    return PdfCompany(
+        id=company.id,
+        name=company.name or "",
+        address=company.address or "",
+        city=company.city or "",
+        phone=company.phone or "",
+        email=company.user.email if (company.user and hasattr(company.user, 'email')) else "",
+        website=company.website or "",
+        messenger_contact=company.messenger_contact or "",
+        messenger_type=company.messenger_type or "",
+        warranty_material=company.warranty_material,
+        warranty_work=company.warranty_work,
+        validity_days=company.validity_days,
+        discount=float(company.discount) if company.discount is not None else None,
+        inn=company.inn or "",
+        kpp=company.kpp or "",
+        bank_name=company.bank_name or "",
+        bank_account=company.bank_account or "",
+        bank_bik=company.bank_bik or "",
+        bank_corr=company.bank_corr or "",
+        logo_path=company.logo_pdf_path or company.logo_path,
+    )
+
+
+def build_pdf_estimate(estimate: Estimate, company: Company) -> PdfEstimate:
+    rooms = []
+    for room in estimate.rooms or []:
+        items = []
+        for item in room.items or []:
+            quantity = _float(item.quantity)
+            price = _float(item.price)
+            items.append(PdfItem(
+                name=item.name or "",
+                quantity=quantity,
+                unit=item.unit or "",
+                price=price,
+                sum=float(item.sum) if item.sum else quantity * price,
+                category_name=item.category_name or "",
+                is_equipment=bool(item.is_equipment),
+            ))
+        rooms.append(PdfRoom(name=room.name or "", area=_float(room.area), items=tuple(items)))
+
+    return PdfEstimate(
+        id=estimate.id,
+        company=build_pdf_company(company),
+        client_name=estimate.client_name or "",
+        client_phone=estimate.client_phone or "",
+        client_address=estimate.client_address or "",
+        created_at=estimate.created_at,
+        discount_pr_work=_float(estimate.discount_pr_work),
+        discount_equipment=_float(estimate.discount_equipment),
+        subtotal_main=_float(estimate.subtotal_main),
+        subtotal_equipment=_float(estimate.subtotal_equipment),
+        discount_main_sum=_float(estimate.discount_main_sum),
+        discount_equipment_sum=_float(estimate.discount_equipment_sum),
+        final_sum=_float(estimate.final_sum),
+        rooms=tuple(rooms),
+    )
@@ -0,0 +1,84 @@
+"""Background PDF pre-render for estimates that are about to be downloaded.
+
+Once an estimate is completed or sent, or the wizard reaches the PDF step,
+the PDF is almost always requested right away. The estimate endpoints
+schedule a render into the PDF cache after the response is sent, so the
+following ``/api/pdf/generate`` or preview is a cache hit. Scheduling is
+debounced per estimate: each save restarts a ``PDF_PRERENDER_DEBOUNCE_SECONDS``
+timer, so a burst of autosaves ends in a single render of the final state.
+"""
+
+import asyncio
+import logging
+from typing import Dict
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Estimate, EstimateStatus
+from app.services.estimate_service import estimate_service
+from app.services.pdf_cache import pdf_cache_service
+from app.services.pdf_document import build_pdf_estimate
+from app.services.pdf_renderer import RendererBusy, pdf_renderer
+
+logger = logging.getLogger(__name__)
+
+PRERENDER_STATUSES = (EstimateStatus.COMPLETED, EstimateStatus.SENT)
+PDF_STEP = 4
+
+
+class PdfPrerenderService:
+    def __init__(self):
+        self._pending: Dict[int, asyncio.Task] = {}
+
+    @staticmethod
+    def wants(estimate: Estimate) -> bool:
+        return settings.PDF_PRERENDER_ENABLED and (
+            estimate.status in PRERENDER_STATUSES or (estimate.last_step or 0) >= PDF_STEP
+        )
+
+    async def schedule(self, estimate_id: int) -> None:
+        """(Re)start the debounce timer of the estimate's render."""
+        previous = self._pending.pop(estimate_id, None)
+        if previous is not None:
+            previous.cancel()
+        task = asyncio.create_task(self._render_later(estimate_id))
+        self._pending[estimate_id] = task
+        task.add_done_callback(lambda t: self._forget(estimate_id, t))
+
+    async def shutdown(self) -> None:
+        tasks = list(self._pending.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, estimate_id: int, task: asyncio.Task) -> None:
+        if self._pending.get(estimate_id) is task:
+            del self._pending[estimate_id]
+
+    async def _render_later(self, estimate_id: int) -> None:
+        await asyncio.sleep(settings.PDF_PRERENDER_DEBOUNCE_SECONDS)
+        try:
+            await run_in_threadpool(self._render, estimate_id)
+        except RendererBusy:
+            # Interactive requests come first; the PDF will be rendered on demand
+            logger.info(f"[PDF_PRERENDER] Renderer busy, skipped estimate {estimate_id}")
+        except Exception as e:
+            logger.error(f"[PDF_PRERENDER] Estimate {estimate_id} failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _render(estimate_id: int) -> None:
+        db = SessionLocal()
+        try:
+            estimate = estimate_service.get_estimate(db, estimate_id)
+            if estimate is None or not PdfPrerenderService.wants(estimate):
+                return
+            document = build_pdf_estimate(estimate, estimate.company)
+        finally:
+            db.close()
+        pdf_cache_service.get_or_render(document, lambda: pdf_renderer.render(document))
+        logger.info(f"[PDF_PRERENDER] Estimate {estimate_id} ready")
+
+
+pdf_prerender_service = PdfPrerenderService()
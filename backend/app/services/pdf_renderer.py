@@ -0,0 +1,191 @@
+"""Process pool for PDF rendering.
+
+ReportLab layout is pure-Python CPU work; run in the API process it holds the
+GIL and stalls every other request on the worker. Renders are shipped to a
+pool of ``PDF_RENDER_WORKERS`` processes as ``PdfEstimate`` snapshots. Each
+worker registers the fonts and builds the style sheet once at start (importing
+``pdf_service``) and does a warm-up render. At most ``PDF_RENDER_WORKERS +
+PDF_RENDER_MAX_QUEUE`` renders are accepted at a time; past that
+``RendererBusy`` is raised and the API answers 503. Queue time (submit ->
+worker start) and render time are kept for ``metrics()``.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.pdf_document import PdfCompany, PdfEstimate
+
+logger = logging.getLogger(__name__)
+
+METRICS_WINDOW = 1000
+
+
+class RendererBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+def _init_worker() -> None:
+    from app.services.pdf_service import pdf_service
+    pdf_service.render(PdfEstimate(id=None, company=PdfCompany(id=None)))
+
+
+def _render_in_worker(document: PdfEstimate) -> Tuple[bytes, float, float]:
+    """Runs in a pool process: (pdf bytes, wall-clock start, render seconds)."""
+    from app.services.pdf_service import pdf_service
+    started_at = time.time()
+    start = time.perf_counter()
+    content = pdf_service.render(document)
+    return content, started_at, time.perf_counter() - start
+
+
+def _percentile(values: Deque[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct))] * 1000, 1)
+
+
+class PdfRenderer:
+    def __init__(self, workers: int = settings.PDF_RENDER_WORKERS, max_queue: int = settings.PDF_RENDER_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._render_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._queue_times: Deque[float] = deque(maxlen=METRICS_WINDOW)
+        self._counts = {"rendered": 0, "failed": 0, "rejected": 0}
+
+    @property
+    def capacity(self) -> int:
+        return max(self.workers, 1) + self.max_queue
+
+    def start(self) -> None:
+        """Start the pool (at startup, so workers are warm before the first request)."""
+        if self.workers <= 0:
+            return
+        with self._lock:
+            self._ensure_pool()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def render(self, document: PdfEstimate) -> bytes:
+        """Render in the pool, blocking the calling thread (not the GIL) until done."""
+        future = self.submit(document)
+        return future.result(timeout=settings.PDF_RENDER_TIMEOUT_SECONDS)
+
+    async def render_async(self, document: PdfEstimate) -> bytes:
+        future = self.submit(document)
+        return await asyncio.wait_for(asyncio.wrap_future(future), settings.PDF_RENDER_TIMEOUT_SECONDS)
+
+    def submit(self, document: PdfEstimate) -> "Future[bytes]":
+        """Queue a render; raises RendererBusy when ``capacity`` renders are already in flight."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._counts["rejected"] += 1
+                raise RendererBusy("PDF renderer is busy, try again later")
+            self._in_flight += 1
+
+        submitted_at = time.time()
+        result: "Future[bytes]" = Future()
+        try:
+            if self.workers <= 0:
+                self._render_inline(document, submitted_at, result)
+            else:
+                with self._lock:
+                    pool = self._ensure_pool()
+                pool.submit(_render_in_worker, document).add_done_callback(
+                    lambda f: self._on_done(f, pool, submitted_at, result)
+                )
+        except BaseException:
+            self._release(failed=True)
+            raise
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            render_times = deque(self._render_times)
+            queue_times = deque(self._queue_times)
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                **self._counts,
+                "render_ms_p50": _percentile(render_times, 0.5),
+                "render_ms_p95": _percentile(render_times, 0.95),
+                "queue_ms_p50": _percentile(queue_times, 0.5),
+                "queue_ms_p95": _percentile(queue_times, 0.95),
+            }
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        # Caller holds self._lock
+        if self._pool is None:
+            # spawn: forking a process that already runs threads (uvicorn, threadpool) is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                max_tasks_per_child=settings.PDF_RENDER_MAX_TASKS_PER_CHILD or None,
+            )
+            logger.info(f"[PDF_RENDER] Started pool with {self.workers} workers")
+        return self._pool
+
+    def _render_inline(self, document: PdfEstimate, submitted_at: float, result: "Future[bytes]") -> None:
+        from app.services.pdf_service import pdf_service
+        start = time.perf_counter()
+        try:
+            content = pdf_service.render(document)
+        except Exception as e:
+            self._release(failed=True)
+            result.set_exception(e)
+            return
+        self._release(render_seconds=time.perf_counter() - start, queue_seconds=0.0)
+        result.set_result(content)
+
+    def _on_done(self, future: Future, pool: ProcessPoolExecutor, submitted_at: float, result: "Future[bytes]") -> None:
+        if future.cancelled():  # pool shut down
+            self._release(failed=True)
+            result.cancel()
+            return
+        error = future.exception()
+        if error is not None:
+            if isinstance(error, BrokenProcessPool):
+                logger.error("[PDF_RENDER] Worker pool broke, restarting it on the next render")
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                logger.error(f"[PDF_RENDER] Render failed: {error}")
+            self._release(failed=True)
+            result.set_exception(error)
+            return
+
+        content, started_at, render_seconds = future.result()
+        self._release(render_seconds=render_seconds, queue_seconds=max(started_at - submitted_at, 0.0))
+        result.set_result(content)
+
+    def _release(self, failed: bool = False, render_seconds: float = 0.0, queue_seconds: float = 0.0) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if failed:
+                self._counts["failed"] += 1
+            else:
+                self._counts["rendered"] += 1
+                self._render_times.append(render_seconds)
+                self._queue_times.append(queue_seconds)
+
+
+pdf_renderer = PdfRenderer()
@@ -1,18 +1,41 @@
 import io
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from typing import Optional, Tuple
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, KeepTogether, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle, Flowable, KeepTogether, PageBreak
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
 from app.models import Estimate, Company
+from app.services.pdf_document import PdfCompany, PdfEstimate, build_pdf_estimate
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when the layout changes so cached PDFs are re-rendered
+LAYOUT_VERSION = "2"
+
+# From this many item lines on, each block is laid out as one long table
+# instead of a table per room (see _add_long_items_table)
+LARGE_DOCUMENT_ROWS = 300
+LONG_TABLE_CHUNK_ROWS = 50
+
+ITEMS_HEADER = ['Наименование', 'Кол-во', 'Ед.', 'Цена', 'Сумма']
+ITEMS_COL_WIDTHS = [8*cm, 2*cm, 1.5*cm, 2.5*cm, 3*cm]
+ACCENT_COLOR = colors.HexColor('#1e40af')  # Dark blue
+GRID_COLOR = colors.HexColor('#cbd5e1')  # Light grey border
+SUBTOTAL_BACKGROUND = colors.HexColor('#f8fafc')
+ROOM_TITLE_BACKGROUND = colors.HexColor('#eff6ff')
+
+# Decoded logos kept per company (per process)
+LOGO_CACHE_SIZE = 64
+
 # Регистрация шрифтов для поддержки кириллицы
 FONT_NAME = 'Helvetica'
 FONT_BOLD = 'Helvetica-Bold'
@@ -46,10 +69,36 @@ try:
 except Exception as e:
     logger.exception(f"Error registering fonts: {e}")
 
+class _LogoImage(Flowable):
+    """Draws a cached, already decoded logo at a fixed size. The Image flowable only takes
+    a file name or stream and would decode the file again on every render."""
+
+    def __init__(self, reader: ImageReader, lock: threading.Lock, width: float, height: float):
+        super().__init__()
+        self.reader = reader
+        self.lock = lock
+        self.drawWidth = width
+        self.drawHeight = height
+
+    def wrap(self, availWidth, availHeight):
+        return self.drawWidth, self.drawHeight
+
+    def draw(self):
+        # The reader is shared between renders, and drawImage seeks its JPEG file handle
+        with self.lock:
+            self.canv.drawImage(self.reader, 0, 0, self.drawWidth, self.drawHeight, mask='auto')
+
+
 class PDFService:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_styles()
+        self._setup_table_styles()
+        self._logos: "OrderedDict[Optional[int], Tuple[str, ImageReader]]" = OrderedDict()
+        self._logos_lock = threading.Lock()  # renders run concurrently in the threadpool without workers
+        # ReportLab's registered TrueType fonts keep per-document subset state that
+        # concurrent builds corrupt; the build holds the GIL anyway, so little is lost
+        self._build_lock = threading.Lock()
 
     def _setup_styles(self):
         self.styles.add(ParagraphStyle(
@@ -88,7 +137,44 @@ class PDFService:
             textColor=colors.grey
         ))
 
+    def _setup_table_styles(self):
+        # Built once and shared by every table: per-room tables in the normal layout...
+        self.room_table_style = TableStyle([
+            ('BACKGROUND', (0,0), (-1,0), ACCENT_COLOR),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('ALIGN', (1,0), (-1,-1), 'RIGHT'),
+            ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
+            ('FONTNAME', (0,0), (-1,0), FONT_BOLD),
+            ('FONTNAME', (0,-1), (-1,-1), FONT_BOLD),
+            ('FONTSIZE', (0,0), (-1,-1), 9),
+            ('BOTTOMPADDING', (0,0), (-1,0), 8),
+            ('BACKGROUND', (0,-1), (-1,-1), SUBTOTAL_BACKGROUND),
+            ('GRID', (0,0), (-1,-2), 0.5, GRID_COLOR),
+            ('LINEBELOW', (0,-1), (-1,-1), 1, ACCENT_COLOR),
+        ])
+        # ...and the base of the long table in the large-document layout
+        self.long_table_commands = (
+            ('ALIGN', (0,0), (-1,-1), 'LEFT'),
+            ('ALIGN', (1,0), (-1,-1), 'RIGHT'),
+            ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
+            ('FONTSIZE', (0,0), (-1,-1), 9),
+            ('GRID', (0,0), (-1,-1), 0.5, GRID_COLOR),
+        )
+        # ...with the column header, in the block's first table only
+        self.long_table_header_commands = (
+            ('BACKGROUND', (0,0), (-1,0), ACCENT_COLOR),
+            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+            ('FONTNAME', (0,0), (-1,0), FONT_BOLD),
+            ('BOTTOMPADDING', (0,0), (-1,0), 8),
+        )
+
     def generate(self, estimate: Estimate, company: Company) -> bytes:
+        return self.render(build_pdf_estimate(estimate, company))
+
+    def render(self, estimate: PdfEstimate, large: Optional[bool] = None) -> bytes:
+        """Render the PDF; ``large`` forces the layout, by default it depends on the number of lines."""
+        company = estimate.company
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(
             buffer, pagesize=A4,
@@ -105,21 +191,19 @@ class PDFService:
         
         # 3. Split items into two groups:
         #    - Main block: Полотна + Профили + Услуги (by room)
-        #    - Equipment block: Оборудование only (by room)
+        #    - Equipment block: items of equipment categories (by room)
         main_items_by_room = {}   # room -> [items] (Полотна, Профили, Услуги)
-        equip_items_by_room = {}  # room -> [items] (Оборудование only)
+        equip_items_by_room = {}  # room -> [items] (is_equipment snapshot)
         
         rooms = list(estimate.rooms) if estimate.rooms else []
+        if large is None:
+            large = sum(len(room.items) for room in rooms) >= LARGE_DOCUMENT_ROWS
         for room in rooms:
             if not room.items:
                 continue
             
             for item in room.items:
-                cat_name = ""
-                if item.price_item and item.price_item.category:
-                    cat_name = item.price_item.category.name
-                
-                if cat_name == "Оборудование":
+                if item.is_equipment:
                     if room not in equip_items_by_room:
                         equip_items_by_room[room] = []
                     equip_items_by_room[room].append(item)
@@ -129,61 +213,48 @@ class PDFService:
                     main_items_by_room[room].append(item)
 
         # 4. Render main block (Полотна + Профили + Услуги)
-        subtotal_main = 0
         if main_items_by_room:
-            subtotal_main = self._add_items_table(elements, main_items_by_room)
+            self._add_items_table(elements, main_items_by_room, large)
             elements.append(Spacer(1, 0.5*cm))
 
         # 5. Render equipment block
-        subtotal_equip = 0
         if equip_items_by_room:
             elements.append(Paragraph("ОБОРУДОВАНИЕ", self.styles['RussianHeader']))
             elements.append(Spacer(1, 0.2*cm))
-            subtotal_equip = self._add_items_table(elements, equip_items_by_room)
+            self._add_items_table(elements, equip_items_by_room, large)
             elements.append(Spacer(1, 0.5*cm))
 
-        # 6. Calculate discounts
-        discount_main_pct = float(estimate.discount_pr_work or 0)
-        discount_equip_pct = float(estimate.discount_equipment or 0)
-        
-        subtotal_main = float(subtotal_main)
-        subtotal_equip = float(subtotal_equip)
-        
-        discount_main_sum = subtotal_main * (discount_main_pct / 100)
-        discount_equip_sum = subtotal_equip * (discount_equip_pct / 100)
-        
-        total_main = subtotal_main - discount_main_sum
-        total_equip = subtotal_equip - discount_equip_sum
-        
-        grand_total = total_main + total_equip
-
-        # 7. Summary table
-        self._add_summary(elements, subtotal_main, discount_main_pct, discount_main_sum, 
-                          subtotal_equip, discount_equip_pct, discount_equip_sum, grand_total)
+        # 6-7. Summary table from the totals stored with the estimate
+        self._add_summary(elements, estimate.subtotal_main, estimate.discount_pr_work, estimate.discount_main_sum,
+                          estimate.subtotal_equipment, estimate.discount_equipment,
+                          estimate.discount_equipment_sum, estimate.final_sum)
 
         # 8. Блок гарантий и реквизитов
         self._add_footer(elements, company)
 
         # Build PDF
-        doc.build(elements)
+        with self._build_lock:
+            doc.build(elements)
         
         pdf_bytes = buffer.getvalue()
         buffer.close()
         return pdf_bytes
 
-    def _add_header(self, elements, company):
+    def _add_header(self, elements, company: PdfCompany):
         # Логотип (если есть)
         logo = None
-        if company.logo_path and os.path.exists(company.logo_path):
+        if company.logo_path:
             try:
-                logo = Image(company.logo_path)
+                reader = self._logo_reader(company)
                 # Масштабирование логотипа (макс. ширина 4см, макс. высота 2см)
-                aspect = logo.imageWidth / logo.imageHeight
-                logo.drawHeight = 2.0*cm
-                logo.drawWidth = 2.0*cm * aspect
-                if logo.drawWidth > 5.0*cm: # Если слишком широкий
-                    logo.drawWidth = 5.0*cm
-                    logo.drawHeight = 5.0*cm / aspect
+                image_width, image_height = reader.getSize()
+                aspect = image_width / image_height
+                draw_height = 2.0*cm
+                draw_width = 2.0*cm * aspect
+                if draw_width > 5.0*cm: # Если слишком широкий
+                    draw_width = 5.0*cm
+                    draw_height = 5.0*cm / aspect
+                logo = _LogoImage(reader, self._logos_lock, draw_width, draw_height)
             except Exception as e:
                 logger.error(f"Error loading logo: {e}")
                 logo = None
@@ -191,7 +262,7 @@ class PDFService:
         # Формирование информации о компании
         company_address = company.address or company.city or ""
         company_phone = company.phone or ""
-        company_email = company.user.email if (company.user and hasattr(company.user, 'email')) else ""
+        company_email = company.email
         
         company_info_text = f"<b>{company.name or 'Ceiling KP'}</b><br/>"
         if company_address:
@@ -231,7 +302,26 @@ class PDFService:
         elements.append(Paragraph("КОММЕРЧЕСКОЕ ПРЕДЛОЖЕНИЕ", self.styles['RussianTitle']))
         elements.append(Spacer(1, 0.5*cm))
 
-    def _add_client_info(self, elements, estimate):
+    def _logo_reader(self, company: PdfCompany) -> ImageReader:
+        """Decoded logo, cached per company until its path changes (a new upload gets a new path)."""
+        with self._logos_lock:
+            cached = self._logos.get(company.id)
+            if cached is not None and cached[0] == company.logo_path:
+                self._logos.move_to_end(company.id)
+                return cached[1]
+
+        # Decoded outside the lock (a big upload takes a while), and completely, so the
+        # shared reader isn't filled in lazily by concurrent renders
+        reader = ImageReader(company.logo_path)
+        reader.getRGBData()
+        with self._logos_lock:
+            self._logos[company.id] = (company.logo_path, reader)
+            self._logos.move_to_end(company.id)
+            while len(self._logos) > LOGO_CACHE_SIZE:
+                self._logos.popitem(last=False)
+        return reader
+
+    def _add_client_info(self, elements, estimate: PdfEstimate):
         client_data = [
             [Paragraph("<b>Заказчик:</b>", self.styles['RussianBody']), 
              Paragraph(estimate.client_name or "-", self.styles['RussianBody'])],
@@ -251,15 +341,15 @@ class PDFService:
         elements.append(client_table)
         elements.append(Spacer(1, 1*cm))
 
-    def _add_items_table(self, elements, items_by_room):
-        block_subtotal = 0
-        
+    def _add_items_table(self, elements, items_by_room, large: bool = False):
+        if large:
+            self._add_long_items_table(elements, items_by_room)
+            return
+
         for room, items in items_by_room.items():
             # Room Header
             room_area = float(room.area) if room.area else 0
-            # Calculate sum for this block's items
-            room_block_sum = sum(float(i.sum) if i.sum else float(i.quantity)*float(i.price) for i in items)
-            block_subtotal += room_block_sum
+            rows, room_block_sum = self._item_rows(items)
             
             elements.append(Paragraph(
                 f"Комната: {room.name} (Площадь: {room_area:.1f} м²)",
@@ -268,42 +358,91 @@ class PDFService:
             elements.append(Spacer(1, 0.2*cm))
 
             # Items Table
-            data = [['Наименование', 'Кол-во', 'Ед.', 'Цена', 'Сумма']]
-            for item in items:
-                quantity = float(item.quantity) if item.quantity else 0
-                price = float(item.price) if item.price else 0
-                item_sum = float(item.sum) if item.sum else quantity * price
-                
-                data.append([
-                    str(item.name or '-'),
-                    f"{quantity:.1f}",
-                    str(item.unit or 'шт'),
-                    f"{price:,.0f}".replace(',', ' '),
-                    f"{item_sum:,.0f}".replace(',', ' ')
-                ])
+            data = [ITEMS_HEADER, *rows]
             
             # Room Subtotal for this block
             data.append(['', '', '', 'Подытог:', f"{room_block_sum:,.0f}".replace(',', ' ')])
 
-            table = Table(data, colWidths=[8*cm, 2*cm, 1.5*cm, 2.5*cm, 3*cm])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#1e40af')), # Dark blue
-                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-                ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-                ('ALIGN', (1,0), (-1,-1), 'RIGHT'),
-                ('FONTNAME', (0,0), (-1,-1), FONT_NAME),
-                ('FONTNAME', (0,0), (-1,0), FONT_BOLD),
-                ('FONTNAME', (0,-1), (-1,-1), FONT_BOLD),
-                ('FONTSIZE', (0,0), (-1,-1), 9),
-                ('BOTTOMPADDING', (0,0), (-1,0), 8),
-                ('BACKGROUND', (0,-1), (-1,-1), colors.HexColor('#f8fafc')),
-                ('GRID', (0,0), (-1,-2), 0.5, colors.HexColor('#cbd5e1')), # Light grey border
-                ('LINEBELOW', (0,-1), (-1,-1), 1, colors.HexColor('#1e40af')),
-            ]))
+            table = Table(data, colWidths=ITEMS_COL_WIDTHS)
+            table.setStyle(self.room_table_style)
             elements.append(table)
             elements.append(Spacer(1, 0.5*cm))
-        
-        return block_subtotal
+
+    def _add_long_items_table(self, elements, items_by_room):
+        """Large-document layout: the block's rows (rooms as spanning title rows) in LongTables
+        of about LONG_TABLE_CHUNK_ROWS, cut only between rooms. A single table for the whole
+        block would be re-measured on every page split, which is quadratic in its length;
+        bounded chunks keep layout linear. The column header opens the block and repeats on
+        the page breaks of its first table; a room title never ends up alone at a page bottom."""
+        chunks = []  # (rows, kinds); kinds per row: 'title', 'item' or 'subtotal'
+        rows, kinds = [], []
+
+        for room, items in items_by_room.items():
+            room_area = float(room.area) if room.area else 0
+            item_rows, room_block_sum = self._item_rows(items)
+
+            rows.append([f"Комната: {room.name} (Площадь: {room_area:.1f} м²)", '', '', '', ''])
+            rows.extend(item_rows)
+            rows.append(['', '', '', 'Подытог:', f"{room_block_sum:,.0f}".replace(',', ' ')])
+            kinds += ['title'] + ['item'] * len(item_rows) + ['subtotal']
+            if len(rows) >= LONG_TABLE_CHUNK_ROWS:
+                chunks.append((rows, kinds))
+                rows, kinds = [], []
+        if rows:
+            chunks.append((rows, kinds))
+
+        for index, (chunk_rows, chunk_kinds) in enumerate(chunks):
+            commands = list(self.long_table_commands)
+            header = index == 0
+            if header:
+                chunk_rows = [ITEMS_HEADER, *chunk_rows]
+                commands += self.long_table_header_commands
+            for offset, kind in enumerate(chunk_kinds, start=int(header)):
+                if kind == 'title':
+                    commands += self._room_title_commands(offset)
+                elif kind == 'subtotal':
+                    commands += self._subtotal_commands(offset)
+            table = LongTable(chunk_rows, colWidths=ITEMS_COL_WIDTHS, repeatRows=int(header))
+            table.setStyle(TableStyle(commands))
+            elements.append(table)
+        elements.append(Spacer(1, 0.5*cm))
+
+    @staticmethod
+    def _room_title_commands(row):
+        return [
+            ('SPAN', (0, row), (-1, row)),
+            ('ALIGN', (0, row), (-1, row), 'LEFT'),
+            ('FONTNAME', (0, row), (-1, row), FONT_BOLD),
+            ('BACKGROUND', (0, row), (-1, row), ROOM_TITLE_BACKGROUND),
+            ('NOSPLIT', (0, row), (-1, row + 1)),  # keep the title with the room's first line
+        ]
+
+    @staticmethod
+    def _subtotal_commands(row):
+        return [
+            ('FONTNAME', (0, row), (-1, row), FONT_BOLD),
+            ('BACKGROUND', (0, row), (-1, row), SUBTOTAL_BACKGROUND),
+            ('LINEBELOW', (0, row), (-1, row), 1, ACCENT_COLOR),
+        ]
+
+    @staticmethod
+    def _item_rows(items):
+        rows = []
+        total = 0
+        for item in items:
+            quantity = float(item.quantity) if item.quantity else 0
+            price = float(item.price) if item.price else 0
+            item_sum = float(item.sum) if item.sum else quantity * price
+            total += item_sum
+            
+            rows.append([
+                str(item.name or '-'),
+                f"{quantity:.1f}",
+                str(item.unit or 'шт'),
+                f"{price:,.0f}".replace(',', ' '),
+                f"{item_sum:,.0f}".replace(',', ' ')
+            ])
+        return rows, total
 
     def _add_summary(self, elements, subtotal_main, discount_main_pct, discount_main_sum, 
                      subtotal_equip, discount_equip_pct, discount_equip_sum, grand_total):
@@ -317,7 +456,7 @@ class PDFService:
                  summary_data.append([f'Скидка ({discount_main_pct:g}%):', f"-{discount_main_sum:,.0f} руб.".replace(',', ' ')])
                  summary_data.append(['Итого со скидкой:', f"{(subtotal_main - discount_main_sum):,.0f} руб.".replace(',', ' ')])
 
-        # Equipment block summary (only Оборудование)
+        # Equipment block summary (equipment items only)
         if subtotal_equip > 0:
             summary_data.append(['Сумма по оборудованию:', f"{subtotal_equip:,.0f} руб.".replace(',', ' ')])
             if discount_equip_pct > 0:
@@ -354,7 +493,7 @@ class PDFService:
         elements.append(Spacer(1, 0.5*cm))
         elements.append(Spacer(1, 1*cm))
 
-    def _add_footer(self, elements, company):
+    def _add_footer(self, elements, company: PdfCompany):
         bottom_elements = []
         
         # Гарантии
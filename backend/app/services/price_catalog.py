@@ -0,0 +1,197 @@
+"""In-process cache of per-company price lists.
+
+Every company's price list is loaded once into an immutable ``PriceCatalog``
+snapshot. Writes through ``PriceService`` bump the company's version counter,
+which makes the next read build a fresh snapshot. Snapshots are evicted in LRU
+order when the cache holds too many companies or too many items in total.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.models import PriceItem
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogCategory:
+    id: int
+    name: str
+    slug: str
+    sort_order: int
+    is_system: bool
+    is_equipment: bool
+
+
+@dataclass(frozen=True)
+class CatalogItem:
+    id: int
+    company_id: int
+    category_id: int
+    name: str
+    unit: str
+    price: Decimal
+    synonyms: str
+    is_active: bool
+    is_custom: bool
+    category_name: Optional[str]
+    is_equipment: bool
+
+
+class PriceCatalog:
+    """Read-only snapshot of one company's price list at a given version."""
+
+    def __init__(self, company_id: int, version: int, items: List[CatalogItem], categories: List[CatalogCategory]):
+        self.company_id = company_id
+        self.version = version
+        self.items: Tuple[CatalogItem, ...] = tuple(items)
+        self.active_items: Tuple[CatalogItem, ...] = tuple(i for i in self.items if i.is_active)
+        self.by_id: Dict[int, CatalogItem] = {i.id: i for i in self.items}
+        self.categories: Tuple[CatalogCategory, ...] = tuple(categories)
+        self.fingerprint = self._fingerprint(self.items)
+        self.loaded_at = time.monotonic()
+        self._derived: Dict[str, Tuple[Any, float]] = {}  # key -> (artifact, computed at)
+        self._lock = threading.Lock()
+
+    def derive(self, key: str, factory: Callable[["PriceCatalog"], Any], max_age: Optional[float] = None) -> Any:
+        """Compute (once) and memoize an artifact built from this snapshot, e.g. a compiled matcher.
+
+        Artifacts that also depend on other data (e.g. usage statistics) pass ``max_age``
+        in seconds and are recomputed once older than that.
+        """
+        entry = self._derived.get(key)
+        if entry is not None and not self._stale(entry, max_age):
+            return entry[0]
+        with self._lock:
+            entry = self._derived.get(key)
+            if entry is None or self._stale(entry, max_age):
+                entry = self._derived[key] = (factory(self), time.monotonic())
+            return entry[0]
+
+    @staticmethod
+    def _stale(entry: Tuple[Any, float], max_age: Optional[float]) -> bool:
+        return bool(max_age) and time.monotonic() - entry[1] > max_age
+
+    @staticmethod
+    def _fingerprint(items: Tuple[CatalogItem, ...]) -> str:
+        digest = hashlib.sha256()
+        for i in items:
+            digest.update(
+                f"{i.id}\x1f{i.category_id}\x1f{i.name}\x1f{i.unit}\x1f{i.price}\x1f"
+                f"{i.synonyms}\x1f{i.is_active}\x1f{i.category_name}\x1f{i.is_equipment}\x1e".encode("utf-8")
+            )
+        return digest.hexdigest()
+
+
+class PriceCatalogService:
+    def __init__(
+        self,
+        max_companies: int = settings.PRICE_CACHE_MAX_COMPANIES,
+        max_items: int = settings.PRICE_CACHE_MAX_ITEMS,
+        ttl_seconds: int = settings.PRICE_CACHE_TTL_SECONDS,
+    ):
+        self.max_companies = max_companies
+        self.max_items = max_items
+        # Bounds staleness after writes that bypass PriceService (import scripts, other workers)
+        self.ttl_seconds = ttl_seconds
+        self._catalogs: "OrderedDict[int, PriceCatalog]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self._total_items = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, company_id: int) -> PriceCatalog:
+        with self._lock:
+            version = self._versions.get(company_id, 0)
+            catalog = self._catalogs.get(company_id)
+            if catalog is not None and catalog.version == version and not self._expired(catalog):
+                self._catalogs.move_to_end(company_id)
+                return catalog
+
+        fresh = self._load(db, company_id, version)
+        with self._lock:
+            if catalog is not None and catalog.version == version and catalog.fingerprint != fresh.fingerprint:
+                # Changed behind our back: give the new content its own version
+                version = self._versions[company_id] = max(self._versions.get(company_id, 0), version) + 1
+                fresh = PriceCatalog(company_id, version, list(fresh.items), list(fresh.categories))
+            if self._versions.get(company_id, 0) == fresh.version:
+                self._store(fresh)
+        return fresh
+
+    def bump(self, company_id: int) -> int:
+        """Mark a company's price list as changed; the cached snapshot is dropped."""
+        with self._lock:
+            version = self._versions.get(company_id, 0) + 1
+            self._versions[company_id] = version
+            self._drop(company_id)
+        return version
+
+    def version(self, company_id: int) -> int:
+        with self._lock:
+            return self._versions.get(company_id, 0)
+
+    def _expired(self, catalog: PriceCatalog) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - catalog.loaded_at > self.ttl_seconds
+
+    def _store(self, catalog: PriceCatalog) -> None:
+        self._drop(catalog.company_id)
+        self._catalogs[catalog.company_id] = catalog
+        self._total_items += len(catalog.items)
+        while len(self._catalogs) > 1 and (
+            len(self._catalogs) > self.max_companies or self._total_items > self.max_items
+        ):
+            _, evicted = self._catalogs.popitem(last=False)
+            self._total_items -= len(evicted.items)
+
+    def _drop(self, company_id: int) -> None:
+        old = self._catalogs.pop(company_id, None)
+        if old is not None:
+            self._total_items -= len(old.items)
+
+    def _load(self, db: Session, company_id: int, version: int) -> PriceCatalog:
+        rows = db.query(PriceItem).options(joinedload(PriceItem.category)).filter(
+            PriceItem.company_id == company_id
+        ).order_by(PriceItem.id).all()
+
+        items = []
+        categories = {}
+        for row in rows:
+            category = row.category
+            if category is not None and category.id not in categories:
+                categories[category.id] = CatalogCategory(
+                    id=category.id,
+                    name=category.name,
+                    slug=category.slug,
+                    sort_order=category.sort_order or 0,
+                    is_system=bool(category.is_system),
+                    is_equipment=bool(category.is_equipment),
+                )
+            items.append(CatalogItem(
+                id=row.id,
+                company_id=row.company_id,
+                category_id=row.category_id,
+                name=row.name,
+                unit=row.unit,
+                price=row.price,
+                synonyms=row.synonyms or "",
+                is_active=bool(row.is_active),
+                is_custom=bool(row.is_custom),
+                category_name=category.name if category else None,
+                is_equipment=bool(category.is_equipment) if category else False,
+            ))
+
+        ordered_categories = sorted(categories.values(), key=lambda c: (c.sort_order, c.id))
+        logger.info(f"[PRICE_CACHE] Loaded company_id={company_id} version={version}: {len(items)} items")
+        return PriceCatalog(company_id, version, items, ordered_categories)
+
+
+price_catalog_service = PriceCatalogService()
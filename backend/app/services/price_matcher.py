@@ -0,0 +1,127 @@
+"""Compiled multi-pattern matcher for price item names and synonyms.
+
+All names and synonyms of a company's price list are folded into a single
+trie-shaped regular expression, so a transcript is scanned in one pass
+instead of running several ``re.finditer`` calls per price item. Matchers
+are compiled lazily per price catalog snapshot (see ``price_catalog``).
+"""
+
+import re
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MIN_SYNONYM_LENGTH = 3  # Ignore very short synonyms (same rule as the old fallback parser)
+
+NUMBER = r'(\d+(?:[.,]\d+)?)'
+# "5 шт светильник", "3 x люстра" — quantity written before the key
+_QTY_BEFORE_RE = re.compile(NUMBER + r'\s*(?:шт|пог\.?|м\.?|м2)?\s*[\-xх\*]?\s*$')
+# "светильник: 5" — quantity written after the key
+_QTY_AFTER_RE = re.compile(r'\s*[:\-]?\s*' + NUMBER)
+# Longest text window we look back into for a leading quantity
+_QTY_LOOKBEHIND = 32
+
+
+class IntervalSet:
+    """Sorted, non-overlapping [start, end) ranges with O(log n) overlap checks."""
+
+    def __init__(self):
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+
+    def overlaps(self, start: int, end: int) -> bool:
+        idx = bisect_left(self._ends, start + 1)
+        return idx < len(self._starts) and self._starts[idx] < end
+
+    def add(self, start: int, end: int) -> None:
+        idx = bisect_left(self._ends, start + 1)
+        self._starts.insert(idx, start)
+        self._ends.insert(idx, end)
+
+
+class PriceMatcher:
+    """Matcher compiled once from a list of price items."""
+
+    def __init__(self, price_items: Iterable[Any]):
+        self.items_map: Dict[str, Any] = {}
+        for item in price_items:
+            name_key = (item.name or "").strip().lower()
+            if name_key:
+                self.items_map[name_key] = item
+            if item.synonyms:
+                for syn in item.synonyms.split(','):
+                    s = syn.strip().lower()
+                    if len(s) >= MIN_SYNONYM_LENGTH:
+                        self.items_map[s] = item
+
+        self.pattern: Optional[re.Pattern] = None
+        if self.items_map:
+            self.pattern = re.compile(r'(?<!\w)(?:' + _trie_regex(self.items_map.keys()) + r')(?!\w)')
+
+    def find_items(self, text_lower: str, taken: Optional[IntervalSet] = None) -> List[Tuple[Any, float]]:
+        """
+        Single left-to-right pass over the (lowercased) text.
+        Returns (price_item, quantity) pairs; a mention without a number counts as 1.
+        Every consumed range, quantity included, is recorded in ``taken``.
+        """
+        if self.pattern is None:
+            return []
+        if taken is None:
+            taken = IntervalSet()
+
+        found = []
+        for match in self.pattern.finditer(text_lower):
+            start, end = match.span()
+            if taken.overlaps(start, end):
+                continue
+
+            span, quantity = self._quantity_for(text_lower, start, end, taken)
+            found.append((self.items_map[match.group(0)], quantity))
+            taken.add(*span)
+        return found
+
+    def _quantity_for(self, text: str, start: int, end: int, taken: IntervalSet) -> Tuple[Tuple[int, int], float]:
+        window_start = max(0, start - _QTY_LOOKBEHIND)
+        before = _QTY_BEFORE_RE.search(text, window_start, start)
+        if before and not taken.overlaps(before.start(), end):
+            quantity = _to_float(before.group(1))
+            if quantity is not None:
+                return (before.start(), end), quantity
+
+        after = _QTY_AFTER_RE.match(text, end)
+        if after and not taken.overlaps(start, after.end()):
+            quantity = _to_float(after.group(1))
+            if quantity is not None:
+                return (start, after.end()), quantity
+
+        return (start, end), 1.0
+
+
+def _trie_regex(keys: Iterable[str]) -> str:
+    """Build a regex alternation from a character trie; longer keys win on shared prefixes."""
+    trie: Dict[str, Any] = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return _node_regex(trie)
+
+
+def _node_regex(node: Dict[str, Any]) -> str:
+    terminal = '' in node
+    branches = [re.escape(ch) + _node_regex(child) for ch, child in sorted(node.items()) if ch != '']
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        # Greedy optional group: try the longer key first, backtrack to the shorter one
+        return '(?:' + body + ')?'
+    return body
+
+
+def _to_float(value: str) -> Optional[float]:
+    try:
+        return float(value.replace(',', '.'))
+    except ValueError:
+        return None
+
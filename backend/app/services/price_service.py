@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session, joinedload
 from app.models import PriceItem, Category, User
 from app.schemas.price import PriceItemCreate, PriceItemUpdate
+from app.services.price_catalog import price_catalog_service, CatalogItem
 from typing import List, Optional
 
 FOCUS_GROUP_EMAILS = {
@@ -41,12 +42,9 @@ class PriceService:
 
     def get_categories(self, db: Session, company_id: Optional[int] = None) -> List[Category]:
         if company_id is not None:
-            company_category_ids = [
-                row[0]
-                for row in db.query(PriceItem.category_id).filter(PriceItem.company_id == company_id).distinct().all()
-            ]
-            if company_category_ids:
-                return db.query(Category).filter(Category.id.in_(company_category_ids)).order_by(Category.sort_order, Category.id).all()
+            catalog = price_catalog_service.get(db, company_id)
+            if catalog.categories:
+                return list(catalog.categories)
 
             source_category_ids = self._get_source_admin_category_ids(db)
             if source_category_ids:
@@ -54,24 +52,23 @@ class PriceService:
 
         return db.query(Category).order_by(Category.sort_order, Category.id).all()
     
-    def get_items(self, db: Session, company_id: int, category_id: Optional[int] = None, active_only: bool = True) -> List[PriceItem]:
-        query = db.query(PriceItem).options(joinedload(PriceItem.category)).filter(PriceItem.company_id == company_id)
+    def get_items(self, db: Session, company_id: int, category_id: Optional[int] = None, active_only: bool = True) -> List[CatalogItem]:
+        catalog = price_catalog_service.get(db, company_id)
+        items = catalog.active_items if active_only else catalog.items
         
         if category_id:
-            query = query.filter(PriceItem.category_id == category_id)
-        
-        if active_only:
-            query = query.filter(PriceItem.is_active == True)
-            
-        return query.all()
+            return [item for item in items if item.category_id == category_id]
+        return list(items)
 
-    def search_items(self, db: Session, company_id: int, query: str, limit: int = 10) -> List[PriceItem]:
-        q = f"%{query}%"
-        return db.query(PriceItem).options(joinedload(PriceItem.category)).filter(
-            PriceItem.company_id == company_id,
-            PriceItem.is_active == True,
-            (PriceItem.name.ilike(q) | PriceItem.synonyms.ilike(q))
-        ).limit(limit).all()
+    def search_items(self, db: Session, company_id: int, query: str, limit: int = 10) -> List[CatalogItem]:
+        q = query.casefold()
+        result = []
+        for item in price_catalog_service.get(db, company_id).active_items:
+            if q in item.name.casefold() or q in item.synonyms.casefold():
+                result.append(item)
+                if len(result) >= limit:
+                    break
+        return result
     
     def create_item(self, db: Session, company_id: int, item_in: PriceItemCreate) -> PriceItem:
         item = PriceItem(
@@ -82,6 +79,7 @@ class PriceService:
         db.add(item)
         db.commit()
         db.refresh(item)
+        price_catalog_service.bump(company_id)
         # Load category for response
         return db.query(PriceItem).options(joinedload(PriceItem.category)).filter(PriceItem.id == item.id).first()
     
@@ -97,7 +95,7 @@ class PriceService:
         db.add(item)
         db.commit()
         db.refresh(item)
-        db.refresh(item)
+        price_catalog_service.bump(item.company_id)
         return db.query(PriceItem).options(joinedload(PriceItem.category)).filter(PriceItem.id == item_id).first()
 
     def delete_item(self, db: Session, company_id: int, item_id: int) -> bool:
@@ -117,6 +115,7 @@ class PriceService:
         # Let's use delete()
         db.delete(item)
         db.commit()
+        price_catalog_service.bump(company_id)
         return True
 
     def add_synonym(self, db: Session, company_id: int, item_id: int, synonym: str) -> Optional[PriceItem]:
@@ -137,6 +136,7 @@ class PriceService:
             db.add(item)
             db.commit()
             db.refresh(item)
+            price_catalog_service.bump(company_id)
             
         return item
 
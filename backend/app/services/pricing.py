@@ -0,0 +1,74 @@
+"""Money arithmetic of an estimate: line sums, block subtotals, discounts, payable total.
+
+Everything is Decimal, rounded to kopecks half up. Lines are split into the
+main block (ceilings, profiles, work) and the equipment block by the item's
+``is_equipment`` snapshot; each block gets its own discount percentage.
+Estimates store the result when saved (``EstimateService``), and the PDF and
+the lists show the stored numbers.
+"""
+
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Tuple, Union
+
+Number = Union[Decimal, int, float, str, None]
+
+CENTS = Decimal("0.01")
+HUNDRED = Decimal(100)
+
+
+def to_decimal(value: Number) -> Decimal:
+    # Through str, so a float like 0.1 becomes Decimal("0.1") rather than its binary expansion
+    return value if isinstance(value, Decimal) else Decimal(str(value or 0))
+
+
+def money(value: Number) -> Decimal:
+    return to_decimal(value).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def line_sum(quantity: Number, price: Number) -> Decimal:
+    return money(to_decimal(quantity) * to_decimal(price))
+
+
+@dataclass(frozen=True)
+class EstimateTotals:
+    subtotal_main: Decimal
+    subtotal_equipment: Decimal
+    discount_main_sum: Decimal
+    discount_equipment_sum: Decimal
+
+    @property
+    def total_sum(self) -> Decimal:
+        """Before discounts."""
+        return self.subtotal_main + self.subtotal_equipment
+
+    @property
+    def total_main(self) -> Decimal:
+        return self.subtotal_main - self.discount_main_sum
+
+    @property
+    def total_equipment(self) -> Decimal:
+        return self.subtotal_equipment - self.discount_equipment_sum
+
+    @property
+    def final_sum(self) -> Decimal:
+        """Payable, after both discounts."""
+        return self.total_main + self.total_equipment
+
+
+def compute_totals(lines: Iterable[Tuple[Number, bool]], discount_main_pct: Number,
+                   discount_equipment_pct: Number) -> EstimateTotals:
+    """Totals of ``(line sum, is_equipment)`` pairs with the two discount percentages applied."""
+    subtotal_main = Decimal(0)
+    subtotal_equipment = Decimal(0)
+    for amount, is_equipment in lines:
+        if is_equipment:
+            subtotal_equipment += money(amount)
+        else:
+            subtotal_main += money(amount)
+    return EstimateTotals(
+        subtotal_main=subtotal_main,
+        subtotal_equipment=subtotal_equipment,
+        discount_main_sum=money(subtotal_main * to_decimal(discount_main_pct) / HUNDRED),
+        discount_equipment_sum=money(subtotal_equipment * to_decimal(discount_equipment_pct) / HUNDRED),
+    )
@@ -0,0 +1,51 @@
+from sqlalchemy.orm import Session, joinedload
+from app.models import EstimateRoom, RoomTemplate, RoomTemplateItem
+from app.schemas.room_template import RoomTemplateCreate
+from typing import List, Optional
+
+class RoomTemplateService:
+    def list_templates(self, db: Session, company_id: int) -> List[RoomTemplate]:
+        return db.query(RoomTemplate).options(joinedload(RoomTemplate.items)).filter(
+            RoomTemplate.company_id == company_id
+        ).order_by(RoomTemplate.name, RoomTemplate.id).all()
+
+    def get_template(self, db: Session, template_id: int) -> Optional[RoomTemplate]:
+        return db.query(RoomTemplate).options(joinedload(RoomTemplate.items)).filter(
+            RoomTemplate.id == template_id
+        ).first()
+
+    def create_template(self, db: Session, company_id: int, template_in: RoomTemplateCreate) -> RoomTemplate:
+        template = RoomTemplate(
+            company_id=company_id,
+            name=template_in.name,
+            area=template_in.area or 0,
+            items=[RoomTemplateItem(**item_in.model_dump()) for item_in in template_in.items],
+        )
+        db.add(template)
+        db.commit()
+        return self.get_template(db, template.id)
+
+    def create_from_room(self, db: Session, company_id: int, room: EstimateRoom, name: Optional[str] = None) -> RoomTemplate:
+        """Save an estimate room with its lines as a template."""
+        template = RoomTemplate(
+            company_id=company_id,
+            name=name or room.name,
+            area=room.area or 0,
+            items=[
+                RoomTemplateItem(
+                    price_item_id=item.price_item_id, name=item.name, unit=item.unit,
+                    quantity=item.quantity, price=item.price
+                )
+                for item in room.items
+            ],
+        )
+        db.add(template)
+        db.commit()
+        return self.get_template(db, template.id)
+
+    def delete_template(self, db: Session, template: RoomTemplate) -> None:
+        db.delete(template)
+        db.commit()
+
+
+room_template_service = RoomTemplateService()
@@ -0,0 +1,127 @@
+"""Incremental scanner for the parser model's JSON answer.
+
+The model answers with ``{"rooms": [{"name", "area", "items": [...]}, ...], ...}``.
+``RoomsStreamParser`` is fed the answer chunk by chunk as it streams in and
+reports each room as soon as its header (everything before ``"items"``) is
+complete, and each item as soon as its object closes. Text before the first
+``{`` (e.g. a Markdown code fence) is ignored.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+Event = Tuple[str, Dict[str, Any]]
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "key", "index", "expect_key", "header_sent")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind          # '{' or '['
+        self.start = start        # offset of the opening bracket
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = kind == '{'
+        self.header_sent = False
+
+
+class RoomsStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Event]:
+        """Consume a chunk; returns ("room", {...}), ("item", {...}) and ("room_end", {...}) events."""
+        self.buffer += chunk
+        events: List[Event] = []
+        buf = self.buffer
+
+        while self._pos < len(buf) and not self._done:
+            ch = buf[self._pos]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string_end(events)
+            elif not self._stack:
+                if ch == '{':
+                    self._stack.append(_Frame('{', self._pos))
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in '{[':
+                self._stack.append(_Frame(ch, self._pos))
+            elif ch in '}]':
+                self._on_close(events)
+            elif ch == ',':
+                top = self._stack[-1]
+                if top.kind == '[':
+                    top.index += 1
+                else:
+                    top.expect_key = True
+            elif ch == ':':
+                self._stack[-1].expect_key = False
+
+            self._pos += 1
+        return events
+
+    def _path(self, depth: int) -> List[Any]:
+        """JSON path of the container at stack position ``depth``."""
+        return [f.key if f.kind == '{' else f.index for f in self._stack[:depth]]
+
+    def _on_string_end(self, events: List[Event]) -> None:
+        top = self._stack[-1]
+        if top.kind != '{' or not top.expect_key:
+            return
+        top.key = json.loads(self.buffer[self._string_start:self._pos + 1])
+        depth = len(self._stack) - 1
+        if top.key == "items" and not top.header_sent and self._is_room(self._path(depth)):
+            # Everything before "items" is the room header: close it and parse
+            head = self.buffer[top.start:self._string_start].rstrip().rstrip(',')
+            header = self._loads(head + '}')
+            if header is not None:
+                top.header_sent = True
+                events.append(("room", self._room_event(depth, header)))
+
+    def _on_close(self, events: List[Event]) -> None:
+        frame = self._stack.pop()
+        depth = len(self._stack)
+        if not self._stack:
+            self._done = True
+            return
+        if frame.kind != '{':
+            return
+
+        path = self._path(depth)
+        if self._is_room(path):
+            room = self._loads(self.buffer[frame.start:self._pos + 1])
+            if room is not None and not frame.header_sent:
+                events.append(("room", self._room_event(depth, room)))
+            events.append(("room_end", {"index": path[1]}))
+        elif len(path) == 4 and self._is_room(path[:2]) and path[2] == "items" and isinstance(path[3], int):
+            item = self._loads(self.buffer[frame.start:self._pos + 1])
+            if isinstance(item, dict):
+                events.append(("item", {"room_index": path[1], "item": item}))
+
+    @staticmethod
+    def _is_room(path: List[Any]) -> bool:
+        return len(path) == 2 and path[0] == "rooms" and isinstance(path[1], int)
+
+    def _room_event(self, depth: int, room: Dict[str, Any]) -> Dict[str, Any]:
+        return {"index": self._path(depth)[1], "name": room.get("name"), "area": room.get("area")}
+
+    @staticmethod
+    def _loads(text: str) -> Optional[Any]:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return None
@@ -1,10 +1,11 @@
 import asyncio
 import base64
+import contextlib
 import httpx
-import tempfile
-import os
-import subprocess
+from typing import Any, Awaitable, Callable, Dict, Optional
 from app.config import settings
+from app.services.audio_processing import PCM_BYTES_PER_SECOND, audio_processor, plan_segments
+from app.services.openrouter_client import openrouter_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,40 +13,80 @@ logger = logging.getLogger(__name__)
 MAX_RETRIES = 3
 RETRY_DELAY_SECONDS = 2
 
+SegmentCallback = Callable[[Dict[str, Any], int], Awaitable[None]]
+
 
 class TranscribeService:
     """Service for transcribing audio using Gemini Flash via OpenRouter"""
     
     def __init__(self):
         self.api_key = settings.OPENROUTER_API_KEY
-        self.base_url = settings.OPENROUTER_BASE_URL
         self.model = settings.OPENROUTER_TRANSCRIBE_MODEL
     
-    async def transcribe_audio(self, audio_data: bytes, mime_type: str = "audio/webm") -> str:
+    async def transcribe_audio(self, audio_data: bytes, mime_type: str = "audio/webm", on_segment: Optional[SegmentCallback] = None,
+                               provider_limit: Optional[asyncio.Semaphore] = None) -> str:
         """
         Transcribe audio using Gemini Flash model via OpenRouter.
-        Automatically converts input audio to MP3 using ffmpeg for compatibility.
+        Input that isn't already mono 16 kHz WAV/MP3 is converted to MP3 with ffmpeg.
+        Long recordings are cut at pauses and the segments transcribed concurrently;
+        ``on_segment(segment, total)`` is awaited as each segment's text arrives.
+        ``provider_limit`` is held around every provider call (one per segment).
         Retries up to MAX_RETRIES times on transient errors.
         """
         if not self.api_key:
             raise ValueError("OPENROUTER_API_KEY is not configured")
         
-        # Convert to MP3 using ffmpeg
+        if settings.TRANSCRIBE_SEGMENT_SECONDS > 0 and len(audio_data) >= settings.TRANSCRIBE_SEGMENT_MIN_BYTES:
+            return await self._transcribe_segmented(audio_data, mime_type, on_segment, provider_limit)
+        
+        # Convert to MP3 using ffmpeg (unless already in a format the provider takes)
         try:
-            mp3_data = self._convert_to_mp3(audio_data)
+            prepared_data, audio_format = await audio_processor.prepare(audio_data, mime_type)
         except Exception as e:
             logger.error(f"Audio conversion failed: {e}")
             raise ValueError(f"Failed to process audio file: {e}")
+        
+        async with provider_limit or contextlib.nullcontext():
+            return await self._transcribe_prepared(prepared_data, audio_format)
 
-        # Encode MP3 to Base64
-        audio_base64 = base64.b64encode(mp3_data).decode('utf-8')
+    async def _transcribe_segmented(self, audio_data: bytes, mime_type: str, on_segment: Optional[SegmentCallback],
+                                    provider_limit: Optional[asyncio.Semaphore]) -> str:
+        try:
+            pcm, silences = await audio_processor.decode_with_silences(audio_data, mime_type)
+        except Exception as e:
+            logger.error(f"Audio conversion failed: {e}")
+            raise ValueError(f"Failed to process audio file: {e}")
         
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "https://ceiling-kp.app",
-            "X-Title": "Ceiling KP Generator"
-        }
+        duration = len(pcm) / PCM_BYTES_PER_SECOND
+        segments = plan_segments(duration, silences, settings.TRANSCRIBE_SEGMENT_SECONDS)
+        logger.info(f"[TRANSCRIBE] {duration:.1f}s of audio, {len(silences)} pauses -> {len(segments)} segments")
+        # Bounds this recording's fan-out; provider_limit bounds the calls of all of them
+        semaphore = asyncio.Semaphore(settings.TRANSCRIBE_SEGMENT_CONCURRENCY)
+        
+        async def transcribe_segment(index: int, start: float, end: float) -> str:
+            async with semaphore:
+                try:
+                    mp3_data = await audio_processor.pcm_to_mp3(audio_processor.slice_pcm(pcm, start, end))
+                except Exception as e:
+                    raise ValueError(f"Failed to process audio file: {e}")
+                async with provider_limit or contextlib.nullcontext():
+                    text = await self._transcribe_prepared(mp3_data, "mp3")
+            if on_segment:
+                await on_segment({"index": index, "start": round(start, 2), "end": round(end, 2), "text": text}, len(segments))
+            return text
+        
+        tasks = [asyncio.create_task(transcribe_segment(i, start, end)) for i, (start, end) in enumerate(segments)]
+        try:
+            texts = await asyncio.gather(*tasks)
+        except Exception:
+            for task in tasks:
+                task.cancel()
+            raise
+        return " ".join(text for text in texts if text).strip()
+
+    async def _transcribe_prepared(self, audio_data: bytes, audio_format: str) -> str:
+        # Encode audio to Base64
+        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
         
         # Correct OpenRouter multimodal format for audio
         payload = {
@@ -62,7 +103,7 @@ class TranscribeService:
                             "type": "input_audio",
                             "input_audio": {
                                 "data": audio_base64,
-                                "format": "mp3"
+                                "format": audio_format
                             }
                         }
                     ]
@@ -76,7 +117,7 @@ class TranscribeService:
         
         for attempt in range(1, MAX_RETRIES + 1):
             try:
-                return await self._call_api(headers, payload, attempt)
+                return await self._call_api(payload, attempt)
             except ValueError as e:
                 last_error = e
                 error_msg = str(e)
@@ -94,90 +135,35 @@ class TranscribeService:
         
         raise last_error
 
-    async def _call_api(self, headers: dict, payload: dict, attempt: int) -> str:
+    async def _call_api(self, payload: dict, attempt: int) -> str:
         """Single API call attempt. Raises ValueError on failure."""
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            response = await client.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=payload
-            )
-            
-            logger.info(f"[TRANSCRIBE] API Request sent (model: {self.model})")
-            
-            if response.status_code != 200:
-                error_body = response.text
-                logger.error(f"[TRANSCRIBE] Attempt {attempt} - API Error ({response.status_code}): {error_body[:200]}")
-                raise ValueError(f"Transcription failed: Provider returned {response.status_code}")
-
-            data = response.json()
-            
-            # Check for generic error structure
-            if "error" in data:
-                 raise ValueError(f"API Error: {data['error'].get('message', 'Unknown error')}")
-
-            try:
-                transcript = data["choices"][0]["message"]["content"]
-                logger.info(f"[TRANSCRIBE] Attempt {attempt} - Success. FULL TEXT: ---{transcript}---")
-                return transcript.strip()
-            except (KeyError, IndexError) as e:
-                 logger.error(f"[TRANSCRIBE] Unexpected API response format: {data}")
-                 raise ValueError("Invalid response from transcription service")
-
-    def _convert_to_mp3(self, input_data: bytes) -> bytes:
-        """Convert input audio bytes to MP3 using ffmpeg"""
-        # Check if ffmpeg is installed
-        import shutil
-        if not shutil.which("ffmpeg"):
-            logger.error("ffmpeg not found in system PATH")
-            raise RuntimeError("ffmpeg is not installed on the server. Please rebuild the Docker image.")
+        try:
+            response = await openrouter_client.chat_completion(payload, timeout=settings.OPENROUTER_TRANSCRIBE_TIMEOUT)
+        except httpx.TimeoutException as e:
+            raise ValueError(f"Transcription failed: timeout ({e.__class__.__name__})")
+        except httpx.TransportError as e:
+            raise ValueError(f"Transcription failed: network error ({e})")
+        
+        logger.info(f"[TRANSCRIBE] API Request sent (model: {self.model})")
+        
+        if response.status_code != 200:
+            error_body = response.text
+            logger.error(f"[TRANSCRIBE] Attempt {attempt} - API Error ({response.status_code}): {error_body[:200]}")
+            raise ValueError(f"Transcription failed: Provider returned {response.status_code}")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".input") as tmp_in:
-            tmp_in.write(input_data)
-            tmp_in_path = tmp_in.name
-            
-        tmp_out_path = tmp_in_path + ".mp3"
+        data = response.json()
         
+        # Check for generic error structure
+        if "error" in data:
+             raise ValueError(f"API Error: {data['error'].get('message', 'Unknown error')}")
+
         try:
-            logger.info(f"Converting audio size {len(input_data)} bytes to MP3...")
-            # ffmpeg command: input -> convert to mp3 -> output
-            process = subprocess.run(
-                [
-                    "ffmpeg", "-y", 
-                    "-i", tmp_in_path,
-                    "-vn", "-ac", "1", "-ar", "16000",
-                    "-f", "mp3", 
-                    tmp_out_path
-                ],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            
-            if not os.path.exists(tmp_out_path) or os.path.getsize(tmp_out_path) == 0:
-                raise Exception("ffmpeg produced empty output file")
-                
-            with open(tmp_out_path, "rb") as f:
-                converted_data = f.read()
-                logger.info(f"Conversion successful. New size: {len(converted_data)} bytes")
-                return converted_data
-                
-        except subprocess.CalledProcessError as e:
-            error_msg = e.stderr.decode() if e.stderr else "Unknown ffmpeg error"
-            logger.error(f"ffmpeg conversion failed: {error_msg}")
-            raise Exception(f"FFmpeg conversion failed: {error_msg}")
-        except Exception as e:
-            logger.error(f"Unexpected error during audio conversion: {e}")
-            raise
-        finally:
-            # Cleanup temp files
-            try:
-                if os.path.exists(tmp_in_path):
-                    os.unlink(tmp_in_path)
-                if os.path.exists(tmp_out_path):
-                    os.unlink(tmp_out_path)
-            except Exception as e:
-                logger.warning(f"Failed to cleanup temp files: {e}")
+            transcript = data["choices"][0]["message"]["content"]
+            logger.info(f"[TRANSCRIBE] Attempt {attempt} - Success. FULL TEXT: ---{transcript}---")
+            return transcript.strip()
+        except (KeyError, IndexError) as e:
+             logger.error(f"[TRANSCRIBE] Unexpected API response format: {data}")
+             raise ValueError("Invalid response from transcription service")
 
 
 transcribe_service = TranscribeService()
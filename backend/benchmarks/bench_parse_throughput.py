@@ -0,0 +1,152 @@
+"""Concurrent parse throughput against a local OpenRouter stub.
+
+Starts a stub ``/chat/completions`` server that answers after a fixed delay,
+then fires N parse calls with the given concurrency through:
+
+  * ``async``  — the shared pooled client (``ai_parser_service.parse_with_ai``)
+  * ``legacy`` — the previous approach: a new sync ``httpx.Client`` per call,
+                 run in a 40-thread pool like FastAPI's sync routes
+
+Usage (from backend/):
+    python benchmarks/bench_parse_throughput.py --requests 200 --concurrency 50 --delay 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = _free_port()
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+os.environ["OPENROUTER_API_KEY"] = "stub"
+os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["PARSER_SHORTLIST_MIN_ITEMS"] = "0"
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app.services.ai_parser_service import ai_parser_service  # noqa: E402
+from app.services.openrouter_client import openrouter_client  # noqa: E402
+from app.services.parser_prompt import build_messages, build_prompt_catalog  # noqa: E402
+from app.services.price_catalog import CatalogItem, PriceCatalog  # noqa: E402
+
+STUB_REPLY = '{"rooms": [{"name": "Кухня", "area": 10, "items": [{"price_item_id": "1", "quantity": 10}]}], "unknown_items": []}'
+
+
+def build_stub_app(delay: float) -> Starlette:
+    async def chat_completions(request):
+        await request.body()
+        await asyncio.sleep(delay)
+        return JSONResponse({
+            "choices": [{"message": {"content": STUB_REPLY}}],
+            "usage": {"prompt_tokens": 1000, "completion_tokens": 50, "total_tokens": 1050},
+        })
+
+    return Starlette(routes=[Route("/chat/completions", chat_completions, methods=["POST"])])
+
+
+def start_stub(delay: float) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(build_stub_app(delay), host="127.0.0.1", port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def synthetic_catalog(size: int) -> PriceCatalog:
+    items = [
+        CatalogItem(
+            id=i, company_id=1, category_id=1 + i % 4, name=f"Позиция прайса номер {i}", unit="шт",
+            price=Decimal(100 + i), synonyms=f"синоним {i}, вариант {i}", is_active=True, is_custom=False,
+            category_name=f"Категория {i % 4}", is_equipment=i % 4 == 3,
+        )
+        for i in range(1, size + 1)
+    ]
+    return PriceCatalog(1, 1, items, [])
+
+
+async def run_async(catalog: PriceCatalog, requests: int, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await ai_parser_service.parse_with_ai(catalog, "кухня 10 метров позиция прайса номер 1")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    await openrouter_client.aclose()
+    return latencies
+
+
+def run_legacy(catalog: PriceCatalog, requests: int, concurrency: int) -> list:
+    prompt_catalog = build_prompt_catalog(catalog.active_items)
+    payload = {"model": "stub", "messages": build_messages(prompt_catalog, "кухня 10"), "max_tokens": 4096}
+    latencies = []
+
+    def one(_):
+        start = time.perf_counter()
+        with httpx.Client(timeout=60.0) as client:
+            client.post(f"{os.environ['OPENROUTER_BASE_URL']}/chat/completions", json=payload).raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, 40)) as pool:
+        list(pool.map(one, range(requests)))
+    return latencies
+
+
+def report(mode: str, latencies: list, wall: float) -> None:
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{mode:>7}: {len(latencies)} calls in {wall:.2f}s -> {len(latencies) / wall:.1f} req/s, "
+        f"p50={statistics.median(latencies) * 1000:.0f}ms p95={p95 * 1000:.0f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.5, help="stub response delay, seconds")
+    parser.add_argument("--items", type=int, default=600, help="price list size")
+    parser.add_argument("--mode", choices=["async", "legacy", "both"], default="both")
+    args = parser.parse_args()
+
+    server = start_stub(args.delay)
+    catalog = synthetic_catalog(args.items)
+    try:
+        if args.mode in ("legacy", "both"):
+            start = time.perf_counter()
+            latencies = run_legacy(catalog, args.requests, args.concurrency)
+            report("legacy", latencies, time.perf_counter() - start)
+        if args.mode in ("async", "both"):
+            start = time.perf_counter()
+            latencies = asyncio.run(run_async(catalog, args.requests, args.concurrency))
+            report("async", latencies, time.perf_counter() - start)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""PDF rendering benchmark suite with a stored baseline.
+
+Builds synthetic Estimate / EstimateRoom / EstimateItem / PriceItem graphs in
+memory (no database) and renders them with ``pdf_service.generate``, which
+includes the ORM -> snapshot step. Scenarios vary the number of rooms and
+lines, the logo (none, the normalized upload derivative, a raw phone photo)
+and the share of equipment lines. For each scenario it reports render time
+percentiles, peak traced memory of one render and the PDF size.
+
+``--save-baseline`` stores the results as JSON; a later run compares against
+it and exits with status 1 when a scenario got slower / bigger / hungrier
+than the tolerances allow. Timings depend on the machine, so keep the
+baseline from the machine that runs the comparison (e.g. the CI runner) and
+re-save it there after intended changes.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf.py --save-baseline
+    python benchmarks/bench_pdf.py                       # compare with the baseline
+    python benchmarks/bench_pdf.py --scenarios typical large --repeat 50
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+import reportlab  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from app.models import Category, Company, Estimate, EstimateItem, EstimateRoom, PriceItem, User  # noqa: E402
+from app.services.logo_service import logo_service  # noqa: E402
+from app.services.pdf_service import LAYOUT_VERSION, pdf_service  # noqa: E402
+from app.services.pricing import compute_totals  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "pdf_render.json"
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    rooms: int
+    items: int
+    logo: str = "none"  # none | normalized | photo
+    equipment_share: float = 0.3
+    max_repeat: Optional[int] = None  # cap on --repeat for the slow ones
+
+
+SCENARIOS = [
+    Scenario("small", rooms=2, items=4),
+    Scenario("typical", rooms=6, items=8, logo="normalized"),
+    Scenario("photo_logo", rooms=6, items=8, logo="photo", max_repeat=5),
+    Scenario("equipment_heavy", rooms=6, items=8, logo="normalized", equipment_share=0.8),
+    Scenario("large", rooms=100, items=10, logo="normalized", max_repeat=10),
+    Scenario("huge", rooms=1000, items=5, logo="normalized", max_repeat=3),
+]
+
+
+def make_logos(directory: Path) -> Dict[str, Optional[str]]:
+    """Logo files per kind: a 4000x3000 JPEG of phone-photo size (~3.5 MB) and its upload derivative."""
+    size = (4000, 3000)
+    photo = Image.merge("RGB", (
+        Image.radial_gradient("L").resize(size),
+        Image.effect_noise(size, 12),
+        Image.linear_gradient("L").resize(size),
+    ))
+    buffer = io.BytesIO()
+    photo.save(buffer, "JPEG", quality=90)
+    photo_path = directory / "photo.jpg"
+    photo_path.write_bytes(buffer.getvalue())
+    return {
+        "none": None,
+        "photo": str(photo_path),
+        "normalized": str(logo_service.save_pdf_logo(photo_path, buffer.getvalue())),
+    }
+
+
+def build_graph(scenario: Scenario, company_id: int, logo_path: Optional[str]) -> tuple:
+    company = Company(
+        id=company_id, name="Потолки Плюс", phone="+7 900 000-00-00", city="Москва",
+        address="ул. Ленина, 1", website="example.ru", messenger_contact="@potolki", messenger_type="telegram",
+        warranty_material=15, warranty_work=3, validity_days=14, discount=Decimal(5),
+        inn="7700000000", kpp="770001001", bank_name="Банк", bank_account="40702810000000000000",
+        bank_bik="044525000", bank_corr="30101810000000000000", logo_path=logo_path,
+        user=User(email="bench@example.ru"),
+    )
+    equipment = Category(id=1, name="Оборудование", slug="equipment", is_equipment=True)
+    canvas = Category(id=2, name="Полотна", slug="canvas", is_equipment=False)
+    equipment_item = PriceItem(id=1, name="Светильник GX53", unit="шт", price=Decimal(450), category=equipment)
+    canvas_item = PriceItem(id=2, name="Полотно MSD Premium матовое", unit="м²", price=Decimal(650), category=canvas)
+
+    rng = random.Random(scenario.name)
+    rooms = []
+    for r in range(scenario.rooms):
+        items = []
+        for i in range(scenario.items):
+            price_item = equipment_item if rng.random() < scenario.equipment_share else canvas_item
+            quantity = Decimal(rng.randint(1, 40))
+            items.append(EstimateItem(
+                name=f"{price_item.name} ({i + 1})", unit=price_item.unit, quantity=quantity,
+                price=price_item.price, sum=quantity * price_item.price, price_item=price_item,
+                category_name=price_item.category.name, is_equipment=price_item.category.is_equipment,
+            ))
+        rooms.append(EstimateRoom(name=f"Помещение {r + 1}", area=Decimal("18.5"), items=items))
+
+    totals = compute_totals(
+        ((item.sum, item.is_equipment) for room in rooms for item in room.items), Decimal(5), Decimal(10)
+    )
+    estimate = Estimate(
+        id=company_id, company_id=company_id, client_name="Иванов Иван", client_phone="+7 900 111-22-33",
+        client_address="ул. Пушкина, 10", discount_pr_work=Decimal(5), discount_equipment=Decimal(10), rooms=rooms,
+        subtotal_main=totals.subtotal_main, subtotal_equipment=totals.subtotal_equipment,
+        discount_main_sum=totals.discount_main_sum, discount_equipment_sum=totals.discount_equipment_sum,
+        final_sum=totals.final_sum,
+    )
+    return estimate, company
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(len(ordered) * pct) - 1))]
+
+
+def run_scenario(scenario: Scenario, company_id: int, logo_path: Optional[str], repeat: int) -> dict:
+    estimate, company = build_graph(scenario, company_id, logo_path)
+    content = pdf_service.generate(estimate, company)  # warm-up (fonts, logo decode)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pdf_service.generate(estimate, company)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    pdf_service.generate(estimate, company)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "lines": scenario.rooms * scenario.items,
+        "p50_ms": round(percentile(times, 0.5) * 1000, 2),
+        "p95_ms": round(percentile(times, 0.95) * 1000, 2),
+        "mean_ms": round(statistics.mean(times) * 1000, 2),
+        "peak_kb": peak // 1024,
+        "size_kb": len(content) // 1024,
+    }
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerances: Dict[str, float]) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        for metric, tolerance in tolerances.items():
+            limit = previous[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {result[metric]} > {previous[metric]} (+{tolerance:.0%} allowed)"
+                )
+    return regressions
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "reportlab": reportlab.Version,
+        "machine": platform.machine(),
+        "layout_version": LAYOUT_VERSION,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=[s.name for s in SCENARIOS],
+                        default=[s.name for s in SCENARIOS])
+    parser.add_argument("--repeat", type=int, default=20, help="timed renders per scenario")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--time-tolerance", type=float, default=0.25, help="allowed p50/p95 increase")
+    parser.add_argument("--memory-tolerance", type=float, default=0.2, help="allowed peak memory increase")
+    parser.add_argument("--size-tolerance", type=float, default=0.1, help="allowed PDF size increase")
+    args = parser.parse_args()
+
+    selected = [s for s in SCENARIOS if s.name in args.scenarios]
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        logos = make_logos(Path(tmp))
+        print(f"{'scenario':>16} {'lines':>6} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>8} {'size KB':>8}")
+        for company_id, scenario in enumerate(selected, start=1):
+            # Separate company ids, so each scenario has its own entry in the logo cache
+            repeat = min(args.repeat, scenario.max_repeat or args.repeat)
+            result = run_scenario(scenario, company_id, logos[scenario.logo], max(repeat, 1))
+            results[scenario.name] = result
+            print(f"{scenario.name:>16} {result['lines']:>6} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                  f"{result['peak_kb']:>8} {result['size_kb']:>8}")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {"scenarios": {}}
+        stored["environment"] = environment()
+        stored["scenarios"].update(results)
+        args.baseline.write_text(json.dumps(stored, indent=2, ensure_ascii=False) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("environment") != environment():
+        print(f"Note: baseline was recorded with {baseline.get('environment')}, this run is {environment()}")
+    regressions = compare(results, baseline, {
+        "p50_ms": args.time_tolerance,
+        "p95_ms": args.time_tolerance,
+        "peak_kb": args.memory_tolerance,
+        "size_kb": args.size_tolerance,
+    })
+    if regressions:
+        print("Regressions against the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
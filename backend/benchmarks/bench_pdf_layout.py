@@ -0,0 +1,100 @@
+"""PDF layout scaling with the number of rooms, per layout mode.
+
+Renders synthetic estimates of 1 to 1000 rooms (``--items`` lines each, a
+third of them equipment) in the normal per-room-table layout and the
+large-document layout, and prints the time per room. Linear scaling shows as
+a flat ms/room column; the last line compares ms/room at the largest size
+with the 100-room size.
+
+Usage (from backend/):
+    python benchmarks/bench_pdf_layout.py --rooms 1 10 100 300 1000 --items 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from app.services.pdf_document import PdfCompany, PdfEstimate, PdfItem, PdfRoom  # noqa: E402
+from app.services.pdf_service import pdf_service  # noqa: E402
+from app.services.pricing import compute_totals  # noqa: E402
+
+
+def build_estimate(rooms: int, items: int) -> PdfEstimate:
+    pdf_rooms = tuple(
+        PdfRoom(
+            name=f"Помещение {r + 1}",
+            area=18.5,
+            items=tuple(
+                PdfItem(
+                    name=f"Позиция {i + 1}: полотно MSD Premium матовое",
+                    quantity=18.5, unit="м²", price=650, sum=12025,
+                    category_name="Оборудование" if i % 3 == 2 else "Полотна",
+                    is_equipment=i % 3 == 2,
+                )
+                for i in range(items)
+            ),
+        )
+        for r in range(rooms)
+    )
+    totals = compute_totals(
+        ((item.sum, item.is_equipment) for room in pdf_rooms for item in room.items), 5, 0
+    )
+    return PdfEstimate(
+        id=1,
+        company=PdfCompany(id=1, name="Потолки Плюс", phone="+7 900 000-00-00"),
+        client_name="Бенчмарк",
+        discount_pr_work=5,
+        subtotal_main=float(totals.subtotal_main),
+        subtotal_equipment=float(totals.subtotal_equipment),
+        discount_main_sum=float(totals.discount_main_sum),
+        discount_equipment_sum=float(totals.discount_equipment_sum),
+        final_sum=float(totals.final_sum),
+        rooms=pdf_rooms,
+    )
+
+
+def time_render(document: PdfEstimate, large: bool, repeat: int) -> tuple:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        content = pdf_service.render(document, large=large)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, nargs="+", default=[1, 10, 100, 300, 1000])
+    parser.add_argument("--items", type=int, default=5, help="lines per room")
+    parser.add_argument("--repeat", type=int, default=3, help="renders per size (median is reported)")
+    args = parser.parse_args()
+
+    pdf_service.render(build_estimate(1, 1))  # warm up fonts and styles
+
+    per_room = {False: {}, True: {}}
+    print(f"{'rooms':>6} {'lines':>6} | {'normal s':>9} {'ms/room':>8} {'KB':>6} | {'large s':>9} {'ms/room':>8} {'KB':>6}")
+    for rooms in args.rooms:
+        document = build_estimate(rooms, args.items)
+        cells = []
+        for large in (False, True):
+            seconds, size = time_render(document, large, args.repeat)
+            per_room[large][rooms] = seconds * 1000 / rooms
+            cells.append(f"{seconds:>9.3f} {per_room[large][rooms]:>8.2f} {size // 1024:>6}")
+        print(f"{rooms:>6} {rooms * args.items:>6} | {cells[0]} | {cells[1]}")
+
+    largest = max(args.rooms)
+    if 100 in args.rooms and largest > 100:
+        for large, label in ((False, "normal"), (True, "large")):
+            ratio = per_room[large][largest] / per_room[large][100]
+            print(f"{label}: ms/room at {largest} rooms is {ratio:.2f}x that at 100 rooms (1.00 = linear)")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,38 @@ export default {
         return response.data
     },
 
+    // Server-side copy with its rooms and items; overrides: { client_name, client_phone, client_address, status }
+    async cloneEstimate(id, overrides = {}) {
+        const response = await api.post(`/estimates/${id}/clone`, overrides)
+        return response.data
+    },
+
+    // Appends a room made from a room template; returns the updated estimate
+    async addRoomFromTemplate(id, templateId, { name, area } = {}) {
+        const response = await api.post(`/estimates/${id}/rooms/from-template`, { template_id: templateId, name, area })
+        return response.data
+    },
+
+    async getRoomTemplates() {
+        const response = await api.get('/room-templates/')
+        return response.data
+    },
+
+    async createRoomTemplate(data) {
+        const response = await api.post('/room-templates/', data)
+        return response.data
+    },
+
+    // Saves a saved estimate room (by id) as a template
+    async createRoomTemplateFromRoom(roomId, name) {
+        const response = await api.post('/room-templates/from-room', { room_id: roomId, name })
+        return response.data
+    },
+
+    async deleteRoomTemplate(id) {
+        await api.delete(`/room-templates/${id}`)
+    },
+
     async parseTranscript(transcript) {
         const response = await api.post('/estimates/parse', { transcript })
         return response.data
@@ -24,5 +56,23 @@ export default {
     async getEstimates(params = {}) {
         const response = await api.get('/estimates/', { params })
         return response.data
+    },
+
+    // Ranked search by client name, phone or address: { items, next_offset }
+    async searchEstimates(q, params = {}) {
+        const response = await api.get('/estimates/search', { params: { q, ...params } })
+        return response.data
+    },
+
+    // Counts and sums by status and period from the daily rollup: { count, final_sum, by_status, series, ... }
+    async getEstimateStats(params = {}) {
+        const response = await api.get('/estimates/stats', { params })
+        return response.data
+    },
+
+    // One page of summary rows: { items, next_cursor }
+    async getEstimateSummaries(params = {}) {
+        const response = await api.get('/estimates/summary', { params })
+        return response.data
     }
 }
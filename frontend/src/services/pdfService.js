@@ -9,6 +9,12 @@ export default {
         return response.data
     },
 
+    // ZIP of several KPs: { estimate_ids } or a filter { status, date_from, date_to }
+    async generateBatch(request) {
+        const response = await api.post('/pdf/batch', request, { responseType: 'blob' })
+        return response.data
+    },
+
     async previewPdf(estimateId) {
         const response = await api.get(`/pdf/preview/${estimateId}`, {
             responseType: 'blob'
@@ -1,26 +1,63 @@
 import api from './api'
 
+const WAIT_SECONDS = 25
+const MAX_WAIT_MS = 10 * 60 * 1000
+
 /**
  * Service for server-side audio transcription using Gemini Flash
  */
 export const transcribeService = {
     /**
-     * Transcribe audio blob using server-side AI (Gemini Flash via OpenRouter)
+     * Transcribe audio blob using server-side AI (Gemini Flash via OpenRouter).
+     * The upload is queued as a background job which is long-polled until it finishes.
      * @param {Blob} audioBlob - Audio blob from MediaRecorder
+     * @param {Object} [options]
+     * @param {Function} [options.onPartial] - Called with the text so far while a long recording is transcribed in segments
      * @returns {Promise<string>} Transcribed text
      */
-    async transcribe(audioBlob) {
+    async transcribe(audioBlob, { onPartial } = {}) {
         const formData = new FormData()
         formData.append('audio', audioBlob, 'recording.webm')
 
-        const response = await api.post('/transcribe', formData, {
+        const { data: job } = await api.post('/jobs/transcribe', formData, {
             headers: {
                 'Content-Type': 'multipart/form-data'
             },
-            timeout: 120000 // 2 minutes for long recordings
+            timeout: 60000
         })
 
-        return response.data.transcript
+        const result = await this.waitForJob(job.id, onPartial)
+        return result.transcript
+    },
+
+    /**
+     * Long-poll a job until it is done; rejects with the job error if it failed.
+     * @param {string} jobId
+     * @param {Function} [onPartial] - Called with progress.partial_transcript whenever it changes
+     * @returns {Promise<Object>} Job result
+     */
+    async waitForJob(jobId, onPartial) {
+        let partial = ''
+        const deadline = Date.now() + MAX_WAIT_MS
+        while (Date.now() < deadline) {
+            const { data: job } = await api.get(`/jobs/${jobId}`, {
+                params: { wait: WAIT_SECONDS },
+                timeout: (WAIT_SECONDS + 15) * 1000
+            })
+            if (job.status === 'done') return job.result
+            const text = job.progress?.partial_transcript
+            if (onPartial && text && text !== partial) {
+                partial = text
+                onPartial(text)
+            }
+            if (job.status === 'failed') {
+                // Same shape as an HTTP error so callers can keep reading error.response.data.detail
+                const error = new Error(job.error || 'Transcription failed')
+                error.response = { data: { detail: job.error } }
+                throw error
+            }
+        }
+        throw new Error('Transcription timed out')
     }
 }
 
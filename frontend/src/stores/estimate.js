@@ -13,6 +13,7 @@ export const useEstimateStore = defineStore('estimate', () => {
     const isEditing = ref(false)
     const currentStep = ref(1)
     const estimates = ref([])
+    const estimatesCursor = ref(null)  // next page of the list; null when everything is loaded
 
     // New fields
     const discountPrWork = ref(0)
@@ -96,10 +97,12 @@ export const useEstimateStore = defineStore('estimate', () => {
         }
 
         rooms.value = (data.rooms || []).map(r => ({
+            id: r.id,
             name: r.name,
             area: Number(r.area) || 0,
             subtotal: Number(r.subtotal) || 0,
             items: (r.items || []).map(i => ({
+                id: i.id,
                 name: i.name,
                 price_item_id: i.price_item_id,
                 unit: i.unit,
@@ -119,9 +122,11 @@ export const useEstimateStore = defineStore('estimate', () => {
             discount_pr_work: discountPrWork.value,
             discount_equipment: discountEquipment.value,
             rooms: rooms.value.map(r => ({
+                id: r.id,
                 name: r.name,
                 area: r.area || 0,
                 items: r.items.map(i => ({
+                    id: i.id,
                     price_item_id: i.price_item_id,
                     name: i.name,
                     unit: i.unit,
@@ -132,11 +137,27 @@ export const useEstimateStore = defineStore('estimate', () => {
         }
     }
 
+    // Take over the ids of saved rows, so the next save updates them in place instead
+    // of inserting them again. Rows are matched by position and name: rows renamed or
+    // removed while the request was in flight just stay without an id.
+    const applySavedIds = (data) => {
+        (data.rooms || []).forEach((savedRoom, rIdx) => {
+            const room = rooms.value[rIdx]
+            if (!room || room.name !== savedRoom.name) return
+            room.id = savedRoom.id
+            savedRoom.items.forEach((savedItem, iIdx) => {
+                const item = room.items[iIdx]
+                if (item && item.name === savedItem.name) item.id = savedItem.id
+            })
+        })
+    }
+
     const createEstimate = async () => {
         const payload = { ...buildPayload(), status: 'completed' }
         const data = await estimateService.createEstimate(payload)
         estimate.value = data
         isEditing.value = true
+        applySavedIds(data)
         return data
     }
 
@@ -145,6 +166,7 @@ export const useEstimateStore = defineStore('estimate', () => {
         const payload = { ...buildPayload(), status: 'completed' }
         const data = await estimateService.updateEstimate(estimate.value.id, payload)
         estimate.value = data
+        applySavedIds(data)
         return data
     }
 
@@ -158,10 +180,12 @@ export const useEstimateStore = defineStore('estimate', () => {
         if (estimate.value?.id) {
             const data = await estimateService.updateEstimate(estimate.value.id, payload)
             estimate.value = data
+            applySavedIds(data)
         } else {
             const data = await estimateService.createEstimate(payload)
             estimate.value = data
             isEditing.value = true
+            applySavedIds(data)
         }
     }
 
@@ -212,16 +236,26 @@ export const useEstimateStore = defineStore('estimate', () => {
         recalculate()
     }
 
-    const fetchEstimates = async () => {
-        const data = await estimateService.getEstimates()
-        estimates.value = data
-        return data
+    const fetchEstimates = async (params = {}) => {
+        const data = await estimateService.getEstimateSummaries(params)
+        estimates.value = data.items
+        estimatesCursor.value = data.next_cursor
+        return data.items
+    }
+
+    const fetchMoreEstimates = async (params = {}) => {
+        if (!estimatesCursor.value) return []
+        const data = await estimateService.getEstimateSummaries({ ...params, cursor: estimatesCursor.value })
+        estimates.value.push(...data.items)
+        estimatesCursor.value = data.next_cursor
+        return data.items
     }
 
     return {
         estimate,
         rooms,
         estimates,
+        estimatesCursor,
         clientInfo,
         discountPrWork,
         discountEquipment,
@@ -238,6 +272,7 @@ export const useEstimateStore = defineStore('estimate', () => {
         parseTranscript,
         addParsedRooms,
         mergeParsedRooms,
-        fetchEstimates
+        fetchEstimates,
+        fetchMoreEstimates
     }
 })